@@ -0,0 +1,81 @@
+import re
+import statistics
+import timeit
+from collections.abc import Callable
+from functools import partial
+from typing import Any
+
+from benchmarks.library_tree import build_library_tree
+from benchmarks.synthetic import get_page_records
+from mindtouch2zim.client import LibraryPage, LibraryTree
+from mindtouch2zim.processor import ContentFilter
+
+
+def legacy_sub_tree(page_tree: LibraryTree, subroot_id: str) -> dict[str, LibraryPage]:
+    """LibraryTree.sub_tree before it has been made linear, for comparison"""
+    new_root = page_tree.pages[subroot_id]
+    pages = {new_root.id: new_root}
+    children_to_explore = [*new_root.children]
+    while len(children_to_explore) > 0:
+        child = children_to_explore[0]
+        children_to_explore.remove(child)
+        if child.id in pages:
+            continue  # safe-guard
+        pages[child.id] = child
+        children_to_explore.extend(child.children)
+    return pages
+
+
+def legacy_filter(
+    content_filter: ContentFilter, page_tree: LibraryTree
+) -> list[LibraryPage]:
+    """ContentFilter.filter before it has been made linear, for comparison"""
+    pages = dict(page_tree.pages)
+    if content_filter.root_page_id:
+        pages = legacy_sub_tree(page_tree, content_filter.root_page_id)
+    title_include_re = content_filter.page_title_include
+    selected_ids = {
+        selected_page.id
+        for page in pages.values()
+        for selected_page in page.self_and_parents
+        if not title_include_re or title_include_re.search(page.title) is not None
+    }
+    return [page for page in pages.values() if page.id in selected_ids]
+
+
+def measure(func: Callable[[], Any], repeat: int = 5) -> tuple[float, float]:
+    """Return min and median duration (s) of func over several runs"""
+    durations = timeit.repeat(func, number=1, repeat=repeat)
+    return min(durations), statistics.median(durations)
+
+
+def main():
+    print(
+        f"{'pages':>8} {'legacy min (s)':>15} {'legacy median (s)':>18} "
+        f"{'linear min (s)':>15} {'linear median (s)':>18}"
+    )
+    for nb_pages in (1_000, 10_000, 100_000):
+        records = get_page_records(nb_pages, max_children=4)
+        # a sub-tree holding most pages, filtered on titles of ~1/10th of pages
+        content_filter = ContentFilter(
+            page_title_include=re.compile(r"^\d*7: "),
+            page_title_exclude=None,
+            page_id_include=None,
+            root_page_id=records[1].id,
+        )
+        # both filters run on the same tree, so that only algorithms are compared
+        page_tree = build_library_tree(records)
+        if legacy_filter(content_filter, page_tree) != content_filter.filter(page_tree):
+            raise ValueError("Legacy and linear filters do not select same pages")
+        legacy_min, legacy_median = measure(
+            partial(legacy_filter, content_filter, page_tree)
+        )
+        linear_min, linear_median = measure(partial(content_filter.filter, page_tree))
+        print(
+            f"{nb_pages:>8} {legacy_min:>15.3f} {legacy_median:>18.3f} "
+            f"{linear_min:>15.3f} {linear_median:>18.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+import gc
+import time
+import tracemalloc
+from collections.abc import Callable
+from functools import partial
+from typing import Any
+
+from pydantic import BaseModel
+
+from benchmarks.synthetic import PageRecord, get_page_records, get_tree_json
+from mindtouch2zim.client import LibraryTree, MindtouchClient
+
+
+class LegacyLibraryPage(BaseModel):
+    """LibraryPage before the tree has been stored in arrays, for comparison"""
+
+    id: str
+    title: str
+    path: str
+    parent: "LegacyLibraryPage | None" = None
+    children: list["LegacyLibraryPage"] = []
+    encoded_url: str
+
+    @property
+    def self_and_parents(self) -> list["LegacyLibraryPage"]:
+        result: list[LegacyLibraryPage] = [self]
+        current = self
+        while current.parent is not None:
+            result.append(current.parent)
+            current = current.parent
+        return result
+
+
+class LegacyLibraryTree(BaseModel):
+    """LibraryTree before it has been stored in arrays, for comparison"""
+
+    root: LegacyLibraryPage
+    pages: dict[str, LegacyLibraryPage] = {}
+
+
+def build_legacy_library_tree(records: list[PageRecord]) -> LegacyLibraryTree:
+    pages: list[LegacyLibraryPage] = []
+    for record in records:
+        parent = pages[record.parent_index] if record.parent_index >= 0 else None
+        page = LegacyLibraryPage(
+            id=record.id,
+            title=record.title,
+            path=record.path,
+            encoded_url=record.encoded_url,
+            parent=parent,
+        )
+        if parent:
+            parent.children.append(page)
+        pages.append(page)
+    tree = LegacyLibraryTree(root=pages[0])
+    for page in pages:
+        tree.pages[page.id] = page
+    return tree
+
+
+def build_library_tree(records: list[PageRecord]) -> LibraryTree:
+    tree = LibraryTree()
+    for record in records:
+        tree.add_page(
+            page_id=record.id,
+            title=record.title,
+            path=record.path,
+            encoded_url=record.encoded_url,
+            parent_index=record.parent_index,
+        )
+    return tree
+
+
+def measure(func: Callable[[], Any]) -> tuple[float, float, float]:
+    """Return duration (s), retained and peak memory (MB) of func"""
+    gc.collect()
+    start = time.perf_counter()
+    func()
+    duration = time.perf_counter() - start
+    gc.collect()
+    tracemalloc.start()
+    result = func()  # kept alive while measuring retained memory
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return duration, retained / 1024 / 1024, peak / 1024 / 1024
+
+
+def main():
+    client = MindtouchClient()
+    print(
+        f"{'pages':>8} {'implementation':<22} {'time (s)':>9} {'retained (MB)':>14} "
+        f"{'peak (MB)':>10}"
+    )
+    for nb_pages in (1_000, 10_000, 100_000):
+        records = get_page_records(nb_pages)
+        tree_json = get_tree_json(records).encode()
+        for name, func in (
+            ("legacy tree", partial(build_legacy_library_tree, records)),
+            ("LibraryTree", partial(build_library_tree, records)),
+            (
+                "parse to LibraryTree",
+                partial(
+                    client._parse_page_tree,  # pyright: ignore[reportPrivateUsage]
+                    tree_json,
+                ),
+            ),
+        ):
+            duration, retained, peak = measure(func)
+            print(
+                f"{nb_pages:>8} {name:<22} {duration:>9.2f} {retained:>14.1f} "
+                f"{peak:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
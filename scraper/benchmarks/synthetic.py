@@ -0,0 +1,106 @@
+import json
+import random
+from typing import Any, NamedTuple
+
+
+class PageRecord(NamedTuple):
+    id: str
+    title: str
+    path: str
+    encoded_url: str
+    parent_index: int  # -1 for the root page
+
+
+def get_page_records(
+    nb_pages: int, max_children: int = 12, seed: int = 0
+) -> list[PageRecord]:
+    """Generate a random tree of pages, parents always before their children"""
+    rng = random.Random(seed)
+    records: list[PageRecord] = []
+    # pages which may still receive children, in creation order
+    parents: list[int] = [-1]
+    while len(records) < nb_pages and parents:
+        parent_index = parents.pop(0)
+        for _ in range(1 if parent_index < 0 else rng.randint(1, max_children)):
+            if len(records) >= nb_pages:
+                break
+            index = len(records)
+            parent_path = (
+                "Bookshelves" if parent_index < 0 else records[parent_index].path
+            )
+            path = f"{parent_path}/{index}_Page"
+            records.append(
+                PageRecord(
+                    id=str(index + 1000),
+                    title=f"{index}: Page {index}",
+                    path=path,
+                    encoded_url=f"https://www.acme.com/{path}",
+                    parent_index=parent_index,
+                )
+            )
+            parents.append(index)
+    return records
+
+
+def get_tree_json(records: list[PageRecord]) -> str:
+    """Return JSON of /pages/home/tree API endpoint for given pages"""
+    nodes: list[dict[str, Any]] = []
+    for record in records:
+        node: dict[str, Any] = {
+            "@id": record.id,
+            "@href": f"https://www.acme.com/@api/deki/pages/{record.id}",
+            "@deleted": "false",
+            "date.created": "Mon, 01 Jan 2024 00:00:00 GMT",
+            "namespace": "main",
+            "path": {"@seo": "true", "@type": "custom", "#text": record.path},
+            "title": record.title,
+            "uri.ui": record.encoded_url,
+            "subpages": "",
+        }
+        nodes.append(node)
+        if record.parent_index >= 0:
+            parent = nodes[record.parent_index]
+            if not parent["subpages"]:
+                parent["subpages"] = {"page": node}
+            elif isinstance(parent["subpages"]["page"], dict):
+                parent["subpages"]["page"] = [parent["subpages"]["page"], node]
+            else:
+                parent["subpages"]["page"].append(node)
+    return json.dumps({"page": nodes[0]})
+
+
+def get_page_html(nb_blocks: int, seed: int = 0) -> str:
+    """Generate a random HTML page body, looking like a typical library page"""
+    rng = random.Random(seed)
+    blocks: list[str] = ['<div class="mt-content-container">']
+    for index in range(nb_blocks):
+        kind = rng.random()
+        if kind < 0.7:
+            blocks.append(
+                f'<p id="p{index}">Paragraph {index} with <strong>bold</strong>, '
+                f'<a href="/Bookshelves/{index}_Page">a link</a> &amp; math '
+                f'<span class="mjx-chtml">x<sup>{index}</sup></span>.</p>'
+            )
+        elif kind < 0.8:
+            blocks.append(
+                f'<figure><img src="https://www.acme.com/@api/deki/files/{index}/'
+                f'image.png" alt="Figure {index}"><figcaption>Figure {index}'
+                "</figcaption></figure>"
+            )
+        elif kind < 0.9:
+            blocks.append(
+                "<table><thead><tr><th>Name</th><th>Value</th></tr></thead><tbody>"
+                + "".join(
+                    f"<tr><td>Row {row}</td><td>{rng.randint(0, 1000)}</td></tr>"
+                    for row in range(5)
+                )
+                + "</tbody></table>"
+            )
+        else:
+            blocks.append(
+                f"<!-- block {index} --><script>var block{index} = {index};</script>"
+                f"<style>#p{index} {{ color: red; }}</style><ul><li>Item {index}</li>"
+                "<li>Other item</li></ul>"
+            )
+    blocks.append("</div>")
+    return "\n".join(blocks)
@@ -0,0 +1,64 @@
+import time
+from collections.abc import Callable
+from functools import partial
+from typing import Any
+
+from zimscraperlib.rewriting.html import HtmlRewriter
+
+from benchmarks.synthetic import get_page_html
+from mindtouch2zim.asset import AssetManager
+from mindtouch2zim.html_rewriting import HtmlUrlsRewriter
+from mindtouch2zim.html_utils import get_soup, get_text
+
+REPEAT = 5
+
+
+def legacy_get_text(content: str) -> str:
+    """get_text before it has been made streaming, for comparison"""
+    return get_soup(content).getText("\n", strip=True)
+
+
+def rewrite(content: str) -> str:
+    """Rewrite HTML like it is done for 'normal' pages"""
+    rewriter = HtmlRewriter(
+        url_rewriter=HtmlUrlsRewriter(
+            "https://www.acme.com",
+            "Bookshelves/Page",
+            existing_zim_paths=set(),
+            asset_manager=AssetManager(),
+        ),
+        pre_head_insert=None,
+        post_head_insert=None,
+        notify_js_module=None,
+    )
+    return rewriter.rewrite(content).content
+
+
+def measure(func: Callable[[], Any]) -> float:
+    """Return average duration (ms) of func"""
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        func()
+    return (time.perf_counter() - start) / REPEAT * 1000
+
+
+def main():
+    print(
+        f"{'blocks':>7} {'size (kB)':>10} {'rewrite (ms)':>13} "
+        f"{'legacy (ms)':>12} {'streaming (ms)':>15}"
+    )
+    for nb_blocks in (10, 100, 1_000, 5_000):
+        content = get_page_html(nb_blocks)
+        rewritten = rewrite(content)
+        if get_text(rewritten) != legacy_get_text(rewritten):
+            raise Exception(f"Extracted text differs for {nb_blocks} blocks")
+        print(
+            f"{nb_blocks:>7} {len(rewritten) / 1000:>10.1f} "
+            f"{measure(partial(rewrite, content)):>13.2f} "
+            f"{measure(partial(legacy_get_text, rewritten)):>12.2f} "
+            f"{measure(partial(get_text, rewritten)):>15.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,14 @@
-import math
 import mimetypes
 import threading
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
 from functools import partial
 from io import BytesIO
 from typing import NamedTuple
 from urllib.parse import urlsplit
 
 import backoff
+import requests.structures
 from kiwixstorage import (  # pyright: ignore[reportMissingTypeStubs]
     KiwixStorage,
     NotFoundError,
@@ -14,22 +16,27 @@ from kiwixstorage import (  # pyright: ignore[reportMissingTypeStubs]
 from pif import (  # pyright: ignore[reportMissingTypeStubs]
     get_public_ip,  # pyright: ignore[reportUnknownVariableType]
 )
-from PIL import Image
 from requests.exceptions import RequestException
-from resizeimage import resizeimage  # pyright: ignore[reportMissingTypeStubs]
-from zimscraperlib.image.optimization import optimize_webp
 from zimscraperlib.image.presets import WebpMedium
 from zimscraperlib.rewriting.url_rewriting import HttpUrl, ZimPath
-from zimscraperlib.zim import Creator
 
+from mindtouch2zim.cache import LocalOptimizationCache
+from mindtouch2zim.circuit_breaker import CircuitBreaker, is_host_failure
 from mindtouch2zim.context import Context
 from mindtouch2zim.download import stream_file
 from mindtouch2zim.errors import (
+    HostCircuitOpenError,
     KnownBadAssetFailedError,
     S3CacheError,
     S3InvalidCredentialsError,
 )
+from mindtouch2zim.previous_zim import ManifestImage, PreviousZim
+from mindtouch2zim.s3_uploader import S3Uploader
+from mindtouch2zim.scheduler import HostScheduler
+from mindtouch2zim.spool import SpoolStream
+from mindtouch2zim.transcoding import transcode_image
 from mindtouch2zim.utils import backoff_hdlr
+from mindtouch2zim.zim_writer import ZimWriter
 
 SUPPORTED_IMAGE_MIME_TYPES = {
     "image/jpeg",
@@ -47,11 +54,8 @@ SUPPORTED_IMAGE_MIME_TYPES = {
     "application/postscript",  # for EPS files
 }
 
-WEBP_OPTIONS = WebpMedium().options
-
 context = Context.get()
 logger = context.logger
-lock = threading.Lock()
 
 
 class HeaderData(NamedTuple):
@@ -74,10 +78,25 @@ class AssetDetails(NamedTuple):
 
 
 class AssetManager:
-    """Class responsible to manage a list of assets to download"""
+    """Class responsible to manage a list of assets to download
+
+    New assets are also pushed to a queue, so that they can be downloaded as soon as
+    they are discovered, while pages are still being processed. Assets are handed
+    out fairly across the hosts they are downloaded from.
+    """
 
     def __init__(self) -> None:
         self.assets: dict[ZimPath, AssetDetails] = {}
+        self.lock = threading.Lock()
+        # paths of new assets, grouped by host
+        self.scheduler: HostScheduler[ZimPath] = HostScheduler(
+            max_per_host=context.assets_workers_per_host
+        )
+        # URLs already tried, by path of assets being processed
+        self.tried_urls: dict[ZimPath, set[HttpUrl]] = {}
+        # paths of assets processed without success, processed again if a new URL is
+        # added to them
+        self.failed_assets: set[ZimPath] = set()
 
     def add_asset(
         self,
@@ -98,33 +117,111 @@ class AssetManager:
           on returned mime type to decide if we should optimize it or not
         always_fetch_online: if False, the asset may be cached on S3 ; if True, it is
           always fetch online
+
+        This method is thread-safe, it is called concurrently by pages workers. URLs
+        and usages of an already known asset are merged, new URLs are used only if
+        the asset has not yet been successfully processed (assets which failed are
+        queued again).
         """
-        if asset_path not in self.assets:
-            self.assets[asset_path] = AssetDetails(
-                asset_urls={asset_url},
-                used_by={used_by},
-                kind=kind,
-                always_fetch_online=always_fetch_online,
-            )
-            return
-        current_asset = self.assets[asset_path]
-        if current_asset.kind != kind:
-            logger.warning(
-                f"Conflicting kind found for asset at {asset_path} already used by "
-                f"{current_asset.get_usage_repr}; current kind is "
-                f"'{current_asset.kind}';new kind '{kind}' from {asset_url} used by "
-                f"{used_by} will be ignored"
-            )
-        if current_asset.always_fetch_online != always_fetch_online:
-            logger.warning(
-                f"Conflicting always_fetch_online found for asset at {asset_path} "
-                f"already used by {current_asset.get_usage_repr}; current "
-                f"always_fetch_online is '{current_asset.always_fetch_online}';"
-                f"new always_fetch_online '{always_fetch_online}' from {asset_url} used"
-                f" by {used_by} will be ignored"
-            )
-        current_asset.used_by.add(used_by)
-        current_asset.asset_urls.add(asset_url)
+        with self.lock:
+            if asset_path not in self.assets:
+                self.assets[asset_path] = AssetDetails(
+                    asset_urls={asset_url},
+                    used_by={used_by},
+                    kind=kind,
+                    always_fetch_online=always_fetch_online,
+                )
+                self.scheduler.put(
+                    asset_path, host=urlsplit(asset_url.value).hostname or ""
+                )
+                return
+            current_asset = self.assets[asset_path]
+            if current_asset.kind != kind:
+                logger.warning(
+                    f"Conflicting kind found for asset at {asset_path} already used "
+                    f"by {current_asset.get_usage_repr}; current kind is "
+                    f"'{current_asset.kind}';new kind '{kind}' from {asset_url} used "
+                    f"by {used_by} will be ignored"
+                )
+            if current_asset.always_fetch_online != always_fetch_online:
+                logger.warning(
+                    "Conflicting always_fetch_online found for asset at "
+                    f"{asset_path} already used by {current_asset.get_usage_repr}; "
+                    "current always_fetch_online is "
+                    f"'{current_asset.always_fetch_online}';new always_fetch_online "
+                    f"'{always_fetch_online}' from {asset_url} used by {used_by} will "
+                    "be ignored"
+                )
+            current_asset.used_by.add(used_by)
+            if asset_url in current_asset.asset_urls:
+                return
+            current_asset.asset_urls.add(asset_url)
+            if asset_path in self.failed_assets:
+                logger.debug(f"Retrying asset at {asset_path} with new URL {asset_url}")
+                self.failed_assets.discard(asset_path)
+                self.scheduler.put(
+                    asset_path, host=urlsplit(asset_url.value).hostname or ""
+                )
+
+    def next_untried_url(self, asset_path: ZimPath) -> HttpUrl | None:
+        """Return an URL of an asset which has not been tried yet, None if none left
+
+        Returned URL is marked as tried. This method is thread-safe, URLs can be added
+        to the asset concurrently.
+        """
+        with self.lock:
+            tried_urls = self.tried_urls.setdefault(asset_path, set())
+            for asset_url in self.assets[asset_path].asset_urls:
+                if asset_url not in tried_urls:
+                    tried_urls.add(asset_url)
+                    return asset_url
+            return None
+
+    def iter_queued(self) -> Iterator[tuple[ZimPath, AssetDetails]]:
+        """Yield new assets as they are added, until the queue is closed
+
+        Every yielded asset must be marked as done once processed, so that other
+        assets of the same host can be yielded.
+        """
+        while (queued := self.get_queued()) is not None:
+            yield queued
+
+    def get_queued(self) -> tuple[ZimPath, AssetDetails] | None:
+        """Return next queued asset, or None once the queue is closed and empty
+
+        Blocks until an asset is available, see iter_queued.
+        """
+        if (asset_path := self.scheduler.get()) is None:
+            return None
+        return asset_path, self.assets[asset_path]
+
+    def asset_done(self, asset_path: ZimPath, seconds: float, *, failed: bool = False):
+        """Mark a yielded asset as processed, it took given number of seconds
+
+        failed: if True, no URL of the asset succeeded ; asset is queued again as soon
+          as it has a new URL
+        """
+        self.scheduler.done(asset_path, seconds)
+        with self.lock:
+            if not failed:
+                self.tried_urls.pop(asset_path, None)
+                return
+            # URLs might have been added since last one has been tried
+            tried_urls = self.tried_urls.get(asset_path, set())
+            for asset_url in self.assets[asset_path].asset_urls:
+                if asset_url not in tried_urls:
+                    self.scheduler.put(
+                        asset_path, host=urlsplit(asset_url.value).hostname or ""
+                    )
+                    return
+            self.failed_assets.add(asset_path)
+
+    def close(self, *, cancel: bool = False):
+        """Signal that no more asset will be added
+
+        cancel: if True, assets which are still queued are not yielded anymore
+        """
+        self.scheduler.close(cancel=cancel)
 
 
 class AssetProcessor:
@@ -133,17 +230,75 @@ class AssetProcessor:
         self,
     ) -> None:
         self._setup_s3()
+        # uploads optimized images to S3 cache in background, if configured
+        self.s3_uploader = (
+            S3Uploader(
+                upload=self._upload_to_s3_cache,
+                workers=context.s3_upload_workers,
+                max_queued_bytes=context.s3_upload_max_queued_bytes,
+            )
+            if context.s3_url_with_credentials
+            else None
+        )
         self.bad_assets_count = 0
+        # assets which failed fast because their host kept failing, not counted as
+        # bad assets
+        self.unavailable_host_assets_count = 0
+        # stops requesting hosts which keep failing
+        self.circuit_breaker = CircuitBreaker(
+            max_failures=context.circuit_breaker_max_failures,
+            cooldown_seconds=context.circuit_breaker_cooldown_seconds,
+        )
         self.lock = threading.Lock()
+        # previous ZIM to reuse optimized images from, if any
+        self.previous_zim: PreviousZim | None = None
+        # optimized images added to the ZIM, to be recorded in build manifest
+        self.images: dict[ZimPath, ManifestImage] = {}
+        # pool of processes transcoding images, images are transcoded in assets
+        # workers threads when not set
+        self.transcode_pool: ProcessPoolExecutor | None = None
+        # bounds the number of images queued or being transcoded in the pool, assets
+        # workers wait for a free slot before submitting an image
+        self.transcode_slots = threading.BoundedSemaphore(2 * context.image_processes)
+        # local cache of optimized images, if configured
+        self.local_cache = (
+            LocalOptimizationCache(
+                context.local_optimization_cache,
+                max_size=(
+                    context.local_optimization_cache_max_size_mb * 1024 * 1024
+                    if context.local_optimization_cache_max_size_mb
+                    else None
+                ),
+            )
+            if context.local_optimization_cache
+            else None
+        )
+
+    def flush_s3_uploads(self):
+        """Wait for background uploads to S3 cache to be done"""
+        if self.s3_uploader:
+            self.s3_uploader.flush()
+
+    def close(self):
+        """Release resources held by the processor"""
+        if self.s3_uploader:
+            self.s3_uploader.close()
+        if self.local_cache:
+            self.local_cache.close()
 
     def process_asset(
         self,
         asset_path: ZimPath,
-        asset_details: AssetDetails,
-        creator: Creator,
-    ):
-        """Download and add to the ZIM a given asset (image, ...)"""
-        for asset_url in asset_details.asset_urls:
+        asset_manager: AssetManager,
+        zim_writer: ZimWriter,
+    ) -> bool:
+        """Download and add to the ZIM a given asset (image, ...) of an asset manager
+
+        URLs are tried one after the other, including URLs added to the asset while
+        it is being processed, until one succeeds. Returns False if none succeeded.
+        """
+        asset_details = asset_manager.assets[asset_path]
+        while asset_url := asset_manager.next_untried_url(asset_path):
             try:
                 context.current_thread_workitem = (
                     f"asset from {asset_url.value}{asset_details.get_usage_repr}"
@@ -154,19 +309,21 @@ class AssetProcessor:
                     always_fetch_online=asset_details.always_fetch_online,
                     kind=asset_details.kind,
                 )
-                logger.debug(f"Adding asset to {asset_path.value} in the ZIM")
-                with lock:
-                    creator.add_item_for(
-                        path="content/" + asset_path.value,
-                        content=asset_content.getvalue(),
-                    )
-                break  # file found and added
+                self._add_asset_to_zim(zim_writer, asset_path, asset_content)
+                return True  # file found and added
             except RuntimeError:
                 # RuntimeError exceptions comes from the libzim usually and they must be
                 # fatal errors
                 raise
             except KnownBadAssetFailedError as exc:
                 logger.debug(f"Ignoring known bad asset: {exc}")
+            except HostCircuitOpenError as exc:
+                with self.lock:
+                    self.unavailable_host_assets_count += 1
+                logger.debug(
+                    f"Ignoring {context.current_thread_workitem}, host is unavailable:"
+                    f" {exc}"
+                )
             except Exception as exc:
                 # all other exceptions (not only RequestsException) lead to an increase
                 # of bad_assets_count, because we have no idea what could go wrong here
@@ -189,6 +346,46 @@ class AssetProcessor:
                         )
                     else:
                         logger.warning(log_message)
+        return False
+
+    def _add_asset_to_zim(
+        self,
+        zim_writer: ZimWriter,
+        asset_path: ZimPath,
+        asset_content: BytesIO | SpoolStream,
+    ):
+        """Add asset content to the ZIM, from its spool file if it has one
+
+        Spool file is deleted once libzim is done with it.
+        """
+        logger.debug(f"Adding asset to {asset_path.value} in the ZIM")
+        if isinstance(asset_content, SpoolStream) and asset_content.fpath:
+            try:
+                zim_writer.add_item_for(
+                    path="content/" + asset_path.value,
+                    fpath=asset_content.fpath,
+                    delete_fpath=True,
+                )
+            except BaseException:
+                asset_content.discard()
+                raise
+        else:
+            zim_writer.add_item_for(
+                path="content/" + asset_path.value,
+                content=asset_content.getvalue(),
+            )
+
+    def _get_header_data(
+        self, headers: requests.structures.CaseInsensitiveDict[str]
+    ) -> HeaderData:
+        """Extract HeaderData from response headers"""
+        content_type = headers.get("Content-Type", None)
+
+        for header in ("ETag", "Last-Modified", "Content-Length"):
+            if header := headers.get(header):
+                return HeaderData(ident=header, content_type=content_type)
+
+        return HeaderData(ident="-1", content_type=content_type)
 
     def _get_header_data_for(self, url: HttpUrl) -> HeaderData:
         """Get details from headers for a given url
@@ -204,70 +401,116 @@ class AssetProcessor:
             block_size=1,
             only_first_block=True,
         )
+        return self._get_header_data(headers)
 
-        content_type = headers.get("Content-Type", None)
-
-        for header in ("ETag", "Last-Modified", "Content-Length"):
-            if header := headers.get(header):
-                return HeaderData(ident=header, content_type=content_type)
+    def _should_probe_headers(self, asset_url: HttpUrl, kind: str | None) -> bool:
+        """Whether headers must be probed before downloading an asset
 
-        return HeaderData(ident="-1", content_type=content_type)
+        Ident found in headers allows to reuse an optimized image (from local or S3
+        cache, or previous ZIM) without downloading it. This is useless when there is
+        nothing to reuse from, or when asset is not expected to be an image: its mime
+        type is then decided from headers of the full download, saving one request.
+        """
+        if (
+            not context.s3_url_with_credentials
+            and not self.local_cache
+            and not self.previous_zim
+        ):
+            return False
+        if kind == "img":
+            return True
+        mime_type, _ = mimetypes.guess_type(urlsplit(asset_url.value).path)
+        return mime_type in SUPPORTED_IMAGE_MIME_TYPES
 
     def _get_image_content(
-        self, asset_path: ZimPath, asset_url: HttpUrl, header_data: HeaderData
+        self,
+        asset_path: ZimPath,
+        asset_url: HttpUrl,
+        header_data: HeaderData,
+        unoptimized: SpoolStream | None = None,
     ) -> BytesIO:
         """Get image content for a given url
 
-        - download from S3 cache if configured and available
+        - reuse from previous ZIM if configured and unchanged
+        - get from local cache if configured and available
+        - download from S3 cache if configured and available, and store it in local
+          cache if configured
         - otherwise:
-        - download from online
-        - convert to webp
-        - optimize webp
-        - upload to S3 cache if configured
+        - download from online, unless unoptimized content has already been downloaded
+        - transcode to webp, see transcode_image
+        - store in local cache and upload to S3 cache if configured
         """
         meta = {"ident": header_data.ident, "version": str(WebpMedium.VERSION)}
         s3_key = f"medium/{asset_path.value}"
 
+        # an unknown ident does not allow to detect changes, do not reuse / record it
+        reusable = header_data.ident != "-1"
+
+        if reusable and self.previous_zim:
+            if previous_data := self.previous_zim.get_image(asset_path.value, **meta):
+                logger.debug("Reused from previous ZIM")
+                self._record_image(asset_path, meta, reusable=reusable)
+                return BytesIO(previous_data)
+
+        if self.local_cache:
+            if local_data := self.local_cache.get(s3_key, meta):
+                logger.debug("Fetched directly from local cache")
+                self._record_image(asset_path, meta, reusable=reusable)
+                return BytesIO(local_data)
+
         if context.s3_url_with_credentials:
             if s3_data := self._download_from_s3_cache(s3_key=s3_key, meta=meta):
                 if len(s3_data.getvalue()) > 0:
                     logger.debug("Fetched directly from S3 cache")
+                    if self.local_cache:
+                        self.local_cache.set(s3_key, meta, s3_data.getvalue())
+                    self._record_image(asset_path, meta, reusable=reusable)
                     return s3_data  # found in cache
 
-        logger.debug("Fetching from online")
-        unoptimized = self._download_from_online(asset_url=asset_url)
+        if unoptimized is None:
+            logger.debug("Fetching from online")
+            unoptimized = self._download_from_online(asset_url=asset_url)
 
         logger.debug("Optimizing")
-        optimized = BytesIO()
-        with Image.open(unoptimized) as image:
-            if image.width * image.height <= context.maximum_image_pixels:
-                image.save(optimized, format="WEBP")
-            else:
-                resizeimage.resize_width(  # pyright: ignore[reportUnknownMemberType]
-                    image,
-                    int(
-                        math.sqrt(
-                            context.maximum_image_pixels * image.width / image.height
-                        )
-                    ),
-                ).save(optimized, format="WEBP")
+        try:
+            optimized = BytesIO(self._transcode_image(unoptimized.getvalue()))
+        finally:
+            unoptimized.discard()
         del unoptimized
 
-        optimize_webp(src=optimized, options=WEBP_OPTIONS)
+        if self.local_cache:
+            self.local_cache.set(s3_key, meta, optimized.getvalue())
 
-        if context.s3_url_with_credentials:
-            # upload optimized to S3
+        if self.s3_uploader:
+            # upload optimized to S3, in background
             logger.debug("Uploading to S3")
-            self._upload_to_s3_cache(
-                s3_key=s3_key,
-                meta=meta,
-                asset_content=BytesIO(
-                    optimized.getvalue()
-                ),  # use a copy because it will be "consumed" by botocore
-            )
+            self.s3_uploader.submit(s3_key, meta, optimized.getvalue())
 
+        self._record_image(asset_path, meta, reusable=reusable)
         return optimized
 
+    def _transcode_image(self, content: bytes) -> bytes:
+        """Transcode an image, in the pool of processes if set"""
+        kwargs = {
+            "max_pixels": context.maximum_image_pixels,
+            "max_decoded_bytes": context.maximum_image_decoded_bytes,
+        }
+        if not self.transcode_pool:
+            return transcode_image(content, **kwargs)
+        with self.transcode_slots:
+            return self.transcode_pool.submit(
+                transcode_image, content, **kwargs
+            ).result()
+
+    def _record_image(
+        self, asset_path: ZimPath, meta: dict[str, str], *, reusable: bool
+    ):
+        """Record an optimized image, so that it can be reused by a subsequent run"""
+        if not reusable:
+            return
+        with self.lock:
+            self.images[asset_path] = ManifestImage(**meta)
+
     def _download_from_s3_cache(
         self, s3_key: str, meta: dict[str, str]
     ) -> BytesIO | None:
@@ -287,6 +530,7 @@ class AssetProcessor:
     def _upload_to_s3_cache(
         self, s3_key: str, meta: dict[str, str], asset_content: BytesIO
     ):
+        """Upload content to S3 cache, called in S3 uploader threads"""
         if not self.s3_storage:
             raise AttributeError("s3 storage must be set")
         try:
@@ -296,16 +540,35 @@ class AssetProcessor:
         except Exception as exc:
             raise S3CacheError(f"Failed to upload {s3_key} to S3 cache") from exc
 
-    def _download_from_online(self, asset_url: HttpUrl) -> BytesIO:
+    def _download_from_online(self, asset_url: HttpUrl) -> SpoolStream:
         """Download whole content from online server with retry from scraperlib"""
 
-        asset_content = BytesIO()
-        stream_file(
-            asset_url.value,
-            byte_stream=asset_content,
-        )
+        asset_content, _ = self._download_with_header_data(asset_url)
         return asset_content
 
+    def _download_with_header_data(
+        self, asset_url: HttpUrl
+    ) -> tuple[SpoolStream, HeaderData]:
+        """Download whole content from online server, with details from its headers
+
+        Big contents are downloaded to a spool file instead of memory, see SpoolStream.
+        """
+
+        asset_content = SpoolStream(
+            max_memory_size=context.asset_spool_threshold_bytes,
+            folder=context.tmp_folder,
+        )
+        try:
+            _, headers = stream_file(
+                asset_url.value,
+                byte_stream=asset_content,
+            )
+        except BaseException:
+            asset_content.discard()
+            raise
+        asset_content.close()
+        return asset_content, self._get_header_data(headers)
+
     def _get_mime_type(
         self,
         header_data: HeaderData,
@@ -336,29 +599,26 @@ class AssetProcessor:
         kind: str | None,
         *,
         always_fetch_online: bool,
-    ) -> BytesIO:
-        """Download of a given asset, optimize if needed, or download from S3 cache"""
+    ) -> BytesIO | SpoolStream:
+        """Download of a given asset, optimize if needed, or download from S3 cache
 
-        try:
-            if not always_fetch_online:
-                header_data = self._get_header_data_for(asset_url)
-                mime_type = self._get_mime_type(
-                    header_data=header_data, asset_url=asset_url, kind=kind
-                )
-                if mime_type and mime_type in SUPPORTED_IMAGE_MIME_TYPES:
-                    return self._get_image_content(
-                        asset_path=asset_path,
-                        asset_url=asset_url,
-                        header_data=header_data,
-                    )
-                else:
-                    logger.debug(
-                        f"Not optimizing, unsupported mime type: {mime_type} for "
-                        f"{context.current_thread_workitem}"
-                    )
+        Raises HostCircuitOpenError without requesting asset host if it keeps failing.
+        """
 
-            return self._download_from_online(asset_url=asset_url)
+        host = urlsplit(asset_url.value).hostname or ""
+        self.circuit_breaker.check(host)
+        try:
+            content = self._get_asset_content(
+                asset_path=asset_path,
+                asset_url=asset_url,
+                kind=kind,
+                always_fetch_online=always_fetch_online,
+            )
         except RequestException as exc:
+            if is_host_failure(exc):
+                self.circuit_breaker.record_failure(host)
+            else:
+                self.circuit_breaker.record_success(host)
             # check if the failing download match known bad assets regex early, and if
             # so raise a custom exception to escape backoff (always important to try
             # once even if asset is expected to not work, but no need to loose time on
@@ -368,6 +628,55 @@ class AssetProcessor:
             ):
                 raise KnownBadAssetFailedError(exc) from exc
             raise
+        except Exception:
+            # host has answered, failure happened afterwards
+            self.circuit_breaker.record_success(host)
+            raise
+        self.circuit_breaker.record_success(host)
+        return content
+
+    def _get_asset_content(
+        self,
+        asset_path: ZimPath,
+        asset_url: HttpUrl,
+        kind: str | None,
+        *,
+        always_fetch_online: bool,
+    ) -> BytesIO | SpoolStream:
+        """Download of a given asset, without any failure handling"""
+        if not always_fetch_online:
+            # headers and content are fetched with a single request unless
+            # headers are needed to decide whether content must be downloaded
+            if self._should_probe_headers(asset_url=asset_url, kind=kind):
+                header_data = self._get_header_data_for(asset_url)
+                content = None
+            else:
+                content, header_data = self._download_with_header_data(asset_url)
+            mime_type = self._get_mime_type(
+                header_data=header_data, asset_url=asset_url, kind=kind
+            )
+            if mime_type and mime_type in SUPPORTED_IMAGE_MIME_TYPES:
+                try:
+                    return self._get_image_content(
+                        asset_path=asset_path,
+                        asset_url=asset_url,
+                        header_data=header_data,
+                        unoptimized=content,
+                    )
+                finally:
+                    # downloaded content is not needed anymore, even when
+                    # optimized image has been reused
+                    if content is not None:
+                        content.discard()
+            else:
+                logger.debug(
+                    f"Not optimizing, unsupported mime type: {mime_type} for "
+                    f"{context.current_thread_workitem}"
+                )
+            if content is not None:
+                return content
+
+        return self._download_from_online(asset_url=asset_url)
 
     def _setup_s3(self):
         if not context.s3_url_with_credentials:
@@ -0,0 +1,366 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import NamedTuple
+
+from mindtouch2zim.context import Context
+
+context = Context.get()
+logger = context.logger
+
+# access times of SQLite cache entries are kept in memory and written to the
+# database at most every ACCESSES_FLUSH_SECONDS, or once this many are pending
+ACCESSES_FLUSH_SECONDS = 10
+ACCESSES_FLUSH_MAX_PENDING = 1000
+
+
+class CacheEntry(NamedTuple):
+    content: bytes
+    # when the entry has been stored or last revalidated, as a POSIX timestamp
+    timestamp: float
+    # HTTP validators of the response, used to revalidate the entry
+    etag: str | None = None
+    last_modified: str | None = None
+
+
+class CacheBackend(ABC):
+    """Base class of backends used to cache HTTP responses
+
+    Backends must be thread-safe, since they are used concurrently by pages workers.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> CacheEntry | None:
+        """Return entry stored at key, or None if there is no such entry"""
+
+    @abstractmethod
+    def set(
+        self,
+        key: str,
+        content: bytes,
+        etag: str | None = None,
+        last_modified: str | None = None,
+    ):
+        """Store content and its validators at key, replacing any existing entry"""
+
+    @abstractmethod
+    def touch(self, key: str):
+        """Mark entry stored at key as revalidated now"""
+
+    def close(self):
+        """Release resources held by the backend"""
+        pass
+
+
+class FilesCache(CacheBackend):
+    """Cache backend storing every entry in its own plain file"""
+
+    def __init__(self, folder: Path) -> None:
+        self.folder = folder
+
+    def _get_file(self, key: str) -> Path:
+        """Get location where entry should be cached"""
+        key = re.sub(r"^/", "", key)
+        if key.endswith("/"):
+            key += "index"
+        return self.folder / key
+
+    def _get_validators_file(self, cache_file: Path) -> Path:
+        """Get location where validators of an entry are stored, next to the entry"""
+        return cache_file.with_name(f".{cache_file.name}.validators")
+
+    def get(self, key: str) -> CacheEntry | None:
+        cache_file = self._get_file(key)
+        if not cache_file.exists():
+            return None
+        validators_file = self._get_validators_file(cache_file)
+        validators: dict[str, str] = (
+            json.loads(validators_file.read_bytes()) if validators_file.exists() else {}
+        )
+        return CacheEntry(
+            content=cache_file.read_bytes(),
+            timestamp=cache_file.stat().st_mtime,
+            etag=validators.get("etag"),
+            last_modified=validators.get("last_modified"),
+        )
+
+    def _write_file(self, fpath: Path, content: bytes):
+        """Atomically write content to a file
+
+        Content is first written to a temporary file which is then renamed, so that
+        concurrent workers never read a partially written cache file
+        """
+        tmp_file = fpath.with_name(f".{fpath.name}.{threading.get_ident()}.tmp")
+        tmp_file.write_bytes(content)
+        tmp_file.replace(fpath)
+
+    def set(
+        self,
+        key: str,
+        content: bytes,
+        etag: str | None = None,
+        last_modified: str | None = None,
+    ):
+        cache_file = self._get_file(key)
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        validators_file = self._get_validators_file(cache_file)
+        if etag or last_modified:
+            self._write_file(
+                validators_file,
+                json.dumps({"etag": etag, "last_modified": last_modified}).encode(),
+            )
+        else:
+            validators_file.unlink(missing_ok=True)
+        self._write_file(cache_file, content)
+
+    def touch(self, key: str):
+        os.utime(self._get_file(key))
+
+
+class SqliteCache(CacheBackend):
+    """Cache backend storing all entries in a single SQLite file
+
+    Entries are compressed (unless compress is False, for content which is already
+    compressed), and least recently used entries are evicted once the total size of
+    stored entries exceeds max_size (if set).
+
+    Writes go through a single connection, under lock. Reads go through a connection
+    per thread and do not take this lock, so that cache hits are served concurrently
+    (SQLite WAL mode lets readers run alongside the writer). Access times used for
+    eviction are kept in memory and written in batches, so that hits do not write to
+    disk.
+    """
+
+    def __init__(
+        self, fpath: Path, max_size: int | None = None, *, compress: bool = True
+    ) -> None:
+        self.fpath = fpath
+        self.max_size = max_size
+        self.compress = compress
+        self.lock = threading.Lock()
+        # access times not yet written to the database, by key
+        self.pending_accesses: dict[str, float] = {}
+        self.accesses_lock = threading.Lock()
+        self.accesses_flushed_at = time.monotonic()
+        self.local = threading.local()
+        self.read_connections: list[sqlite3.Connection] = []
+        self.connection = sqlite3.connect(fpath, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, "
+            "content BLOB NOT NULL, "
+            "size INTEGER NOT NULL, "
+            "stored_at REAL NOT NULL, "
+            "accessed_at REAL NOT NULL, "
+            "etag TEXT, "
+            "last_modified TEXT, "
+            "compressed INTEGER NOT NULL DEFAULT 1)"
+        )
+        # add validators columns to caches created before they were introduced
+        columns = {
+            row[1] for row in self.connection.execute("PRAGMA table_info(entries)")
+        }
+        for column in ("etag", "last_modified"):
+            if column not in columns:
+                self.connection.execute(f"ALTER TABLE entries ADD COLUMN {column} TEXT")
+        # entries stored before compression became optional are all compressed
+        if "compressed" not in columns:
+            self.connection.execute(
+                "ALTER TABLE entries ADD COLUMN compressed INTEGER NOT NULL DEFAULT 1"
+            )
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries(accessed_at)"
+        )
+        self.connection.commit()
+        self.total_size: int = self.connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()[0]
+
+    def _get_read_connection(self) -> sqlite3.Connection:
+        """Connection of current thread, to read entries without taking the lock"""
+        connection: sqlite3.Connection | None = getattr(self.local, "connection", None)
+        if connection is None:
+            # closed by close, possibly from another thread
+            connection = sqlite3.connect(self.fpath, check_same_thread=False)
+            self.local.connection = connection
+            with self.lock:
+                self.read_connections.append(connection)
+        return connection
+
+    def get(self, key: str) -> CacheEntry | None:
+        row = (
+            self._get_read_connection()
+            .execute(
+                "SELECT content, stored_at, etag, last_modified, compressed "
+                "FROM entries WHERE key = ?",
+                (key,),
+            )
+            .fetchone()
+        )
+        if row is None:
+            return None
+        self._record_access(key)
+        return CacheEntry(
+            content=zlib.decompress(row[0]) if row[4] else row[0],
+            timestamp=row[1],
+            etag=row[2],
+            last_modified=row[3],
+        )
+
+    def set(
+        self,
+        key: str,
+        content: bytes,
+        etag: str | None = None,
+        last_modified: str | None = None,
+    ):
+        stored = zlib.compress(content) if self.compress else content
+        now = time.time()
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT size FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                self.total_size -= row[0]
+            self.connection.execute(
+                "INSERT OR REPLACE INTO entries (key, content, size, stored_at, "
+                "accessed_at, etag, last_modified, compressed) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    stored,
+                    len(stored),
+                    now,
+                    now,
+                    etag,
+                    last_modified,
+                    self.compress,
+                ),
+            )
+            self.total_size += len(stored)
+            self._evict()
+            self.connection.commit()
+
+    def touch(self, key: str):
+        now = time.time()
+        with self.lock:
+            self.connection.execute(
+                "UPDATE entries SET stored_at = ?, accessed_at = ? WHERE key = ?",
+                (now, now, key),
+            )
+            self.connection.commit()
+
+    def _record_access(self, key: str):
+        """Record that entry has just been read, writing pending accesses if due"""
+        with self.accesses_lock:
+            self.pending_accesses[key] = time.time()
+            if (
+                len(self.pending_accesses) < ACCESSES_FLUSH_MAX_PENDING
+                and time.monotonic() - self.accesses_flushed_at < ACCESSES_FLUSH_SECONDS
+            ):
+                return
+        with self.lock:
+            self._flush_accesses()
+            self.connection.commit()
+
+    def _flush_accesses(self):
+        """Write pending access times to the database, without committing
+
+        Must be called with the lock held
+        """
+        with self.accesses_lock:
+            pending_accesses, self.pending_accesses = self.pending_accesses, {}
+            self.accesses_flushed_at = time.monotonic()
+        self.connection.executemany(
+            "UPDATE entries SET accessed_at = ? WHERE key = ? AND accessed_at < ?",
+            (
+                (accessed_at, key, accessed_at)
+                for key, accessed_at in pending_accesses.items()
+            ),
+        )
+
+    def _evict(self):
+        """Evict least recently used entries until cache fits in max_size
+
+        Must be called with the lock held
+        """
+        if self.max_size is None or self.total_size <= self.max_size:
+            return
+        # least recently used entries must be known
+        self._flush_accesses()
+        evicted = 0
+        while self.total_size > self.max_size:
+            rows = self.connection.execute(
+                "SELECT key, size FROM entries ORDER BY accessed_at LIMIT 100"
+            ).fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                if self.total_size <= self.max_size:
+                    break
+                self.connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self.total_size -= size
+                evicted += 1
+        logger.debug(f"{evicted} entries evicted from {self.fpath}")
+
+    def close(self):
+        with self.lock:
+            self._flush_accesses()
+            self.connection.commit()
+            for connection in self.read_connections:
+                connection.close()
+            self.read_connections.clear()
+            self.connection.close()
+
+
+class LocalOptimizationCache:
+    """Local cache of optimized images, an alternative or a front tier to S3 cache
+
+    Entries are keyed like in S3 cache, and match only if they have been stored with
+    same metadata (ident of online image and version of optimization preset), which
+    are stored as entry ETag since they play the same role. Optimized images are
+    already compressed, they are stored as-is.
+    """
+
+    def __init__(self, fpath: Path, max_size: int | None = None) -> None:
+        fpath.parent.mkdir(parents=True, exist_ok=True)
+        self.backend = SqliteCache(fpath, max_size=max_size, compress=False)
+
+    def _get_etag(self, meta: dict[str, str]) -> str:
+        return json.dumps(meta, sort_keys=True)
+
+    def get(self, key: str, meta: dict[str, str]) -> bytes | None:
+        """Return content stored at key with same metadata, if any"""
+        entry = self.backend.get(key)
+        if entry is None or entry.etag != self._get_etag(meta):
+            return None
+        return entry.content
+
+    def set(self, key: str, meta: dict[str, str], content: bytes):
+        """Store content at key with its metadata, replacing any existing entry"""
+        self.backend.set(key, content, etag=self._get_etag(meta))
+
+    def close(self):
+        self.backend.close()
+
+
+def get_cache_backend() -> CacheBackend:
+    """Return the cache backend configured in context"""
+    if context.cache_backend == "files":
+        return FilesCache(context.cache_folder)
+    return SqliteCache(
+        context.cache_folder / "cache.sqlite",
+        max_size=(
+            context.cache_max_size_mb * 1024 * 1024
+            if context.cache_max_size_mb
+            else None
+        ),
+    )
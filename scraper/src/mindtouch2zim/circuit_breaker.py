@@ -0,0 +1,117 @@
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from requests.exceptions import ConnectionError as RequestsConnectionError
+from requests.exceptions import HTTPError, RequestException, Timeout
+
+from mindtouch2zim.context import Context
+from mindtouch2zim.errors import HostCircuitOpenError
+
+context = Context.get()
+logger = context.logger
+
+
+@dataclass
+class HostHealth:
+    consecutive_failures: int = 0
+    # when circuit has been opened, None while it is closed
+    opened_at: float | None = None
+    # whether a probe request is in progress while circuit is open
+    probing: bool = False
+    # whether circuit has been opened at least once
+    tripped: bool = False
+    # number of requests which failed fast because circuit was open
+    fast_failures: int = 0
+
+
+def is_host_failure(exc: RequestException) -> bool:
+    """Whether an exception means that the host is failing, not only the request
+
+    Host is failing when it cannot be reached, does not answer in time, or answers
+    with a server error ; a client error (e.g. 404) is specific to a given request.
+    """
+    if isinstance(exc, RequestsConnectionError | Timeout):
+        return True
+    if isinstance(exc, HTTPError) and exc.response is not None:
+        return exc.response.status_code >= 500  # noqa: PLR2004
+    return False
+
+
+class CircuitBreaker:
+    """Tracks health of hosts, to stop requesting hosts which keep failing
+
+    Once a host has failed max_failures consecutive times, its circuit is opened:
+    requests to this host fail fast with HostCircuitOpenError. Once every
+    cooldown_seconds, one probe request is let through: the circuit is closed if it
+    succeeds, and stays open for another cooldown period otherwise.
+
+    This class is thread-safe.
+    """
+
+    def __init__(
+        self,
+        max_failures: int,
+        cooldown_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_failures = max_failures
+        self.cooldown_seconds = cooldown_seconds
+        self.clock = clock
+        self.hosts: dict[str, HostHealth] = {}
+        self.lock = threading.Lock()
+
+    def check(self, host: str):
+        """Raise HostCircuitOpenError if host must not be requested now"""
+        with self.lock:
+            health = self.hosts.get(host)
+            if health is None or health.opened_at is None:
+                return
+            if (
+                not health.probing
+                and self.clock() - health.opened_at >= self.cooldown_seconds
+            ):
+                # let a probe through
+                health.probing = True
+                return
+            health.fast_failures += 1
+            raise HostCircuitOpenError(
+                f"{host} failed {health.consecutive_failures} consecutive times, not "
+                "requesting it for now"
+            )
+
+    def record_success(self, host: str):
+        """Record a successful request to host, closing its circuit if open"""
+        with self.lock:
+            health = self.hosts.get(host)
+            if health is None:
+                return
+            health.consecutive_failures = 0
+            health.opened_at = None
+            health.probing = False
+
+    def record_failure(self, host: str):
+        """Record a failed request to host, opening its circuit if needed"""
+        with self.lock:
+            health = self.hosts.setdefault(host, HostHealth())
+            health.consecutive_failures += 1
+            if health.probing or health.consecutive_failures >= self.max_failures:
+                if health.opened_at is None:
+                    logger.warning(
+                        f"{host} failed {health.consecutive_failures} consecutive "
+                        "times, not requesting it anymore until it recovers"
+                    )
+                health.opened_at = self.clock()
+                health.probing = False
+                health.tripped = True
+
+    @property
+    def tripped_hosts(self) -> dict[str, int]:
+        """Hosts whose circuit has been opened, with their number of fast failures"""
+        with self.lock:
+            return {
+                host: health.fast_failures
+                for host, health in self.hosts.items()
+                if health.tripped
+            }
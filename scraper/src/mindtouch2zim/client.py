@@ -1,19 +1,36 @@
+import copy
+import datetime
 import json
-import re
-from pathlib import Path
-from typing import Any
+import sys
+import threading
+import time
+from array import array
+from collections import deque
+from collections.abc import Callable, Iterator, Mapping, Sequence
+from functools import cached_property
+from http import HTTPStatus
+from typing import Any, NamedTuple
 
 from bs4 import BeautifulSoup, NavigableString
 from pydantic import BaseModel
 from requests import Response
 
+from mindtouch2zim.cache import CacheBackend, get_cache_backend
 from mindtouch2zim.context import Context
 from mindtouch2zim.errors import APITokenRetrievalError, MindtouchParsingError
 from mindtouch2zim.html_utils import get_soup
+from mindtouch2zim.rate_limiter import (
+    THROTTLING_STATUSES,
+    AdaptiveRateLimiter,
+    get_retry_after_seconds,
+)
 
 context = Context.get()
 logger = context.logger
 
+# number of times a request throttled by the server is sent before giving up
+MAX_THROTTLED_ATTEMPTS = 5
+
 
 class MindtouchHome(BaseModel):
     home_url: str
@@ -37,18 +54,69 @@ class LibraryPageDefinition(BaseModel):
 
     tags: list[str]
     parent_id: str | None
+    # identifies current version of page content (revision number or modification
+    # date), None if unknown
+    revision: str | None = None
+
+
+class LibraryPageContent(BaseModel):
+    """Content of a given library page"""
+
+    html_body: str
+
+
+class LibraryPage:
+    """Class holding information about a given library page on the library tree
+
+    This is a lightweight view on a page stored in a LibraryTree, attributes are read
+    from the tree arrays. There is only one view per page, so views can be compared by
+    identity.
+    """
+
+    __slots__ = ("_index", "_tree")
+
+    def __init__(self, tree: "LibraryTree", index: int) -> None:
+        self._tree = tree
+        self._index = index
+
+    @property
+    def id(self) -> LibraryPageId:
+        return self._tree.ids[self._index]
+
+    @property
+    def title(self) -> str:
+        return self._tree.titles[self._index]
+
+    @property
+    def path(self) -> str:
+        return self._tree.paths[self._index]
+
+    @property
+    def encoded_url(self) -> str:
+        return self._tree.encoded_urls[self._index]
+
+    @property
+    def parent(self) -> "LibraryPage | None":
+        parent_index = self._tree.parents[self._index]
+        return None if parent_index < 0 else self._tree.page_at(parent_index)
 
+    @property
+    def children(self) -> list["LibraryPage"]:
+        return [
+            self._tree.page_at(child_index)
+            for child_index in self._tree.iter_children_indexes(self._index)
+        ]
 
-class LibraryPage(BaseModel):
-    """Class holding information about a given library page on the library tree"""
+    @property
+    def definition(self) -> LibraryPageDefinition | None:
+        return self._tree.page_definitions.get(self._index)
 
-    id: LibraryPageId
-    title: str
-    path: str
-    parent: "LibraryPage | None" = None
-    children: list["LibraryPage"] = []
-    encoded_url: str
-    definition: LibraryPageDefinition | None = None
+    @definition.setter
+    def definition(self, value: LibraryPageDefinition | None):
+        if value is None:
+            self._tree.page_definitions.pop(self._index, None)
+        else:
+            self._tree.page_definitions[self._index] = value
 
     def __repr__(self) -> str:
         return (
@@ -60,41 +128,173 @@ class LibraryPage(BaseModel):
     @property
     def self_and_parents(self) -> list["LibraryPage"]:
         result: list[LibraryPage] = [self]
-        current = self
-        while current.parent is not None:
-            result.append(current.parent)
-            current = current.parent
+        parent_index = self._tree.parents[self._index]
+        while parent_index >= 0:
+            result.append(self._tree.page_at(parent_index))
+            parent_index = self._tree.parents[parent_index]
         return result
 
 
-class LibraryPageContent(BaseModel):
-    """Content of a given library page"""
+class LibraryPages(Mapping[LibraryPageId, LibraryPage]):
+    """Pages of a LibraryTree by id, in tree order (parents before children)"""
 
-    html_body: str
+    def __init__(self, tree: "LibraryTree", indexes: Sequence[int]) -> None:
+        self._tree = tree
+        self._indexes = indexes
+        self._sub_tree = len(indexes) != len(tree.ids)
+
+    def __getitem__(self, key: LibraryPageId) -> LibraryPage:
+        index = self._tree.indexes_by_id[key]
+        if self._sub_tree and index not in self._members:
+            raise KeyError(key)
+        return self._tree.page_at(index)
+
+    @cached_property
+    def _members(self) -> set[int]:
+        return set(self._indexes)
+
+    def __iter__(self) -> Iterator[LibraryPageId]:
+        ids = self._tree.ids
+        return (ids[index] for index in self._indexes)
 
+    def __len__(self) -> int:
+        return len(self._indexes)
 
-class LibraryTree(BaseModel):
-    """Class holding information about the tree of pages on a given library"""
 
-    root: LibraryPage
-    pages: dict[LibraryPageId, LibraryPage] = {}
+class LibraryTree:
+    """Class holding information about the tree of pages on a given library
+
+    Pages are stored in parallel arrays indexed by page position in the tree, and
+    parent / children relations are stored as integer indexes (parent, first child
+    and next sibling, -1 when there is none). Pages are exposed as LibraryPage
+    views, created on first access. Sub-trees share arrays of the tree they come from.
+    """
+
+    def __init__(self) -> None:
+        self.ids: list[LibraryPageId] = []
+        self.titles: list[str] = []
+        self.paths: list[str] = []
+        self.encoded_urls: list[str] = []
+        self.parents = array("i")
+        self.first_children = array("i")
+        self.next_siblings = array("i")
+        self.last_children = array("i")
+        self.indexes_by_id: dict[LibraryPageId, int] = {}
+        self.page_definitions: dict[int, LibraryPageDefinition] = {}
+        self._views: list[LibraryPage | None] = []
+        self._root_index = 0
+        self._indexes: Sequence[int] | None = None  # None for the whole tree
+
+    def add_page(
+        self,
+        page_id: LibraryPageId,
+        title: str,
+        path: str,
+        encoded_url: str,
+        parent_index: int = -1,
+    ) -> int:
+        """Add a page as last child of given parent, and return its index
+
+        Parents must be added before their children
+        """
+        index = len(self.ids)
+        self.ids.append(page_id)
+        self.titles.append(sys.intern(title))
+        self.paths.append(sys.intern(path))
+        self.encoded_urls.append(encoded_url)
+        self.parents.append(parent_index)
+        self.first_children.append(-1)
+        self.next_siblings.append(-1)
+        self.last_children.append(-1)
+        self._views.append(None)
+        self.indexes_by_id[page_id] = index
+        if parent_index >= 0:
+            if self.last_children[parent_index] < 0:
+                self.first_children[parent_index] = index
+            else:
+                self.next_siblings[self.last_children[parent_index]] = index
+            self.last_children[parent_index] = index
+        return index
+
+    def page_at(self, index: int) -> LibraryPage:
+        view = self._views[index]
+        if view is None:
+            view = self._views[index] = LibraryPage(self, index)
+        return view
+
+    def iter_children_indexes(self, index: int) -> Iterator[int]:
+        child_index = self.first_children[index]
+        while child_index >= 0:
+            yield child_index
+            child_index = self.next_siblings[child_index]
+
+    @property
+    def root(self) -> LibraryPage:
+        return self.page_at(self._root_index)
+
+    @property
+    def pages(self) -> LibraryPages:
+        return LibraryPages(
+            self, range(len(self.ids)) if self._indexes is None else self._indexes
+        )
 
     def sub_tree(self, subroot_id: LibraryPageId) -> "LibraryTree":
         """Returns a sub-tree, starting at give page id"""
-        new_root = self.pages[subroot_id]
-        tree = LibraryTree(root=new_root)
-        tree.pages[new_root.id] = new_root
-        children_to_explore = [*new_root.children]
-        while len(children_to_explore) > 0:
-            child = children_to_explore[0]
-            children_to_explore.remove(child)
-            if child.id in tree.pages:
-                continue  # safe-guard
-            tree.pages[child.id] = child
-            children_to_explore.extend(child.children)
+        if subroot_id not in self.pages:
+            raise KeyError(subroot_id)
+        subroot_index = self.indexes_by_id[subroot_id]
+        # walk sub-tree breadth-first
+        indexes = array("i")
+        to_explore = deque([subroot_index])
+        while to_explore:
+            index = to_explore.popleft()
+            indexes.append(index)
+            to_explore.extend(self.iter_children_indexes(index))
+        tree = copy.copy(self)
+        tree._root_index = subroot_index
+        tree._indexes = indexes
         return tree
 
 
+class _TreeNode(NamedTuple):
+    """A page node of the tree of pages, as returned by the API, without properties
+    not needed"""
+
+    id: Any
+    title: Any
+    path: Any
+    encoded_url: Any
+    children: "list[_TreeNode | Any]"
+
+
+# properties identifying a page node in the tree of pages
+_PAGE_NODE_PROPERTIES = frozenset(("@id", "title", "uri.ui", "subpages"))
+
+
+def _prune_tree_node(node: dict[str, Any]) -> Any:
+    """Replace page nodes of the tree of pages by their needed properties
+
+    Used as JSON object hook, page nodes are pruned as soon as they are decoded (their
+    subpages being already pruned), so that the whole tree is never stored as dicts.
+    """
+    if _PAGE_NODE_PROPERTIES.isdisjoint(node):
+        return node
+    path = node.get("path")
+    subpages = node.get("subpages")
+    children = subpages.get("page", []) if isinstance(subpages, dict) else []
+    return _TreeNode(
+        id=node.get("@id"),
+        title=node.get("title"),
+        path=path.get("#text") if isinstance(path, dict) else path,
+        encoded_url=node.get("uri.ui"),
+        children=(
+            children
+            if isinstance(children, list)
+            else [children] if isinstance(children, _TreeNode) else []
+        ),
+    )
+
+
 class MindtouchClient:
     """Utility functions to read data from mindtouch instance."""
 
@@ -106,49 +306,138 @@ class MindtouchClient:
                 e.g. `https://geo.libretexts.org`.
         """
         self.deki_token = None
+        # definitions of pages already retrieved, by page id
+        self._definitions: dict[LibraryPageId, LibraryPageDefinition] = {}
+        # cover page already resolved, by page id, when walking the tree of pages
+        self._cover_pages: dict[LibraryPageId, LibraryPage | None] = {}
+        # cover page id already resolved, by page id, when walking definitions
+        self._cover_pages_ids: dict[LibraryPageId, LibraryPageId | None] = {}
+        # trees of pages already parsed, by ID of the page at the root of the tree,
+        # and ID of this root page by requested page (e.g. "home")
+        self._page_trees: dict[LibraryPageId, LibraryTree] = {}
+        self._page_trees_roots: dict[str, LibraryPageId] = {}
+        self._page_trees_lock = threading.Lock()
+        # paces requests to the library, at the rate accepted by the server
+        self.rate_limiter = AdaptiveRateLimiter(max_rps=context.api_max_rps)
 
     @property
     def api_url(self) -> str:
         return f"{context.library_url}/@api/deki"
 
-    def _get_cache_file(self, url_subpath_and_query: str) -> Path:
-        """Get location where HTTP result should be cached"""
-        url_subpath_and_query = re.sub(r"^/", "", url_subpath_and_query)
-        if url_subpath_and_query.endswith("/"):
-            url_subpath_and_query += "index"
-        return context.cache_folder / url_subpath_and_query
+    @cached_property
+    def cache(self) -> CacheBackend:
+        """Cache of HTTP responses, created on first use"""
+        return get_cache_backend()
+
+    def close(self):
+        """Release resources held by the client"""
+        if "cache" in self.__dict__:
+            self.cache.close()
+
+    def _get_cached(
+        self,
+        cache_key: str,
+        fetch: Callable[[dict[str, str]], Response],
+        content_of: Callable[[Response], bytes] = lambda resp: resp.content,
+    ) -> bytes:
+        """Return content from cache, or fetch it when missing or stale
+
+        Stale entries (older than context.cache_max_age) are revalidated with a
+        conditional request based on stored validators (ETag / Last-Modified), so
+        that unchanged content costs only a response without body (HTTP 304).
+
+        fetch: function performing the HTTP request with additional headers passed
+        content_of: function returning the content to cache from the HTTP response
+        """
+        cache_entry = self.cache.get(cache_key)
+        if cache_entry and (
+            context.cache_max_age is None
+            or time.time() - cache_entry.timestamp <= context.cache_max_age
+        ):
+            return cache_entry.content
+
+        headers: dict[str, str] = {}
+        if cache_entry and cache_entry.etag:
+            headers["If-None-Match"] = cache_entry.etag
+        if cache_entry and cache_entry.last_modified:
+            headers["If-Modified-Since"] = cache_entry.last_modified
+
+        resp = fetch(headers)
+        if cache_entry and resp.status_code == HTTPStatus.NOT_MODIFIED:
+            logger.debug(f"Cached {cache_key} is still valid")
+            self.cache.touch(cache_key)
+            return cache_entry.content
+
+        content = content_of(resp)
+        self.cache.set(
+            cache_key,
+            content,
+            etag=resp.headers.get("ETag"),
+            last_modified=resp.headers.get("Last-Modified"),
+        )
+        return content
+
+    def _get(self, url: str, **kwargs: Any) -> Response:
+        """Perform a GET request to the library, at the pace accepted by the server
+
+        Throttled requests (HTTP 429 / 503) are sent again, after the delay asked
+        by the server if any, up to MAX_THROTTLED_ATTEMPTS times.
+        """
+        attempts = 0
+        while True:
+            attempts += 1
+            self.rate_limiter.acquire()
+            resp = context.web_session.get(url=url, **kwargs)
+            self.rate_limiter.record_response(
+                resp.status_code,
+                latency=resp.elapsed.total_seconds(),
+                retry_after=get_retry_after_seconds(
+                    resp.headers.get("Retry-After"),
+                    now=datetime.datetime.now(datetime.UTC),
+                ),
+            )
+            if (
+                resp.status_code not in THROTTLING_STATUSES
+                or attempts >= MAX_THROTTLED_ATTEMPTS
+            ):
+                break
+            logger.debug(f"Request to {url} throttled with HTTP {resp.status_code}")
+        resp.raise_for_status()
+        return resp
 
     def _get_text(self, url_subpath_and_query: str) -> str:
         """Perform a GET request and return the response as decoded text."""
 
-        cache_file = self._get_cache_file(f"text{url_subpath_and_query}")
-        if cache_file.exists():
-            return cache_file.read_text()
-        cache_file.parent.mkdir(parents=True, exist_ok=True)
-
         full_url = f"{context.library_url}{url_subpath_and_query}"
-        logger.debug(f"Fetching {full_url}")
 
-        resp = context.web_session.get(
-            url=full_url,
-            allow_redirects=True,
-            timeout=context.http_timeout_normal_seconds,
-        )
-        resp.raise_for_status()
+        def fetch(headers: dict[str, str]) -> Response:
+            logger.debug(f"Fetching {full_url}")
+            return self._get(
+                full_url,
+                headers=headers,
+                allow_redirects=True,
+                timeout=context.http_timeout_normal_seconds,
+            )
 
-        cache_file.write_text(resp.text)
-        return resp.text
+        return self._get_cached(
+            f"text{url_subpath_and_query}",
+            fetch=fetch,
+            content_of=lambda resp: resp.text.encode("utf-8"),
+        ).decode("utf-8")
 
-    def _get_api_resp(self, api_sub_path_and_query: str, timeout: float) -> Response:
+    def _get_api_resp(
+        self,
+        api_sub_path_and_query: str,
+        timeout: float,
+        headers: dict[str, str] | None = None,
+    ) -> Response:
         api_url = f"{self.api_url}{api_sub_path_and_query}"
         logger.debug(f"Calling API at {api_url}")
-        resp = context.web_session.get(
-            url=api_url,
-            headers={"x-deki-token": self.deki_token},
+        return self._get(
+            api_url,
+            headers={**(headers or {}), "x-deki-token": self.deki_token},
             timeout=timeout,
         )
-        resp.raise_for_status()
-        return resp
 
     def _get_api_json(
         self,
@@ -156,30 +445,38 @@ class MindtouchClient:
         query_params: str = "",
         timeout: float = context.http_timeout_normal_seconds,
     ) -> Any:
-        cache_file = self._get_cache_file(f"api_json{api_sub_path}{query_params}.dat")
-        if cache_file.exists():
-            return json.loads(cache_file.read_text())
-        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        return json.loads(
+            self._get_api_json_raw(api_sub_path, query_params, timeout=timeout)
+        )
+
+    def _get_api_json_raw(
+        self,
+        api_sub_path: str,
+        query_params: str = "",
+        timeout: float = context.http_timeout_normal_seconds,
+    ) -> bytes:
+        """Returns JSON returned by the API, not yet parsed"""
+        cache_key = f"api_json{api_sub_path}{query_params}.dat"
         if query_params:
             query_params = f"&{query_params}"
-        resp = self._get_api_resp(
-            f"{api_sub_path}?dream.out.format=json{query_params}", timeout=timeout
+        return self._get_cached(
+            cache_key,
+            fetch=lambda headers: self._get_api_resp(
+                f"{api_sub_path}?dream.out.format=json{query_params}",
+                timeout=timeout,
+                headers=headers,
+            ),
         )
-        result = resp.json()
-        cache_file.write_text(json.dumps(result))
-        return result
 
     def _get_api_content(
         self, api_sub_path: str, timeout: float = context.http_timeout_normal_seconds
     ) -> bytes | Any:
-        cache_file = self._get_cache_file(f"api_content{api_sub_path}")
-        if cache_file.exists():
-            return cache_file.read_bytes()
-        cache_file.parent.mkdir(parents=True, exist_ok=True)
-        resp = self._get_api_resp(api_sub_path, timeout=timeout)
-        result = resp.content
-        cache_file.write_bytes(result)
-        return result
+        return self._get_cached(
+            f"api_content{api_sub_path}",
+            fetch=lambda headers: self._get_api_resp(
+                api_sub_path, timeout=timeout, headers=headers
+            ),
+        )
 
     def get_home(self) -> MindtouchHome:
         """Retrieves data about home page by crawling home page"""
@@ -210,75 +507,72 @@ class MindtouchClient:
 
     def get_all_pages_ids(self) -> list[LibraryPageId]:
         """Returns the IDs of all pages on current website, exploring the whole tree"""
-
-        tree = self._get_api_json(
-            "/pages/home/tree", timeout=context.http_timeout_long_seconds
-        )
-
-        page_ids: list[LibraryPageId] = []
-
-        def _get_page_ids(page_node: Any) -> None:
-            page_ids.append(page_node["@id"])
-            if not page_node["subpages"]:
-                return
-            if "@id" in page_node["subpages"]["page"]:
-                _get_page_ids(page_node["subpages"]["page"])
-            else:
-                for page in page_node["subpages"]["page"]:
-                    _get_page_ids(page)
-
-        _get_page_ids(tree["page"])
-
-        return page_ids
+        return list(self.get_page_tree().pages.keys())
 
     def get_root_page_id(self) -> LibraryPageId:
         """Returns the ID the root of the tree of pages"""
-
-        tree = self._get_api_json(
-            "/pages/home/tree", timeout=context.http_timeout_long_seconds
-        )
-        return tree["page"]["@id"]
+        return self.get_page_tree().root.id
 
     def get_page_tree(self, page: str = "home") -> LibraryTree:
+        """Returns the tree of pages starting at a given page
 
-        tree_data = self._get_api_json(
-            f"/pages/{page}/tree", timeout=context.http_timeout_long_seconds
-        )
-
-        root = LibraryPage(
-            id=tree_data["page"]["@id"],
-            title=tree_data["page"]["title"],
-            path=tree_data["page"]["path"]["#text"],
-            encoded_url=tree_data["page"]["uri.ui"],
-        )
-        tree_obj = LibraryTree(root=root)
-        tree_obj.pages[root.id] = root
-
-        def _add_page(page_node: Any, parent: LibraryPage) -> LibraryPage:
-            page = LibraryPage(
-                id=page_node["@id"],
-                title=page_node["title"],
-                path=page_node["path"]["#text"],
-                encoded_url=page_node["uri.ui"],
-                parent=parent,
+        Tree is parsed only once, and kept in memory for subsequent calls, be it
+        requested with "home" or with the ID of its root page
+        """
+        with self._page_trees_lock:
+            root_id = self._page_trees_roots.get(page, page)
+            if root_id not in self._page_trees:
+                tree = self._parse_page_tree(
+                    self._get_api_json_raw(
+                        f"/pages/{page}/tree", timeout=context.http_timeout_long_seconds
+                    )
+                )
+                root_id = tree.root.id
+                self._page_trees[root_id] = tree
+            self._page_trees_roots[page] = root_id
+            return self._page_trees[root_id]
+
+    def _parse_page_tree(self, tree_data: bytes) -> LibraryTree:
+        """Parse the tree of pages from the raw JSON returned by the API
+
+        Page nodes are pruned as soon as they are decoded, so that the whole tree is
+        never stored as dicts, and then walked iteratively. Every page node looks like
+        (other properties are ignored):
+        {"@id": "12", "title": "...", "path": {"#text": "..."}, "uri.ui": "...",
+         "subpages": {"page": <page node or list of page nodes>} or ""}
+        """
+        tree_json = json.loads(tree_data, object_hook=_prune_tree_node)
+        if not isinstance(tree_json, dict) or not isinstance(
+            tree_json.get("page"), _TreeNode  # pyright: ignore[reportUnknownMemberType]
+        ):
+            raise MindtouchParsingError("No page found in tree")
+        tree_obj = LibraryTree()
+        # page nodes still to add with index of their parent, next one is last ; nodes
+        # are added in document order, so that parents come before their children ;
+        # nodes are released once added
+        to_add: list[tuple[_TreeNode | Any, int]] = [(tree_json.pop("page"), -1)]
+        while to_add:
+            node, parent_index = to_add.pop()
+            if not isinstance(node, _TreeNode):
+                raise MindtouchParsingError(f"Unexpected page node in tree: {node!r}")
+            if (
+                node.id is None
+                or node.title is None
+                or node.path is None
+                or node.encoded_url is None
+            ):
+                raise MindtouchParsingError(
+                    f"Incomplete page node in tree: id={node.id!r}, "
+                    f"title={node.title!r}, path={node.path!r}"
+                )
+            index = tree_obj.add_page(
+                page_id=node.id,
+                title=node.title,
+                path=node.path,
+                encoded_url=node.encoded_url,
+                parent_index=parent_index,
             )
-            parent.children.append(page)
-            tree_obj.pages[page.id] = page
-            return page
-
-        def _process_tree_data(page_node: Any, parent: LibraryPage) -> None:
-            if not page_node["subpages"]:
-                return
-            if "@id" in page_node["subpages"]["page"]:
-                page = _add_page(page_node["subpages"]["page"], parent=parent)
-                _process_tree_data(page_node["subpages"]["page"], parent=page)
-            else:
-                for subpage_node in page_node["subpages"]["page"]:
-                    page = _add_page(subpage_node, parent=parent)
-                    _process_tree_data(subpage_node, parent=page)
-
-        _process_tree_data(tree_data["page"], parent=root)
-
+            to_add.extend((child, index) for child in reversed(node.children))
         return tree_obj
 
     def get_page_content(self, page: LibraryPage) -> LibraryPageContent:
@@ -320,6 +614,11 @@ class MindtouchClient:
         else:
             page_id = page.id
 
+        if page_definition := self._definitions.get(page_id):
+            if not isinstance(page, str):
+                page.definition = page_definition
+            return page_definition
+
         raw_definition = self._get_api_json(
             f"/pages/{page_id}", timeout=context.http_timeout_normal_seconds
         )
@@ -336,11 +635,18 @@ class MindtouchClient:
 
         parent = raw_definition.get("page.parent", None)
 
+        revision = raw_definition.get("@revision", None) or raw_definition.get(
+            "date.modified", None
+        )
+
         page_definition = LibraryPageDefinition(
-            tags=tags, parent_id=None if parent is None else parent["@id"]
+            tags=tags,
+            parent_id=None if parent is None else parent["@id"],
+            revision=None if revision is None else str(revision),
         )
 
-        if isinstance(page, LibraryPage):
+        self._definitions[page_id] = page_definition
+        if not isinstance(page, str):
             page.definition = page_definition
 
         return page_definition
@@ -355,23 +661,32 @@ class MindtouchClient:
         https://github.com/LibreTexts/Libretext/blob/master/public/Miscellaneous/reuse.js
 
         See https://github.com/openzim/mindtouch/issues/68 for a copy of original code
+
+        Result is memoized for every page walked through, so that siblings and
+        children of an already resolved page do not need any walk. Definitions are
+        retrieved one parent after the other, so that pages above the cover page are
+        never requested.
         """
+        walked_pages: list[LibraryPage] = []
         current_page = page
         while True:
+            if current_page.id in self._cover_pages:
+                cover_page = self._cover_pages[current_page.id]
+                break
+            walked_pages.append(current_page)
             current_definition = self.get_page_definition(current_page)
-            if (
-                "coverpage:yes" in current_definition.tags
-                or "coverpage:toc" in current_definition.tags
-                or "coverpage:nocommons" in current_definition.tags
-            ):
-                return current_page
-            if (
-                "article:topic-category" in current_definition.tags
-                or current_page.parent is None
-            ):
-                return None
+            if _is_cover_page(current_definition):
+                cover_page = current_page
+                break
+            if _is_topic_category(current_definition) or current_page.parent is None:
+                cover_page = None
+                break
             current_page = current_page.parent
 
+        for walked_page in walked_pages:
+            self._cover_pages[walked_page.id] = cover_page
+        return cover_page
+
     def _get_cover_page_from_str_id(self, page_id: str) -> str | None:
         """Get the cover page ID of a given page identifier as string
 
@@ -382,23 +697,32 @@ class MindtouchClient:
         https://github.com/LibreTexts/Libretext/blob/master/public/Miscellaneous/reuse.js
 
         See https://github.com/openzim/mindtouch/issues/68 for a copy of original code
+
+        Result is memoized for every page walked through.
         """
+        walked_pages: list[LibraryPageId] = []
         current_page = page_id
         while True:
+            if current_page in self._cover_pages_ids:
+                cover_page = self._cover_pages_ids[current_page]
+                break
+            walked_pages.append(current_page)
             current_definition = self.get_page_definition(current_page)
+            if _is_cover_page(current_definition):
+                cover_page = current_page
+                break
             if (
-                "coverpage:yes" in current_definition.tags
-                or "coverpage:toc" in current_definition.tags
-                or "coverpage:nocommons" in current_definition.tags
-            ):
-                return current_page
-            if (
-                "article:topic-category" in current_definition.tags
+                _is_topic_category(current_definition)
                 or current_definition.parent_id is None
             ):
-                return None
+                cover_page = None
+                break
             current_page = current_definition.parent_id
 
+        for walked_page in walked_pages:
+            self._cover_pages_ids[walked_page] = cover_page
+        return cover_page
+
     def get_cover_page_encoded_url(self, page: LibraryPage) -> str | None:
         """Returns the url for the book page for a given child page"""
         cover_page = self.get_cover_page(page)
@@ -406,11 +730,10 @@ class MindtouchClient:
 
     def get_cover_page_id(self, page: LibraryPage | str) -> str | None:
         """Returns the id for the book page for a given child page"""
-        if isinstance(page, LibraryPage):
-            cover_page = self.get_cover_page(page)
-            return cover_page.id if cover_page is not None else None
-        else:
+        if isinstance(page, str):
             return self._get_cover_page_from_str_id(page)
+        cover_page = self.get_cover_page(page)
+        return cover_page.id if cover_page is not None else None
 
     def get_template_content(self, page_id: str, template: str) -> str:
         """Returns the templated content of a given page"""
@@ -431,6 +754,20 @@ class MindtouchClient:
         return tree["body"]
 
 
+def _is_cover_page(definition: LibraryPageDefinition) -> bool:
+    """Returns True if page definition is the one of a cover page"""
+    return (
+        "coverpage:yes" in definition.tags
+        or "coverpage:toc" in definition.tags
+        or "coverpage:nocommons" in definition.tags
+    )
+
+
+def _is_topic_category(definition: LibraryPageDefinition) -> bool:
+    """Returns True if page definition is the one of a topic category"""
+    return "article:topic-category" in definition.tags
+
+
 def _get_welcome_image_url_from_home(soup: BeautifulSoup) -> str:
     """Return the URL of the image found on home header"""
     branding_div = soup.find("div", class_="LTBranding")
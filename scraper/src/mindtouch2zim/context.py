@@ -46,6 +46,16 @@ class Context:
     # temporary folder to store cached API response
     cache_folder: Path
 
+    # backend used to cache API responses, either "sqlite" or "files"
+    cache_backend: str = "sqlite"
+
+    # maximum size of cached API responses, in MB (no limit if None)
+    cache_max_size_mb: int | None = None
+
+    # maximum age of cached API responses, in seconds, before they are revalidated
+    # (never revalidated if None)
+    cache_max_age: int | None = None
+
     # folder where the ZIM will be built
     output_folder: Path = Path(os.getenv("MINDTOUCH_OUTPUT", "/output"))
 
@@ -61,8 +71,38 @@ class Context:
     # Do not fail if ZIM already exists, overwrite it
     overwrite_existing_zim: bool = False
 
-    # number of assets processed in parallel
+    # number of assets downloaded in parallel, overall and from a single host
     assets_workers: int = 10
+    assets_workers_per_host: int = 5
+
+    # whether number of assets workers is tuned while assets are processed, starting
+    # from assets_workers, within these bounds and this memory usage
+    assets_workers_auto: bool = False
+    assets_workers_auto_min: int = 2
+    assets_workers_auto_max: int = 64
+    assets_workers_auto_max_rss_mb: int = 2048
+
+    # assets bigger than this are downloaded to a spool file and added to the ZIM from
+    # this file, instead of being held in memory
+    asset_spool_threshold_bytes: int = 10 * 1024 * 1024
+
+    # maximum size of items content waiting to be added to the ZIM, pages and assets
+    # workers wait once it is reached
+    zim_writer_max_queued_bytes: int = 100 * 1024 * 1024
+
+    # number of processes transcoding images, defaults to number of available cores
+    image_processes: int = os.process_cpu_count() or 1
+
+    # number of pages fetched and rewritten in parallel
+    pages_workers: int = 10
+
+    # maximum number of requests per second to the library, requests are not limited
+    # until the server asks to slow down when not set
+    api_max_rps: float | None = None
+
+    # number of processes rewriting pages HTML, to use many CPU cores (0 to rewrite
+    # HTML in pages workers threads)
+    rewrite_processes: int = 0
 
     # known bad assets
     bad_assets_regex: re.Pattern[str] = re.compile(STANDARD_KNOWN_BAD_ASSETS_REGEX)
@@ -83,6 +123,21 @@ class Context:
     # S3 cache URL
     s3_url_with_credentials: str | None = None
 
+    # number of concurrent uploads to S3 cache, done in background, and maximum size
+    # of content waiting to be uploaded (further uploads are skipped)
+    s3_upload_workers: int = 4
+    s3_upload_max_queued_bytes: int = 50 * 1024 * 1024
+
+    # number of consecutive failures after which a host is not requested anymore,
+    # and delay after which a single probe request is let through to check if it is
+    # back
+    circuit_breaker_max_failures: int = 10
+    circuit_breaker_cooldown_seconds: float = 60
+
+    # local cache of optimized images, reused between runs on the same host
+    local_optimization_cache: Path | None = None
+    local_optimization_cache_max_size_mb: int | None = None
+
     # URL to Mindtouch instance
     library_url: str
 
@@ -105,9 +160,15 @@ class Context:
     page_title_exclude: re.Pattern[str] | None = None
     root_page_id: str | None = None
 
+    # previous ZIM of same library, to reuse content which has not changed
+    previous_zim: Path | None = None
+
     # Maximum number of pixels of images that will be pushed to the ZIM
     maximum_image_pixels: int = 1280 * 720
 
+    # Maximum memory used to decode an image, bigger images are not decoded at all
+    maximum_image_decoded_bytes: int = 256 * 1024 * 1024
+
     # logger to use everywhere (do not mind about mutability, we want to reuse same
     # logger everywhere)
     logger: logging.Logger = getLogger(  # noqa: RUF009
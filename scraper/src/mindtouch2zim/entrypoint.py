@@ -8,7 +8,6 @@ from zimscraperlib.constants import (
     MAXIMUM_LONG_DESCRIPTION_METADATA_LENGTH,
     RECOMMENDED_MAX_TITLE_LENGTH,
 )
-from zimscraperlib.download import get_session
 
 from mindtouch2zim.constants import (
     NAME,
@@ -16,6 +15,15 @@ from mindtouch2zim.constants import (
     VERSION,
 )
 from mindtouch2zim.context import MINDTOUCH_TMP, Context
+from mindtouch2zim.http_session import get_web_session
+
+
+def _positive_int(value: str) -> int:
+    """Parse a command line value which must be a strictly positive integer"""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
 
 
 def prepare_context(raw_args: list[str], tmpdir: str) -> None:
@@ -149,6 +157,31 @@ def prepare_context(raw_args: list[str], tmpdir: str) -> None:
         dest="tmp_folder",
     )
 
+    parser.add_argument(
+        "--cache-backend",
+        help="Backend used to cache API responses: 'sqlite' stores all responses "
+        "compressed in a single file, 'files' stores every response in its own file."
+        f" Default: {Context.cache_backend!s}",
+        choices=["sqlite", "files"],
+    )
+
+    parser.add_argument(
+        "--cache-max-size",
+        type=int,
+        help="Maximum size of the API responses cache, in MB. Least recently used "
+        "responses are evicted once this size is exceeded. Only supported by 'sqlite' "
+        "cache backend. Default: unlimited",
+        dest="cache_max_size_mb",
+    )
+
+    parser.add_argument(
+        "--cache-max-age",
+        type=int,
+        help="Maximum age of cached API responses, in seconds. Older responses are "
+        "revalidated with the server (conditional request with ETag / Last-Modified), "
+        "and downloaded again only if they have changed. Default: never revalidated",
+    )
+
     parser.add_argument("--debug", help="Enable verbose output", action="store_true")
 
     parser.add_argument(
@@ -171,16 +204,78 @@ def prepare_context(raw_args: list[str], tmpdir: str) -> None:
         help="URL to illustration to use for ZIM illustration and favicon",
     )
 
+    parser.add_argument(
+        "--previous-zim",
+        type=Path,
+        help="Path to a previous ZIM of the same library. Pages which have not been "
+        "modified since this ZIM was built are reused instead of being fetched and "
+        "rewritten again. Pages revisions are recorded only when this option is set, "
+        "so it is fine to pass a path which does not exist yet (e.g. on first run).",
+    )
+
     parser.add_argument(
         "--optimization-cache",
         help="URL with credentials to S3 for using as optimization cache",
         dest="s3_url_with_credentials",
     )
 
+    parser.add_argument(
+        "--local-optimization-cache",
+        type=Path,
+        help="Path to a local SQLite file used as optimization cache, alone or in "
+        "front of S3 optimization cache, to reuse optimized images between runs on "
+        "the same host",
+    )
+
+    parser.add_argument(
+        "--local-optimization-cache-max-size",
+        type=int,
+        help="Maximum size of the local optimization cache, in MB. Least recently "
+        "used images are evicted once this size is exceeded. Default: unlimited",
+        dest="local_optimization_cache_max_size_mb",
+    )
+
     parser.add_argument(
         "--assets-workers",
+        type=lambda x: x if x == "auto" else _positive_int(x),
+        help="Number of parallel workers for asset downloading. With `auto`, number "
+        "of workers is tuned while assets are downloaded, to maximize throughput",
+    )
+
+    parser.add_argument(
+        "--assets-workers-per-host",
+        type=_positive_int,
+        help="Maximum number of parallel workers downloading assets from the same "
+        "host, so that a slow host does not hold all assets workers",
+    )
+
+    parser.add_argument(
+        "--image-processes",
+        type=_positive_int,
+        help="Number of processes transcoding images, separately from assets "
+        "workers. Defaults to the number of available CPU cores.",
+    )
+
+    parser.add_argument(
+        "--pages-workers",
+        type=_positive_int,
+        help="Number of parallel workers for pages fetching and rewriting",
+    )
+
+    parser.add_argument(
+        "--api-max-rps",
+        type=float,
+        help="Maximum number of requests per second to the library. Pace of requests "
+        "is adapted to the server anyway, slowing down when it answers slowly or asks "
+        "to (HTTP 429 / 503, Retry-After header)",
+    )
+
+    parser.add_argument(
+        "--rewrite-processes",
         type=int,
-        help="Number of parallel workers for asset processing",
+        help="Number of processes rewriting pages HTML and extracting text to index, "
+        "to use multiple CPU cores on big libraries. By default, HTML is rewritten by "
+        "pages workers threads.",
     )
 
     parser.add_argument(
@@ -208,7 +303,12 @@ def prepare_context(raw_args: list[str], tmpdir: str) -> None:
     args = parser.parse_args(raw_args)
 
     # Ignore unset values so they do not override the default specified in Context
-    args_dict = {key: value for key, value in args._get_kwargs() if value}
+    # (but keep falsy values explicitly set, e.g. --cache-max-age 0)
+    args_dict = {key: value for key, value in args._get_kwargs() if value is not None}
+
+    if args_dict.get("assets_workers") == "auto":
+        del args_dict["assets_workers"]
+        args_dict["assets_workers_auto"] = True
 
     # initialize some context properties that are "dynamic" (i.e. not constant
     # values like an int, a string, ...)
@@ -219,7 +319,13 @@ def prepare_context(raw_args: list[str], tmpdir: str) -> None:
             args_dict["tmp_folder"] = Path(tmpdir)
 
     args_dict["cache_folder"] = args_dict["tmp_folder"] / "cache"
-    args_dict["web_session"] = get_session()
+    # keep alive as many connections to a single host as there might be concurrent
+    # requests to it
+    args_dict["web_session"] = get_web_session(
+        library_url=args_dict["library_url"],
+        pool_maxsize=args_dict.get("pages_workers", Context.pages_workers)
+        + args_dict.get("assets_workers_per_host", Context.assets_workers_per_host),
+    )
     args_dict["_current_thread_workitem"] = threading.local()
 
     Context.setup(**args_dict)
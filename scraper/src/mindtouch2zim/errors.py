@@ -48,3 +48,15 @@ class APITokenRetrievalError(Exception):
     """Exception raised when failing to retrieve API token to query website API"""
 
     pass
+
+
+class ImageTooLargeError(Exception):
+    """Raised when an image is too large to be decoded within memory limits"""
+
+    pass
+
+
+class HostCircuitOpenError(Exception):
+    """Raised when a host is not requested anymore since it keeps failing"""
+
+    pass
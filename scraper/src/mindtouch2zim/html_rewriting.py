@@ -14,7 +14,6 @@ from zimscraperlib.rewriting.url_rewriting import (
 )
 
 from mindtouch2zim.asset import AssetManager
-from mindtouch2zim.client import LibraryPage
 from mindtouch2zim.context import Context
 from mindtouch2zim.utils import is_better_srcset_descriptor
 from mindtouch2zim.vimeo import get_vimeo_thumbnail_url
@@ -62,7 +61,7 @@ def rewrite_href_src_srcset_attributes(
             new_attr_value = f"#/{relative_path}"
         elif rewrite_result.rewriten_url.startswith("#"):
             new_attr_value = (
-                f"#/{url_rewriter.page.path}?anchor={rewrite_result.rewriten_url[1:]}"
+                f"#/{url_rewriter.page_path}?anchor={rewrite_result.rewriten_url[1:]}"
             )
         else:
             new_attr_value = rewrite_result.rewriten_url
@@ -161,24 +160,35 @@ class HtmlUrlsRewriter(ArticleUrlRewriter):
     def __init__(
         self,
         library_url: str,
-        page: LibraryPage,
+        page_path: str,
         existing_zim_paths: set[ZimPath],
         asset_manager: AssetManager,
     ):
         super().__init__(
-            article_url=HttpUrl(f"{library_url}/{page.path}"),
+            article_url=HttpUrl(f"{library_url}/{page_path}"),
             article_path=ZimPath("index.html"),
             existing_zim_paths=existing_zim_paths,
         )
         self.library_url = library_url
         self.library_path = ArticleUrlRewriter.normalize(HttpUrl(f"{library_url}/"))
-        self.page = page
+        self.page_path = page_path
         self.asset_manager = asset_manager
+        # paths of all assets added by this rewriter
+        self.asset_paths: set[ZimPath] = set()
+        # paths of library pages linked by this rewriter, links are rewritten based
+        # on their presence in the ZIM
+        self.link_paths: set[ZimPath] = set()
 
     def __call__(
         self, item_url: str, base_href: str | None, *, rewrite_all_url: bool = True
     ) -> RewriteResult:
         result = super().__call__(item_url, base_href, rewrite_all_url=rewrite_all_url)
+        if (
+            not rewrite_all_url
+            and result.zim_path is not None
+            and result.zim_path.value.startswith(self.library_path.value)
+        ):
+            self.link_paths.add(result.zim_path)
         return result
 
     def add_item_to_download(self, rewrite_result: RewriteResult, kind: str | None):
@@ -187,6 +197,7 @@ class HtmlUrlsRewriter(ArticleUrlRewriter):
             return
         # if item is expected to be inside the ZIM, store asset information so that
         # we can download it afterwards
+        self.asset_paths.add(rewrite_result.zim_path)
         self.asset_manager.add_asset(
             asset_path=rewrite_result.zim_path,
             asset_url=HttpUrl(rewrite_result.absolute_url),
@@ -1,4 +1,11 @@
+from typing import Any
+
 from bs4 import BeautifulSoup
+from lxml import etree
+
+# tags whose strings are not text data for BeautifulSoup (they are parsed as special
+# strings, e.g. Script or RubyTextString, which are ignored by getText)
+NON_TEXT_TAGS = frozenset(["rt", "rp", "style", "script", "template"])
 
 
 def get_soup(content: str) -> BeautifulSoup:
@@ -9,9 +16,70 @@ def get_soup(content: str) -> BeautifulSoup:
     return BeautifulSoup(content, "lxml")
 
 
+class TextExtractor:
+    """lxml parser target collecting text data of an HTML document
+
+    Parser events are processed on-the-fly, no tree is built. Strings are delimited
+    and filtered like BeautifulSoup does when building its tree, so that extracted text
+    is identical to `get_soup(content).getText("\\n", strip=True)`.
+    """
+
+    def __init__(self) -> None:
+        self.strings: list[str] = []
+        # data received since last tag boundary, which BeautifulSoup merges in a
+        # single string
+        self.current_data: list[str] = []
+        # number of currently opened tags whose strings are not text data
+        self.non_text_depth = 0
+
+    def _end_data(self):
+        if not self.current_data:
+            return
+        string = "".join(self.current_data).strip()
+        if string:
+            self.strings.append(string)
+        self.current_data.clear()
+
+    def start(self, tag: str, attrib: Any, nsmap: Any = None):  # noqa: ARG002
+        self._end_data()
+        if tag in NON_TEXT_TAGS:
+            self.non_text_depth += 1
+
+    def end(self, tag: str):
+        self._end_data()
+        if tag in NON_TEXT_TAGS:
+            self.non_text_depth -= 1
+
+    def data(self, data: str):
+        if not self.non_text_depth:
+            self.current_data.append(data)
+
+    def comment(self, text: str):  # noqa: ARG002
+        self._end_data()
+
+    def doctype(self, *args: Any):  # noqa: ARG002
+        self._end_data()
+
+    def pi(self, *args: Any):  # noqa: ARG002
+        self._end_data()
+
+    def close(self) -> str:
+        self._end_data()
+        return "\n".join(self.strings)
+
+
 def get_text(content: str) -> str:
     """Return text data from HTML content
 
-    This is typically meant to extract content to index in the ZIM
+    This is typically meant to extract content to index in the ZIM. Content is parsed
+    with same parser and settings than BeautifulSoup, but in a single streaming pass
+    which does not build any tree.
     """
-    return get_soup(content).getText("\n", strip=True)
+    parser = etree.HTMLParser(
+        target=TextExtractor(),
+        recover=True,
+        encoding=None,  # pyright: ignore[reportArgumentType]
+    )
+    # content must be fed in one go, libxml2 might parse it differently otherwise
+    parser.feed(content)
+    return parser.close()
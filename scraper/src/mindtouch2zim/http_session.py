@@ -0,0 +1,93 @@
+import threading
+from typing import Any, NamedTuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool
+
+# maximum number of hosts whose connections are kept alive at once, assets are
+# typically downloaded from many hosts at once
+MAX_HOSTS_POOLS = 100
+
+
+class PoolsStats(NamedTuple):
+    requests: int  # number of requests made
+    connections: int  # number of connections opened
+
+    @property
+    def reused_ratio(self) -> float:
+        """Share of requests made over an already opened (kept alive) connection"""
+        return 1 - self.connections / self.requests if self.requests else 0
+
+
+class StatsHTTPAdapter(HTTPAdapter):
+    """HTTP adapter keeping track of requests made and connections opened
+
+    name: describes which requests go through this adapter, for reporting
+    """
+
+    def __init__(self, name: str, **kwargs: Any) -> None:
+        self.name = name
+        # stats of pools which have been discarded (when too many hosts are used)
+        self.discarded_stats = PoolsStats(requests=0, connections=0)
+        self.stats_lock = threading.Lock()
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args: Any, **kwargs: Any):
+        super().init_poolmanager(*args, **kwargs)
+        pools = self.poolmanager.pools
+        dispose_func = pools.dispose_func
+
+        def dispose_pool(pool: HTTPConnectionPool):
+            with self.stats_lock:
+                self.discarded_stats = PoolsStats(
+                    requests=self.discarded_stats.requests + pool.num_requests,
+                    connections=self.discarded_stats.connections + pool.num_connections,
+                )
+            if dispose_func:
+                dispose_func(pool)
+
+        pools.dispose_func = dispose_pool
+
+    @property
+    def stats(self) -> PoolsStats:
+        """Stats of all requests made through this adapter so far"""
+        pools = self.poolmanager.pools
+        # container is not iterable (not thread-safe), so values are read under lock
+        with pools.lock:
+            current_pools: list[HTTPConnectionPool] = list(
+                pools._container.values()  # pyright: ignore[reportPrivateUsage]
+            )
+        with self.stats_lock:
+            return PoolsStats(
+                requests=self.discarded_stats.requests
+                + sum(pool.num_requests for pool in current_pools),
+                connections=self.discarded_stats.connections
+                + sum(pool.num_connections for pool in current_pools),
+            )
+
+
+def get_web_session(library_url: str, pool_maxsize: int) -> requests.Session:
+    """Web session with connection pools sized for the scraper concurrency
+
+    pool_maxsize: maximum number of connections kept alive to a single host, i.e.
+      maximum number of concurrent requests to a single host ; beyond this,
+      connections are discarded once used instead of being kept alive
+
+    Library requests go through their own adapter, so that they are reported
+    separately from requests to other hosts.
+    """
+    session = requests.Session()
+    other_hosts_adapter = StatsHTTPAdapter(
+        name="other hosts",
+        pool_connections=MAX_HOSTS_POOLS,
+        pool_maxsize=pool_maxsize,
+    )
+    session.mount("http://", other_hosts_adapter)
+    session.mount("https://", other_hosts_adapter)
+    # longest prefix is used first ; library URL might still have a trailing slash
+    session.mount(
+        f"{library_url.rstrip('/')}/",
+        StatsHTTPAdapter(name="library", pool_connections=1, pool_maxsize=pool_maxsize),
+    )
+    return session
@@ -0,0 +1,139 @@
+from pathlib import Path
+
+from libzim.reader import (  # pyright: ignore[reportMissingModuleSource]
+    Archive,
+)
+from pydantic import BaseModel
+from zimscraperlib.rewriting.url_rewriting import ZimPath
+
+from mindtouch2zim.client import LibraryPageId
+from mindtouch2zim.constants import VERSION
+from mindtouch2zim.context import Context
+from mindtouch2zim.ui import PageContentModel
+
+context = Context.get()
+logger = context.logger
+
+# path of the build manifest inside the ZIM
+MANIFEST_PATH = "content/build_manifest.json"
+
+
+class ManifestAsset(BaseModel):
+    """Details about an asset, as needed to add it again to a subsequent ZIM"""
+
+    urls: list[str]
+    kind: str | None
+    always_fetch_online: bool
+
+
+class ManifestPage(BaseModel):
+    """Details about a page, as needed to reuse it in a subsequent ZIM"""
+
+    # None if revision has not been retrieved, page will be reusable once it is known
+    revision: str | None
+    assets: list[str]  # paths of assets used by this page
+    # paths of library pages linked by this page, and whether they were in the ZIM
+    links: dict[str, bool] = {}
+
+
+class ManifestImage(BaseModel):
+    """Details about an optimized image, as needed to reuse it in a subsequent ZIM"""
+
+    ident: str  # ~version~ of the online image, see HeaderData
+    version: str  # version of the optimization preset used
+
+
+class BuildManifest(BaseModel):
+    """Scraper details about ZIM content, stored inside the ZIM itself
+
+    This is not used by the ZIM UI, but by subsequent scraper runs to reuse content
+    which has not changed since this ZIM has been built.
+    """
+
+    # version of the scraper which rewrote pages HTML
+    scraper_version: str | None = None
+    pages: dict[LibraryPageId, ManifestPage] = {}
+    assets: dict[str, ManifestAsset] = {}
+    images: dict[str, ManifestImage] = {}
+
+
+class PreviousZim:
+    """A previously built ZIM, opened read-only to reuse its content"""
+
+    def __init__(self, fpath: Path) -> None:
+        self.archive = Archive(fpath)
+        if self.archive.has_entry_by_path(MANIFEST_PATH):
+            self.manifest = BuildManifest.model_validate_json(
+                bytes(self.archive.get_entry_by_path(MANIFEST_PATH).get_item().content)
+            )
+        else:
+            logger.warning(
+                f"No build manifest found in previous ZIM at {fpath}, nothing will be "
+                "reused"
+            )
+            self.manifest = BuildManifest()
+        logger.info(
+            f"Previous ZIM at {fpath} has {len(self.manifest.pages)} reusable pages"
+        )
+
+    def discard_stale_pages(self):
+        """Do not reuse any page if scraper version has changed
+
+        Pages HTML might be rewritten differently by another scraper version.
+        """
+        if self.manifest.pages and self.manifest.scraper_version != VERSION:
+            logger.info(
+                f"Previous ZIM has been built by scraper version "
+                f"{self.manifest.scraper_version}, no page will be reused"
+            )
+            self.manifest.pages = {}
+
+    def has_page(self, page_id: LibraryPageId) -> bool:
+        """Return True if page might be reused, depending on its current revision"""
+        return page_id in self.manifest.pages
+
+    def get_page(
+        self, page_id: LibraryPageId, revision: str, existing_zim_paths: set[ZimPath]
+    ) -> tuple[ManifestPage, str] | None:
+        """Return manifest details and HTML body of a page, if it can be reused
+
+        A page can be reused only if it has the same revision than in previous ZIM and
+        if pages it links to are still in (or still out of) the ZIM, since links are
+        rewritten based on this.
+        """
+        manifest_page = self.manifest.pages.get(page_id)
+        if manifest_page is None or manifest_page.revision != revision:
+            return None
+        if any(
+            (ZimPath(link_path) in existing_zim_paths) != in_zim
+            for link_path, in_zim in manifest_page.links.items()
+        ):
+            logger.debug(f"Pages linked by page {page_id} have been added or removed")
+            return None
+        path = f"content/page_content_{page_id}.json"
+        if not self.archive.has_entry_by_path(path):
+            return None
+        return (
+            manifest_page,
+            PageContentModel.model_validate_json(
+                bytes(self.archive.get_entry_by_path(path).get_item().content)
+            ).html_body,
+        )
+
+    def get_image(self, asset_path: str, ident: str, version: str) -> bytes | None:
+        """Return optimized image content, if it can be reused
+
+        An image can be reused only if online image has the same ident and has been
+        optimized with the same preset version than in previous ZIM.
+        """
+        manifest_image = self.manifest.images.get(asset_path)
+        if (
+            manifest_image is None
+            or manifest_image.ident != ident
+            or manifest_image.version != version
+        ):
+            return None
+        path = f"content/{asset_path}"
+        if not self.archive.has_entry_by_path(path):
+            return None
+        return bytes(self.archive.get_entry_by_path(path).get_item().content)
@@ -2,10 +2,15 @@ import datetime
 import json
 import logging
 import re
+import threading
+import time
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from http import HTTPStatus
 from io import BytesIO
 from pathlib import Path
-from typing import Any
+from typing import Any, NamedTuple
 
 import backoff
 from jinja2 import Environment, FileSystemLoader, select_autoescape
@@ -35,7 +40,10 @@ from zimscraperlib.zim.filesystem import (
 )
 from zimscraperlib.zim.indexing import IndexData
 
-from mindtouch2zim.asset import AssetManager, AssetProcessor
+from mindtouch2zim.asset import (
+    AssetManager,
+    AssetProcessor,
+)
 from mindtouch2zim.client import (
     LibraryPage,
     LibraryPageId,
@@ -53,10 +61,20 @@ from mindtouch2zim.download import stream_file
 from mindtouch2zim.errors import NoIllustrationFoundError
 from mindtouch2zim.html_rewriting import HtmlUrlsRewriter
 from mindtouch2zim.html_utils import get_text
+from mindtouch2zim.http_session import StatsHTTPAdapter
 from mindtouch2zim.libretexts.detailed_licensing import rewrite_detailed_licensing
 from mindtouch2zim.libretexts.glossary import rewrite_glossary
 from mindtouch2zim.libretexts.index import rewrite_index
 from mindtouch2zim.libretexts.table_of_content import rewrite_table_of_content
+from mindtouch2zim.previous_zim import (
+    MANIFEST_PATH,
+    BuildManifest,
+    ManifestAsset,
+    ManifestPage,
+    PreviousZim,
+)
+from mindtouch2zim.rewrite_processes import create_rewrite_pool, rewrite_page
+from mindtouch2zim.transcoding import create_transcode_pool
 from mindtouch2zim.ui import (
     ConfigModel,
     PageContentModel,
@@ -64,6 +82,14 @@ from mindtouch2zim.ui import (
     SharedModel,
 )
 from mindtouch2zim.utils import backoff_hdlr
+from mindtouch2zim.workers import (
+    TUNING_INTERVAL_SECONDS,
+    WorkersPool,
+    WorkersSample,
+    WorkersTuner,
+    get_rss_bytes,
+)
+from mindtouch2zim.zim_writer import ZimWriter
 from mindtouch2zim.zimconfig import ZimConfig
 
 context = Context.get()
@@ -84,42 +110,63 @@ class ContentFilter(BaseModel):
 
     def filter(self, page_tree: LibraryTree) -> list[LibraryPage]:
         """Filters pages based on the user's choices."""
+        return list(self.filter_iter(page_tree))
+
+    def filter_iter(self, page_tree: LibraryTree) -> Iterator[LibraryPage]:
+        """Filters pages based on the user's choices, lazily and in tree order.
+
+        Selected pages are marked with their parents, stopping as soon as an already
+        marked parent is met, so that every page is marked at most once.
+        """
 
         if self.root_page_id:
             page_tree = page_tree.sub_tree(self.root_page_id)
 
-        def is_selected(
-            title_include_re: re.Pattern[str] | None,
-            title_exclude_re: re.Pattern[str] | None,
-            id_include: list[LibraryPageId] | None,
-            page: LibraryPage,
-        ) -> bool:
+        id_include = set(self.page_id_include) if self.page_id_include else None
+
+        def is_selected(page: LibraryPage) -> bool:
             return (
                 (
-                    not title_include_re
-                    or title_include_re.search(page.title) is not None
+                    not self.page_title_include
+                    or self.page_title_include.search(page.title) is not None
                 )
                 and (not id_include or page.id in id_include)
                 and (
-                    not title_exclude_re or title_exclude_re.search(page.title) is None
+                    not self.page_title_exclude
+                    or self.page_title_exclude.search(page.title) is None
                 )
             )
 
-        # Find selected pages and their parent, and create a set of unique ids
-        selected_ids = {
-            selected_page.id
-            for page in page_tree.pages.values()
-            for selected_page in page.self_and_parents
-            if is_selected(
-                self.page_title_include,
-                self.page_title_exclude,
-                self.page_id_include,
-                page,
-            )
-        }
+        # Mark selected pages and their parents
+        selected_ids: set[LibraryPageId] = set()
+        for page in page_tree.pages.values():
+            if page.id in selected_ids or not is_selected(page):
+                continue
+            current_page = page
+            while current_page is not None and current_page.id not in selected_ids:
+                selected_ids.add(current_page.id)
+                current_page = current_page.parent
+
+        # Then return marked pages, in tree order
+        for page in page_tree.pages.values():
+            if page.id in selected_ids:
+                yield page
+
 
-        # Then transform set of ids into list of pages
-        return [page for page in page_tree.pages.values() if page.id in selected_ids]
+class ProcessedPage(NamedTuple):
+    """Result of a page processing, ready to be added to the ZIM"""
+
+    page: LibraryPage
+    html_body: str  # rewritten HTML
+    text: str  # text content to index
+    asset_paths: set[ZimPath]  # assets used by the page
+    # paths of library pages linked by the page, and whether they are in the ZIM
+    links: dict[str, bool]
+    # whether the page can be reused as-is in a subsequent ZIM (special pages
+    # depending on other pages cannot)
+    reusable: bool = False
+    # revision of the page content, if known
+    revision: str | None = None
 
 
 class Processor:
@@ -131,12 +178,19 @@ class Processor:
         self.mindtouch_client = MindtouchClient()
         self.asset_processor = AssetProcessor()
         self.asset_manager = AssetManager()
-        self.asset_executor = Parallel(
-            n_jobs=context.assets_workers,
+        self.pages_executor = Parallel(
+            n_jobs=context.pages_workers,
             return_as="generator_unordered",
             backend="threading",
             timeout=600,  # fallback timeout of 10 minutes, should something go wrong
         )
+        # previous ZIM to reuse unchanged content from, and manifest of current ZIM
+        self.previous_zim: PreviousZim | None = None
+        self.build_manifest = BuildManifest()
+        # pages found to be private (or private pages children), and pages which
+        # have been processed (events set by pages workers)
+        self.private_pages: set[LibraryPageId] = set()
+        self.pages_processed: dict[LibraryPageId, threading.Event] = {}
 
         self.stats_items_done = 0
         # we add 1 more items to process so that progress is not 100% at the beginning
@@ -144,6 +198,16 @@ class Processor:
         # increase counter at the beginning of every for loop, not minding about what
         # could happen in the loop in terms of exit conditions
         self.stats_items_total = 1
+        # assets are counted separately since they are processed in dedicated threads
+        self.stats_assets_done = 0
+        self.stats_assets_total = 0
+        self.stats_lock = threading.Lock()
+        # pool of processes rewriting pages HTML, if enabled
+        self.rewrite_pool: ProcessPoolExecutor | None = None
+        # error which occured while processing assets, if any
+        self.assets_error: BaseException | None = None
+        # thread adding items to the ZIM while pages and assets are processed
+        self.zim_writer: ZimWriter | None = None
 
     def run(self) -> Path:
         """Generates a zim for a single document.
@@ -210,6 +274,18 @@ class Processor:
         zim_file_name = f"{self.formatted_config.file_name}.zim"
         zim_path = context.output_folder / zim_file_name
 
+        # open previous ZIM before potentially overwriting it
+        if context.previous_zim:
+            if context.previous_zim.exists():
+                logger.info(f"  Opening previous ZIM at {context.previous_zim}")
+                self.previous_zim = PreviousZim(context.previous_zim)
+                self.asset_processor.previous_zim = self.previous_zim
+            else:
+                logger.warning(
+                    f"  No previous ZIM found at {context.previous_zim}, nothing will "
+                    "be reused"
+                )
+
         if zim_path.exists():
             if context.overwrite_existing_zim:
                 zim_path.unlink()
@@ -298,6 +374,9 @@ class Processor:
             except Exception:
                 creator.can_finish = False
                 raise
+            finally:
+                self.mindtouch_client.close()
+                self.asset_processor.close()
 
         if creator.can_finish:
             logger.info(f"ZIM creation completed, ZIM is at {zim_path}")
@@ -423,6 +502,81 @@ class Processor:
             ).model_dump_json(by_alias=True),
         )
 
+        # assets are downloaded by assets workers as soon as they are discovered,
+        # while pages are processed ; images are transcoded in a separate pool of
+        # processes, so that downloads and transcoding do not compete for the GIL
+        logger.info(f"Transcoding images in {context.image_processes} processes")
+        transcode_pool = create_transcode_pool(context.image_processes)
+        self.asset_processor.transcode_pool = transcode_pool
+        try:
+            self._process_pages_and_assets(creator, selected_pages)
+        finally:
+            transcode_pool.shutdown(cancel_futures=True)
+            self.asset_processor.transcode_pool = None
+
+        self.asset_processor.flush_s3_uploads()
+        self._report_assets_hosts()
+        self._report_connections()
+
+        if self.asset_processor.bad_assets_count:
+            logger.warning(
+                f"{self.asset_processor.bad_assets_count} bad assets have been "
+                "ignored"
+            )
+
+        if tripped_hosts := self.asset_processor.circuit_breaker.tripped_hosts:
+            logger.warning(
+                f"{self.asset_processor.unavailable_host_assets_count} assets have "
+                "been ignored because their host kept failing: "
+                + ", ".join(
+                    f"{host} ({fast_failures} requests skipped)"
+                    for host, fast_failures in tripped_hosts.items()
+                )
+            )
+
+        self._add_build_manifest_to_zim(creator)
+
+    def _process_pages_and_assets(
+        self, creator: Creator, selected_pages: list[LibraryPage]
+    ):
+        """Process all selected pages and assets they use, and add them to the ZIM
+
+        Items are added to the ZIM by a dedicated writer thread, the only one using
+        the creator meanwhile.
+        """
+        zim_writer = ZimWriter(creator, context.zim_writer_max_queued_bytes)
+        zim_writer.start()
+        self.zim_writer = zim_writer
+        self.assets_error = None
+        assets_thread = threading.Thread(
+            target=self._process_assets, args=(zim_writer,), name="assets"
+        )
+        assets_thread.start()
+        try:
+            self._process_pages(zim_writer, selected_pages)
+        except BaseException:
+            self.asset_manager.close(cancel=True)
+            assets_thread.join()
+            zim_writer.close(cancel=True)
+            self.zim_writer = None
+            raise
+        self.asset_manager.close()
+
+        logger.info(
+            f"  Retrieving remaining assets (out of {len(self.asset_manager.assets)} "
+            "assets)..."
+        )
+        context.current_thread_workitem = "assets"
+        while assets_thread.is_alive():
+            assets_thread.join(timeout=1)
+            run_pending()
+        zim_writer.close(cancel=self.assets_error is not None)
+        self.zim_writer = None
+        if self.assets_error:
+            raise self.assets_error
+
+    def _process_pages(self, zim_writer: ZimWriter, selected_pages: list[LibraryPage]):
+        """Process all selected pages and add them to the ZIM"""
         logger.info("Fetching pages content")
         context.current_thread_workitem = "pages content"
         # compute the list of existing pages to properly rewrite links leading
@@ -432,54 +586,150 @@ class Processor:
             ArticleUrlRewriter.normalize(HttpUrl(f"{context.library_url}/{page.path}"))
             for page in selected_pages
         }
-        private_pages: list[LibraryPage] = []
-        for page in selected_pages:
+        self.build_manifest.scraper_version = VERSION
+        if self.previous_zim:
+            self.previous_zim.discard_stale_pages()
+        # pages are processed in parallel by pages workers, while current thread is
+        # the only one writing pages to the ZIM ; private pages and their children are
+        # ignored, so every page has to wait for its parent to be processed before
+        # knowing if it should be processed as well
+        self.private_pages = set()
+        self.pages_processed = {page.id: threading.Event() for page in selected_pages}
+        if context.rewrite_processes:
+            logger.info(
+                f"Rewriting pages HTML in {context.rewrite_processes} processes"
+            )
+            self.rewrite_pool = create_rewrite_pool(existing_html_pages)
+        try:
+            self._process_pages_with_workers(
+                zim_writer, selected_pages, existing_html_pages
+            )
+        finally:
+            if self.rewrite_pool:
+                self.rewrite_pool.shutdown(cancel_futures=True)
+                self.rewrite_pool = None
+
+    def _process_pages_with_workers(
+        self,
+        zim_writer: ZimWriter,
+        selected_pages: list[LibraryPage],
+        existing_html_pages: set[ZimPath],
+    ):
+        res: Any = self.pages_executor(
+            delayed(self._process_page_unless_private)(
+                page=page,
+                existing_zim_paths=existing_html_pages,
+                is_root=page is selected_pages[0],
+            )
+            for page in selected_pages
+        )
+        for processed_page in res:
             self.stats_items_done += 1
             run_pending()
-            try:
-                if page.parent and page.parent in private_pages:
-                    logger.debug(f"Ignoring page {page.id} (private page child)")
-                    private_pages.append(page)
-                    continue
-                self._process_page(
-                    creator=creator,
-                    page=page,
-                    existing_zim_paths=existing_html_pages,
-                )
-            except HTTPError as exc:
-                if exc.response.status_code == HTTPStatus.FORBIDDEN:
-                    if page == selected_pages[0]:
-                        raise PermissionError(
-                            "Root page is private, we cannot ZIM it, stopping"
-                        ) from None
-                    logger.debug(f"Ignoring page {page.id} (private page)")
-                    private_pages.append(page)
-                    continue
-        logger.info(f"{len(private_pages)} private pages have been ignored")
-        if len(private_pages) == len(selected_pages):
+            if self.assets_error:
+                raise self.assets_error
+            if processed_page is None:
+                continue
+            self._add_page_to_zim(zim_writer=zim_writer, processed_page=processed_page)
+        logger.info(f"{len(self.private_pages)} private pages have been ignored")
+        if len(self.private_pages) == len(selected_pages):
             # we should never get here since we already check fail early if root
             # page is private, but we are better safe than sorry
             raise OSError("All pages have been ignored, not creating an empty ZIM")
-        del private_pages
+        self.pages_processed.clear()
 
-        logger.info(f"  Retrieving {len(self.asset_manager.assets)} assets...")
-        context.current_thread_workitem = "assets"
-        self.stats_items_total += len(self.asset_manager.assets)
+    def _process_assets(self, zim_writer: ZimWriter):
+        """Download and add to the ZIM assets as they are discovered
 
-        res: Any = self.asset_executor(
-            delayed(self.asset_processor.process_asset)(
-                asset_path, asset_details, creator
-            )
-            for asset_path, asset_details in self.asset_manager.assets.items()
+        Runs in a dedicated thread until asset manager is closed, errors are stored to
+        be raised by main thread.
+
+        Assets are processed by a pool of assets_workers threads, each one taking next
+        asset from the asset manager, which hands them out fairly across hosts. With
+        assets_workers_auto, number of threads is tuned while assets are processed.
+        """
+        pool = WorkersPool(
+            target=partial(self._process_next_asset, zim_writer),
+            name="assets",
+            count=context.assets_workers,
         )
-        for _ in res:
-            self.stats_items_done += 1
-            run_pending()
+        if not context.assets_workers_auto:
+            pool.join()
+            return
+        tuner = WorkersTuner(
+            workers=context.assets_workers,
+            min_workers=context.assets_workers_auto_min,
+            max_workers=context.assets_workers_auto_max,
+            max_rss_bytes=context.assets_workers_auto_max_rss_mb * 1024 * 1024,
+        )
+        while not pool.join(timeout=TUNING_INTERVAL_SECONDS):
+            pool.resize(
+                tuner.update(
+                    WorkersSample(
+                        items_done=self.stats_assets_done,
+                        items_failed=self.asset_processor.bad_assets_count
+                        + self.asset_processor.unavailable_host_assets_count,
+                        items_queued=self.asset_manager.scheduler.queued_count,
+                        rss_bytes=get_rss_bytes(),
+                    )
+                )
+            )
+        logger.info(f"Assets have been processed by {tuner.workers} workers at last")
 
-        if self.asset_processor.bad_assets_count:
-            logger.warning(
-                f"{self.asset_processor.bad_assets_count} bad assets have been "
-                "ignored"
+    def _process_next_asset(self, zim_writer: ZimWriter) -> bool:
+        """Process next queued asset, return False once there is no more asset"""
+        try:
+            if (queued := self.asset_manager.get_queued()) is None:
+                return False
+            asset_path, _ = queued
+            with self.stats_lock:
+                self.stats_assets_total += 1
+            start = time.perf_counter()
+            succeeded = True
+            try:
+                succeeded = self.asset_processor.process_asset(
+                    asset_path, self.asset_manager, zim_writer
+                )
+            finally:
+                self.asset_manager.asset_done(
+                    asset_path, time.perf_counter() - start, failed=not succeeded
+                )
+            with self.stats_lock:
+                self.stats_assets_done += 1
+            return True
+        except BaseException as exc:
+            with self.stats_lock:
+                if self.assets_error is None:
+                    self.assets_error = exc
+            # stop other workers, like the first error stops the whole scrape
+            self.asset_manager.close(cancel=True)
+            return False
+
+    def _report_connections(self, level: int = logging.INFO):
+        """Log how many requests have been made over kept alive connections"""
+        for adapter in context.web_session.adapters.values():
+            if not isinstance(adapter, StatsHTTPAdapter):
+                continue
+            stats = adapter.stats
+            logger.log(
+                level,
+                f"  HTTP requests to {adapter.name}: {stats.requests} requests over "
+                f"{stats.connections} connections ({stats.reused_ratio:.0%} reused)",
+            )
+
+    def _report_assets_hosts(self):
+        """Log how many assets have been downloaded from each host, and how fast"""
+        hosts_stats = sorted(
+            self.asset_manager.scheduler.stats.items(),
+            key=lambda host_stats: host_stats[1].items_done,
+            reverse=True,
+        )
+        for index, (host, stats) in enumerate(hosts_stats):
+            # only busiest hosts are reported at info level
+            logger.log(
+                logging.INFO if index < 10 else logging.DEBUG,  # noqa: PLR2004
+                f"  {stats.items_done} assets processed from {host or 'unknown host'}"
+                f", {stats.average_seconds:.2f}s per asset on average",
             )
 
     def _process_css(
@@ -510,6 +760,42 @@ class Processor:
         result = css_rewriter.rewrite(content=css_content)
         creator.add_item_for(f"content/{target_filename}", content=result)
 
+    def _process_page_unless_private(
+        self,
+        page: LibraryPage,
+        existing_zim_paths: set[ZimPath],
+        *,
+        is_root: bool,
+    ) -> ProcessedPage | None:
+        """Process a given library page, unless it is private or a private page child
+
+        Returns None when the page has been ignored.
+
+        Parent pages are always submitted to pages workers before their children, so
+        waiting for parent page to be processed cannot deadlock.
+        """
+        try:
+            if page.parent and (
+                parent_processed := self.pages_processed.get(page.parent.id)
+            ):
+                parent_processed.wait()
+                if page.parent.id in self.private_pages:
+                    logger.debug(f"Ignoring page {page.id} (private page child)")
+                    self.private_pages.add(page.id)
+                    return None
+            return self._process_page(page=page, existing_zim_paths=existing_zim_paths)
+        except HTTPError as exc:
+            if exc.response.status_code == HTTPStatus.FORBIDDEN:
+                if is_root:
+                    raise PermissionError(
+                        "Root page is private, we cannot ZIM it, stopping"
+                    ) from None
+                logger.debug(f"Ignoring page {page.id} (private page)")
+                self.private_pages.add(page.id)
+            return None
+        finally:
+            self.pages_processed[page.id].set()
+
     @backoff.on_exception(
         backoff.expo,
         RequestException,
@@ -517,16 +803,28 @@ class Processor:
         on_backoff=backoff_hdlr,
     )
     def _process_page(
-        self, creator: Creator, page: LibraryPage, existing_zim_paths: set[ZimPath]
-    ):
+        self, page: LibraryPage, existing_zim_paths: set[ZimPath]
+    ) -> ProcessedPage:
         """Process a given library page
-        Download content, rewrite HTML and add JSON to ZIM
+        Download content and rewrite HTML, result is ready to be added to the ZIM
+
+        When a previous ZIM is used, page is reused from there if it has not been
+        modified.
         """
         context.current_thread_workitem = f"page ID {page.id} ({page.encoded_url})"
+        revision = None
+        # revision is retrieved only for pages which might be reused ; other pages are
+        # added to build manifest without revision, it will be retrieved next time
+        if self.previous_zim and self.previous_zim.has_page(page.id):
+            revision = self.mindtouch_client.get_page_definition(page).revision
+            if revision and (
+                reused_page := self._reuse_page(page, revision, existing_zim_paths)
+            ):
+                return reused_page
         page_content = self.mindtouch_client.get_page_content(page)
         url_rewriter = HtmlUrlsRewriter(
             context.library_url,
-            page,
+            page.path,
             existing_zim_paths=existing_zim_paths,
             asset_manager=self.asset_manager,
         )
@@ -537,6 +835,7 @@ class Processor:
             notify_js_module=None,
         )
         rewriten = None
+        reusable = True
         # Handle special rewriting of special libretexts.org pages
         if context.library_url.endswith(".libretexts.org"):
             # Let's try to guess back-matter special pages on libretexts.org based on
@@ -602,30 +901,172 @@ class Processor:
                     f"Problem processing special {context.current_thread_workitem}"
                     f", page is probably empty, storing empty page: {exc}"
                 )
-        if not rewriten:
+                reusable = False
+        text = None
+        if rewriten:
+            # special pages depends on other pages, they are never reusable as-is
+            reusable = False
+        elif self.rewrite_pool:
+            # Default rewriting for 'normal' pages, in a worker process
+            rewriten, text = self._rewrite_page_in_process(
+                page, page_content.html_body, url_rewriter
+            )
+        else:
             # Default rewriting for 'normal' pages
             rewriten = rewriter.rewrite(page_content.html_body).content
-        creator.add_item_for(
+        return ProcessedPage(
+            page=page,
+            html_body=rewriten,
+            text=get_text(rewriten) if text is None else text,
+            asset_paths=url_rewriter.asset_paths,
+            links={
+                link_path.value: link_path in existing_zim_paths
+                for link_path in url_rewriter.link_paths
+            },
+            reusable=reusable,
+            revision=revision,
+        )
+
+    def _rewrite_page_in_process(
+        self, page: LibraryPage, html_body: str, url_rewriter: HtmlUrlsRewriter
+    ) -> tuple[str, str]:
+        """Rewrite HTML of a 'normal' page in a worker process
+
+        Assets discovered by the worker process are added to the asset manager and
+        to the URL rewriter of the page, like if the page was rewritten in current
+        process. Returns rewritten HTML and text to index.
+        """
+        if not self.rewrite_pool:
+            raise AttributeError("rewrite pool must be set")
+        rewritten_page = self.rewrite_pool.submit(
+            rewrite_page,
+            page.path,
+            html_body,
+            context.current_thread_workitem,
+        ).result()
+        for asset_path, asset_details in rewritten_page.assets.items():
+            url_rewriter.asset_paths.add(asset_path)
+            for asset_url in asset_details.asset_urls:
+                self.asset_manager.add_asset(
+                    asset_path=asset_path,
+                    asset_url=asset_url,
+                    used_by=context.current_thread_workitem,
+                    kind=asset_details.kind,
+                    always_fetch_online=asset_details.always_fetch_online,
+                )
+        url_rewriter.link_paths.update(rewritten_page.link_paths)
+        return rewritten_page.html_body, rewritten_page.text
+
+    def _reuse_page(
+        self, page: LibraryPage, revision: str, existing_zim_paths: set[ZimPath]
+    ) -> ProcessedPage | None:
+        """Reuse a page from previous ZIM, if it has not been modified since then
+
+        Assets used by the page are added again to the list of assets to download.
+        """
+        if not self.previous_zim or not (
+            previous_page := self.previous_zim.get_page(
+                page.id, revision, existing_zim_paths
+            )
+        ):
+            return None
+        manifest_page, html_body = previous_page
+        logger.debug(f"Reusing {context.current_thread_workitem} from previous ZIM")
+        asset_paths: set[ZimPath] = set()
+        for asset_path in manifest_page.assets:
+            manifest_asset = self.previous_zim.manifest.assets.get(asset_path)
+            if manifest_asset is None:
+                continue
+            asset_paths.add(ZimPath(asset_path))
+            for asset_url in manifest_asset.urls:
+                self.asset_manager.add_asset(
+                    asset_path=ZimPath(asset_path),
+                    asset_url=HttpUrl(asset_url),
+                    used_by=context.current_thread_workitem,
+                    kind=manifest_asset.kind,
+                    always_fetch_online=manifest_asset.always_fetch_online,
+                )
+        return ProcessedPage(
+            page=page,
+            html_body=html_body,
+            text=get_text(html_body),
+            asset_paths=asset_paths,
+            links=manifest_page.links,
+            reusable=True,
+            revision=revision,
+        )
+
+    def _add_page_to_zim(self, zim_writer: ZimWriter, processed_page: ProcessedPage):
+        """Add JSON and indexing item of a processed page to the ZIM"""
+        page = processed_page.page
+        if processed_page.reusable:
+            self.build_manifest.pages[page.id] = ManifestPage(
+                revision=processed_page.revision,
+                assets=sorted(
+                    asset_path.value for asset_path in processed_page.asset_paths
+                ),
+                links=processed_page.links,
+            )
+        zim_writer.add_item_for(
             f"content/page_content_{page.id}.json",
-            content=PageContentModel(html_body=rewriten).model_dump_json(by_alias=True),
+            content=PageContentModel(
+                html_body=processed_page.html_body
+            ).model_dump_json(by_alias=True),
         )
         self._add_indexing_item_to_zim(
-            creator=creator,
+            zim_writer=zim_writer,
             title=page.title,
-            content=get_text(rewriten),
+            content=processed_page.text,
             fname=f"page_{page.id}",
             zimui_redirect=page.path,
         )
 
+    def _add_build_manifest_to_zim(self, creator: Creator):
+        """Add build manifest to the ZIM, so that a subsequent run can reuse content"""
+        for manifest_page in self.build_manifest.pages.values():
+            for asset_path in manifest_page.assets:
+                asset_details = self.asset_manager.assets[ZimPath(asset_path)]
+                self.build_manifest.assets[asset_path] = ManifestAsset(
+                    urls=sorted(
+                        asset_url.value for asset_url in asset_details.asset_urls
+                    ),
+                    kind=asset_details.kind,
+                    always_fetch_online=asset_details.always_fetch_online,
+                )
+        self.build_manifest.images = {
+            asset_path.value: manifest_image
+            for asset_path, manifest_image in self.asset_processor.images.items()
+        }
+        logger.info(
+            f"Adding build manifest with {len(self.build_manifest.pages)} reusable "
+            f"pages and {len(self.build_manifest.images)} reusable images"
+        )
+        creator.add_item_for(
+            MANIFEST_PATH,
+            content=self.build_manifest.model_dump_json(),
+            mimetype="application/json",
+            is_front=False,
+        )
+
     def _report_progress(self):
         """report progress to stats file"""
 
-        logger.info(f"  Progress {self.stats_items_done} / {self.stats_items_total}")
+        done = self.stats_items_done + self.stats_assets_done
+        total = self.stats_items_total + self.stats_assets_total
+        logger.info(f"  Progress {done} / {total}")
+        if zim_writer := self.zim_writer:
+            metrics = zim_writer.metrics
+            logger.debug(
+                f"  ZIM writer: {metrics.queue_depth} items queued "
+                f"({metrics.queued_bytes} bytes), busy "
+                f"{metrics.busy_seconds:.1f}s out of {metrics.elapsed_seconds:.1f}s"
+            )
+        self._report_connections(level=logging.DEBUG)
         if not context.stats_filename:
             return
         progress = {
-            "done": self.stats_items_done,
-            "total": self.stats_items_total,
+            "done": done,
+            "total": total,
         }
         context.stats_filename.write_text(json.dumps(progress, indent=2))
 
@@ -684,7 +1125,7 @@ class Processor:
 
     def _add_indexing_item_to_zim(
         self,
-        creator: Creator,
+        zim_writer: ZimWriter,
         title: str,
         content: str,
         fname: str,
@@ -706,7 +1147,7 @@ class Processor:
         )
 
         logger.debug(f"Adding {fname} to ZIM index")
-        creator.add_item_for(
+        zim_writer.add_item_for(
             title=title,
             path="index/" + fname,
             content=html_content.encode("utf-8"),
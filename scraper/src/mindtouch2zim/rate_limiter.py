@@ -0,0 +1,171 @@
+import datetime
+import math
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from email.utils import parsedate_to_datetime
+from http import HTTPStatus
+
+from mindtouch2zim.context import Context
+
+context = Context.get()
+logger = context.logger
+
+# responses meaning that server asks to slow down
+THROTTLING_STATUSES = {HTTPStatus.TOO_MANY_REQUESTS, HTTPStatus.SERVICE_UNAVAILABLE}
+
+# Retry-After values above this are not honored as-is, server is probably confused
+MAX_RETRY_AFTER_SECONDS = 600
+
+# factors applied to the rate when server is throttling us or answering slowly
+THROTTLED_DECREASE_FACTOR = 0.5
+SLOW_RESPONSE_DECREASE_FACTOR = 0.9
+
+# a response is slow when it takes this many times more than usual
+SLOW_RESPONSE_FACTOR = 4
+
+# minimum delay between two decreases of the rate, so that many concurrent requests
+# hit by the same slowdown lead to a single decrease
+DECREASE_INTERVAL_SECONDS = 1
+
+# the rate never goes below this
+MIN_RATE = 0.5
+
+
+def get_retry_after_seconds(value: str | None, now: datetime.datetime) -> float | None:
+    """Return number of seconds to wait from a Retry-After header value, if valid"""
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = (parsedate_to_datetime(value) - now).total_seconds()
+        except (TypeError, ValueError):
+            return None
+    if math.isnan(seconds):
+        return None
+    return min(max(seconds, 0), MAX_RETRY_AFTER_SECONDS)
+
+
+class AdaptiveRateLimiter:
+    """Token bucket limiting the rate of requests, adapted to server responses (AIMD)
+
+    Every request must first acquire a token. Tokens are added to the bucket at the
+    current rate, and bucket holds at most one second worth of tokens.
+
+    The rate is increased additively on every successful response (about one more
+    request per second every second), up to max_rps, and decreased multiplicatively
+    when server throttles (HTTP 429 / 503) or answers slowly compared to usual
+    latency. When server sends a Retry-After header, no token is handed out before
+    this delay is over.
+
+    Without max_rps, requests are not limited until server first asks to slow down.
+
+    This class is thread-safe.
+    """
+
+    def __init__(
+        self,
+        max_rps: float | None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.max_rps = max_rps
+        self.clock = clock
+        self.sleep = sleep
+        self.lock = threading.Lock()
+        self.rate = max_rps or math.inf
+        self.tokens = 1.0
+        self.refilled_at = clock()
+        # no token is handed out before this time
+        self.paused_until = 0.0
+        self.decreased_at = -math.inf
+        # time at which last tokens have been handed out, to measure current rate
+        self.recent_acquisitions: deque[float] = deque()
+        # exponentially weighted moving average of responses latency
+        self.usual_latency: float | None = None
+
+    def acquire(self):
+        """Wait until a request can be made
+
+        A token is reserved right away, possibly ahead of time, so that concurrent
+        callers are spaced out instead of competing for the next token.
+        """
+        while True:
+            with self.lock:
+                now = self.clock()
+                pause = self.paused_until - now
+                if pause <= 0:
+                    self._refill(now)
+                    self.tokens -= 1
+                    self._record_acquisition(now)
+                    wait = -self.tokens / self.rate
+                    break
+            self.sleep(pause)
+        if wait > 0:
+            self.sleep(wait)
+
+    def _refill(self, now: float):
+        """Add tokens accumulated since last refill, must be called with lock held"""
+        if math.isinf(self.rate):
+            self.tokens = 1
+        else:
+            self.tokens = min(
+                max(self.rate, 1), self.tokens + (now - self.refilled_at) * self.rate
+            )
+        self.refilled_at = now
+
+    def _record_acquisition(self, now: float):
+        self.recent_acquisitions.append(now)
+        while self.recent_acquisitions[0] < now - 1:
+            self.recent_acquisitions.popleft()
+
+    def record_response(
+        self, status_code: int, latency: float, retry_after: float | None = None
+    ):
+        """Adapt the rate to a response, which took latency seconds"""
+        with self.lock:
+            now = self.clock()
+            if status_code in THROTTLING_STATUSES:
+                if retry_after:
+                    self.paused_until = max(self.paused_until, now + retry_after)
+                self._decrease(now, THROTTLED_DECREASE_FACTOR, f"HTTP {status_code}")
+                return
+            if (
+                self.usual_latency is not None
+                and latency > SLOW_RESPONSE_FACTOR * self.usual_latency
+            ):
+                self._decrease(
+                    now,
+                    SLOW_RESPONSE_DECREASE_FACTOR,
+                    f"response took {latency:.2f}s, usually "
+                    f"{self.usual_latency:.2f}s",
+                )
+            else:
+                self._increase()
+            self.usual_latency = (
+                latency
+                if self.usual_latency is None
+                else 0.9 * self.usual_latency + 0.1 * latency
+            )
+
+    def _increase(self):
+        if math.isinf(self.rate):
+            return
+        self.rate += 1 / self.rate
+        if self.max_rps:
+            self.rate = min(self.rate, self.max_rps)
+
+    def _decrease(self, now: float, factor: float, reason: str):
+        if now - self.decreased_at < DECREASE_INTERVAL_SECONDS:
+            return
+        self.decreased_at = now
+        if math.isinf(self.rate):
+            # start from the rate at which requests are currently made
+            self.rate = max(len(self.recent_acquisitions), 1)
+            self.refilled_at = now
+            self.tokens = min(self.tokens, 1)
+        self.rate = max(self.rate * factor, MIN_RATE)
+        logger.debug(f"Slowing down API calls to {self.rate:.1f}/s: {reason}")
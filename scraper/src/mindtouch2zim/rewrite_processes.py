@@ -0,0 +1,106 @@
+import dataclasses
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from zimscraperlib.download import get_session
+from zimscraperlib.rewriting.url_rewriting import ZimPath
+
+from mindtouch2zim.context import Context
+
+# this module is imported by worker processes before context is set up: it must not
+# use the context nor import modules using it at import time
+if TYPE_CHECKING:
+    from mindtouch2zim.asset import AssetDetails
+
+# context fields which cannot be passed to worker processes, they are re-created there
+UNPICKLABLE_CONTEXT_FIELDS = (
+    "_instance",
+    "_current_thread_workitem",
+    "logger",
+    "web_session",
+)
+
+# paths of existing pages, set in worker processes by init_rewrite_process
+_existing_zim_paths: set[ZimPath] = set()
+
+
+class RewrittenPage(NamedTuple):
+    """Result of a page rewriting in a worker process"""
+
+    html_body: str  # rewritten HTML
+    text: str  # text content to index
+    assets: "dict[ZimPath, AssetDetails]"  # assets discovered while rewriting
+    link_paths: set[ZimPath]  # paths of library pages linked by the page
+
+
+def create_rewrite_pool(existing_zim_paths: set[ZimPath]) -> ProcessPoolExecutor:
+    """Create a pool of processes rewriting pages HTML
+
+    Processes are spawned (not forked, since current process is multi-threaded) and
+    initialized with current context and paths of existing pages.
+    """
+    context = Context.get()
+    context_values = {
+        field.name: getattr(context, field.name)
+        for field in dataclasses.fields(context)
+        if field.name not in UNPICKLABLE_CONTEXT_FIELDS
+    }
+    return ProcessPoolExecutor(
+        max_workers=context.rewrite_processes,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=init_rewrite_process,
+        initargs=(context_values, existing_zim_paths),
+    )
+
+
+def init_rewrite_process(
+    context_values: dict[str, Any], existing_zim_paths: set[ZimPath]
+):
+    """Initialize a worker process, called once when process starts"""
+    global _existing_zim_paths  # noqa: PLW0603
+    Context.setup(
+        **context_values,
+        web_session=get_session(),
+        _current_thread_workitem=threading.local(),
+    )
+    Context.logger.setLevel(
+        level=logging.DEBUG if context_values.get("debug") else logging.INFO
+    )
+    _existing_zim_paths = existing_zim_paths
+    # register custom HTML rewriting rules, now that context is set up
+    import mindtouch2zim.html_rewriting  # noqa: F401 # pyright: ignore
+
+
+def rewrite_page(page_path: str, html_body: str, workitem: str) -> RewrittenPage:
+    """Rewrite HTML of a 'normal' page and extract its text, in a worker process"""
+    from zimscraperlib.rewriting.html import HtmlRewriter
+
+    from mindtouch2zim.asset import AssetManager
+    from mindtouch2zim.html_rewriting import HtmlUrlsRewriter
+    from mindtouch2zim.html_utils import get_text
+
+    context = Context.get()
+    context.current_thread_workitem = workitem
+    asset_manager = AssetManager()
+    url_rewriter = HtmlUrlsRewriter(
+        context.library_url,
+        page_path,
+        existing_zim_paths=_existing_zim_paths,
+        asset_manager=asset_manager,
+    )
+    rewriter = HtmlRewriter(
+        url_rewriter=url_rewriter,
+        pre_head_insert=None,
+        post_head_insert=None,
+        notify_js_module=None,
+    )
+    rewriten = rewriter.rewrite(html_body).content
+    return RewrittenPage(
+        html_body=rewriten,
+        text=get_text(rewriten),
+        assets=asset_manager.assets,
+        link_paths=url_rewriter.link_paths,
+    )
@@ -0,0 +1,84 @@
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from mindtouch2zim.context import Context
+
+context = Context.get()
+logger = context.logger
+
+# function uploading content to S3 at a given key, with given metadata
+UploadFunction = Callable[[str, dict[str, str], BytesIO], None]
+
+
+class S3Uploader:
+    """Uploads content to S3 optimization cache in background threads
+
+    Assets workers hand over content to upload and move on, so that a slow or
+    throttled S3 endpoint does not limit assets throughput.
+
+    At most `workers` uploads run concurrently. Content to upload is held in memory
+    until uploaded, so new uploads are skipped while size of pending uploads exceeds
+    max_queued_bytes: the cache is only an optimization, missing an upload never
+    stalls the pipeline. Failed uploads are counted and logged, but not raised.
+    """
+
+    def __init__(
+        self, upload: UploadFunction, workers: int, max_queued_bytes: int
+    ) -> None:
+        self.upload = upload
+        self.max_queued_bytes = max_queued_bytes
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="s3_upload"
+        )
+        self.condition = threading.Condition()
+        self.pending = 0
+        self.queued_bytes = 0
+        self.uploaded_count = 0
+        self.failed_count = 0
+        self.skipped_count = 0
+
+    def submit(self, key: str, meta: dict[str, str], content: bytes) -> bool:
+        """Upload content in background, returns False if upload has been skipped"""
+        with self.condition:
+            if (
+                self.pending
+                and self.queued_bytes + len(content) > self.max_queued_bytes
+            ):
+                self.skipped_count += 1
+                logger.debug(f"Skipping upload of {key} to S3 cache, too many pending")
+                return False
+            self.pending += 1
+            self.queued_bytes += len(content)
+        self.executor.submit(self._upload, key, meta, content)
+        return True
+
+    def _upload(self, key: str, meta: dict[str, str], content: bytes):
+        try:
+            self.upload(key, meta, BytesIO(content))
+            with self.condition:
+                self.uploaded_count += 1
+        except Exception as exc:
+            with self.condition:
+                self.failed_count += 1
+            logger.warning(f"Failed to upload {key} to S3 cache: {exc}")
+        finally:
+            with self.condition:
+                self.pending -= 1
+                self.queued_bytes -= len(content)
+                self.condition.notify_all()
+
+    def flush(self):
+        """Wait for all pending uploads to be done, and report about uploads"""
+        with self.condition:
+            while self.pending:
+                self.condition.wait()
+        logger.info(
+            f"{self.uploaded_count} images uploaded to S3 cache, "
+            f"{self.failed_count} failed, {self.skipped_count} skipped"
+        )
+
+    def close(self):
+        """Stop background threads, once pending uploads are done"""
+        self.executor.shutdown()
@@ -0,0 +1,109 @@
+import threading
+from collections import deque
+from collections.abc import Hashable
+from dataclasses import dataclass
+from typing import Generic, TypeVar
+
+T = TypeVar("T", bound=Hashable)
+
+
+@dataclass
+class HostStats:
+    items_done: int = 0
+    busy_seconds: float = 0  # cumulated processing time of items done
+
+    @property
+    def average_seconds(self) -> float:
+        """Average processing time of an item of this host"""
+        return self.busy_seconds / self.items_done if self.items_done else 0
+
+
+class HostScheduler(Generic[T]):
+    """Queue of items to process, handed out fairly across their hosts
+
+    Items are grouped by host and handed out round-robin across hosts, so that items
+    of a slow host never fill all workers while items of other hosts are waiting.
+
+    At most max_per_host items of the same host are in flight (handed out and not yet
+    done) at once. When all hosts with queued items are at their limit, get waits for
+    an item to be done. The global concurrency is the one of the caller.
+
+    This class is thread-safe.
+    """
+
+    def __init__(self, max_per_host: int) -> None:
+        self.max_per_host = max_per_host
+        self.condition = threading.Condition()
+        # queued items, per host
+        self.queues: dict[str, deque[T]] = {}
+        # hosts with queued items, in round-robin order
+        self.hosts: deque[str] = deque()
+        # host of items in flight, and number of items in flight per host
+        self.in_flight: dict[T, str] = {}
+        self.in_flight_per_host: dict[str, int] = {}
+        self.stats: dict[str, HostStats] = {}
+        self.queued_count = 0
+        self.closed = False
+        self.cancelled = False
+
+    def put(self, item: T, host: str):
+        """Queue an item to be processed"""
+        with self.condition:
+            if host not in self.queues:
+                self.queues[host] = deque()
+                self.hosts.append(host)
+            self.queues[host].append(item)
+            self.queued_count += 1
+            self.condition.notify_all()
+
+    def get(self) -> T | None:
+        """Return next item to process, or None once closed and all items handed out
+
+        Blocks until an item can be handed out. Item must be marked as done once
+        processed.
+        """
+        with self.condition:
+            while not self.cancelled:
+                for _ in range(len(self.hosts)):
+                    host = self.hosts[0]
+                    self.hosts.rotate(-1)
+                    if self.in_flight_per_host.get(host, 0) < self.max_per_host:
+                        return self._hand_out(host)
+                if self.closed and not self.hosts:
+                    break
+                self.condition.wait()
+            return None
+
+    def _hand_out(self, host: str) -> T:
+        """Remove next item of host from the queue and mark it as in flight
+
+        Must be called with the condition held
+        """
+        item = self.queues[host].popleft()
+        self.queued_count -= 1
+        if not self.queues[host]:
+            del self.queues[host]
+            self.hosts.remove(host)
+        self.in_flight[item] = host
+        self.in_flight_per_host[host] = self.in_flight_per_host.get(host, 0) + 1
+        return item
+
+    def done(self, item: T, seconds: float):
+        """Mark an item as processed, it took given number of seconds"""
+        with self.condition:
+            host = self.in_flight.pop(item)
+            self.in_flight_per_host[host] -= 1
+            stats = self.stats.setdefault(host, HostStats())
+            stats.items_done += 1
+            stats.busy_seconds += seconds
+            self.condition.notify_all()
+
+    def close(self, *, cancel: bool = False):
+        """Signal that no more item will be queued
+
+        cancel: if True, items which are still queued are not handed out anymore
+        """
+        with self.condition:
+            self.closed = True
+            self.cancelled = cancel
+            self.condition.notify_all()
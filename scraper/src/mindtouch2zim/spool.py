@@ -0,0 +1,66 @@
+import os
+import tempfile
+from io import BufferedIOBase, BytesIO
+from pathlib import Path
+from typing import Any
+
+
+class SpoolStream(BufferedIOBase):
+    """A writable stream keeping content in memory until it gets too big
+
+    Once more than max_memory_size bytes have been written, content is moved to a
+    spool file in folder, and subsequent writes go to this file. This allows to
+    download content of any size with a bounded memory usage.
+    """
+
+    def __init__(self, max_memory_size: int, folder: Path) -> None:
+        super().__init__()
+        self.max_memory_size = max_memory_size
+        self.folder = folder
+        self.memory: BytesIO | None = BytesIO()
+        # path of the spool file, once content has been moved to it
+        self.fpath: Path | None = None
+        self.file: Any = None
+        self.size = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: Any) -> int:
+        if self.memory is not None:
+            if self.size + len(data) <= self.max_memory_size:
+                self.size += self.memory.write(data)
+                return len(data)
+            self._spool()
+        self.size += self.file.write(data)
+        return len(data)
+
+    def _spool(self):
+        """Move content written so far to a new spool file"""
+        if self.memory is None:
+            return
+        fd, fpath = tempfile.mkstemp(prefix="spool_", dir=self.folder)
+        self.fpath = Path(fpath)
+        self.file = os.fdopen(fd, "wb")
+        self.file.write(self.memory.getbuffer())
+        self.memory = None
+
+    def getvalue(self) -> bytes:
+        """Return whole content, reading it from spool file if needed"""
+        if self.memory is not None:
+            return self.memory.getvalue()
+        if not self.file.closed:
+            self.file.flush()
+        return self.fpath.read_bytes()  # pyright: ignore[reportOptionalMemberAccess]
+
+    def close(self):
+        """Close the spool file, if any, so that it can be read by someone else"""
+        if self.file is not None:
+            self.file.close()
+        super().close()
+
+    def discard(self):
+        """Close the stream and delete the spool file, if any"""
+        self.close()
+        if self.fpath:
+            self.fpath.unlink(missing_ok=True)
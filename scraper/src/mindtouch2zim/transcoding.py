@@ -0,0 +1,76 @@
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+from PIL import Image
+from zimscraperlib.image.presets import WebpMedium
+
+from mindtouch2zim.errors import ImageTooLargeError
+
+# this module does not use the context, so that it can be used in any process
+
+WEBP_PARAMS = {
+    "lossless": WebpMedium.options.lossless,
+    "quality": WebpMedium.options.quality,
+    "method": WebpMedium.options.method,
+}
+
+# formats which can be displayed by all browsers, and hence kept as-is when WebP
+# transcoding does not reduce their size
+WEB_FORMATS = {"JPEG", "PNG", "GIF", "WEBP"}
+
+
+def get_target_size(width: int, height: int, max_pixels: int) -> tuple[int, int]:
+    """Return size of an image once reduced to fit in max_pixels, keeping its ratio"""
+    if width * height <= max_pixels:
+        return width, height
+    target_width = int(math.sqrt(max_pixels * width / height))
+    return target_width, int(math.ceil(target_width / width * height))
+
+
+def transcode_image(content: bytes, max_pixels: int, max_decoded_bytes: int) -> bytes:
+    """Transcode an image to WebP with the WebpMedium preset
+
+    - images are reduced to fit in max_pixels ; JPEG images are reduced while being
+      decoded, so that full size image is never held in memory
+    - images whose decoded size would exceed max_decoded_bytes are not decoded at all
+      and ImageTooLargeError is raised, to protect against decompression bombs
+    - images are encoded only once, with the preset options
+    - original content is returned if it is smaller than WebP output and can be used
+      as-is, i.e. it has not been reduced and is displayable by browsers
+    """
+    with Image.open(BytesIO(content)) as image:
+        original_format = image.format
+        original_size = image.size
+        target_size = get_target_size(*original_size, max_pixels)
+        if target_size != original_size:
+            # no-op for formats which cannot be reduced while decoding
+            image.draft(None, target_size)
+        decoded_bytes = image.width * image.height * len(image.getbands())
+        if decoded_bytes > max_decoded_bytes:
+            raise ImageTooLargeError(
+                f"Image of {image.width}x{image.height} pixels ({image.mode}) needs "
+                f"{decoded_bytes} bytes to be decoded, maximum is {max_decoded_bytes}"
+            )
+        if target_size != original_size:
+            image.thumbnail(target_size, Image.Resampling.LANCZOS)
+        transcoded = BytesIO()
+        image.save(transcoded, format="WEBP", **WEBP_PARAMS)
+    if (
+        target_size == original_size
+        and original_format in WEB_FORMATS
+        and len(content) <= transcoded.tell()
+    ):
+        return content
+    return transcoded.getvalue()
+
+
+def create_transcode_pool(processes: int) -> ProcessPoolExecutor:
+    """Create a pool of processes transcoding images
+
+    Processes are spawned (not forked, since current process is multi-threaded).
+    """
+    return ProcessPoolExecutor(
+        max_workers=processes, mp_context=multiprocessing.get_context("spawn")
+    )
@@ -0,0 +1,192 @@
+import os
+import threading
+import time
+from collections.abc import Callable
+from typing import NamedTuple
+
+from mindtouch2zim.context import Context
+
+context = Context.get()
+logger = context.logger
+
+# delay between two decisions of the tuner, long enough to average out noise
+TUNING_INTERVAL_SECONDS = 15
+
+# relative change of throughput under which it is considered unchanged
+THROUGHPUT_TOLERANCE = 0.05
+
+# workers are removed when share of failed items exceeds this, since failures are
+# often caused by too many concurrent requests (timeouts, throttling)
+MAX_ERROR_RATE = 0.2
+
+
+def get_rss_bytes() -> int | None:
+    """Return current resident memory of the process, if it can be known"""
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class WorkersPool:
+    """Threads calling a same function, whose number can change while running
+
+    Every thread calls target repeatedly, until it returns False. Number of active
+    threads can be changed at any time: threads are started when needed, and threads
+    beyond the active count wait (once they are done with their current call) until
+    they are needed again or the pool stops.
+
+    The pool stops as soon as target returns False once.
+    """
+
+    def __init__(self, target: Callable[[], bool], name: str, count: int) -> None:
+        self.target = target
+        self.name = name
+        self.condition = threading.Condition()
+        self.active_count = 0
+        self.stopped = False
+        self.threads: list[threading.Thread] = []
+        self.resize(count)
+
+    def resize(self, count: int):
+        """Change number of active threads"""
+        with self.condition:
+            self.active_count = count
+            while len(self.threads) < count and not self.stopped:
+                thread = threading.Thread(
+                    target=self._run,
+                    args=(len(self.threads),),
+                    name=f"{self.name}_{len(self.threads)}",
+                )
+                self.threads.append(thread)
+                thread.start()
+            self.condition.notify_all()
+
+    def _run(self, index: int):
+        while self._wait_active(index):
+            if not self.target():
+                self.stop()
+
+    def _wait_active(self, index: int) -> bool:
+        """Wait until thread at index is active, return False if pool has stopped"""
+        with self.condition:
+            while index >= self.active_count and not self.stopped:
+                self.condition.wait()
+            return not self.stopped
+
+    def stop(self):
+        """Stop all threads, once done with their current call"""
+        with self.condition:
+            self.stopped = True
+            self.condition.notify_all()
+
+    def join(self, timeout: float | None = None) -> bool:
+        """Wait for all threads to be done, return False if timeout expired before"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.condition:
+            threads = list(self.threads)
+        for thread in threads:
+            thread.join(
+                None if deadline is None else max(deadline - time.monotonic(), 0)
+            )
+            if thread.is_alive():
+                return False
+        with self.condition:
+            # threads might have been started meanwhile
+            return len(threads) == len(self.threads)
+
+
+class WorkersSample(NamedTuple):
+    items_done: int  # total number of items processed so far
+    items_failed: int  # total number of items which failed so far
+    items_queued: int  # number of items currently waiting for a worker
+    rss_bytes: int | None  # current resident memory of the process
+
+
+class WorkersTuner:
+    """Chooses number of workers maximizing throughput, by hill climbing
+
+    Every TUNING_INTERVAL_SECONDS, throughput (items processed per second) is compared
+    to the one of previous interval: the number of workers keeps moving in the same
+    direction (more or less workers) while throughput improves, and goes back the
+    other way when it degrades.
+
+    Workers are removed whatever the throughput when memory exceeds max_rss_bytes or
+    when too many items fail. Nothing is decided when there are not enough queued
+    items to keep all workers busy, since throughput then only reflects how fast
+    items are queued.
+
+    Decisions are logged, to help choosing a static number of workers afterwards.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        min_workers: int,
+        max_workers: int,
+        max_rss_bytes: int,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.workers = min(max(workers, min_workers), max_workers)
+        self.min_workers = min_workers
+        self.max_workers = max_workers
+        self.max_rss_bytes = max_rss_bytes
+        self.clock = clock
+        self.direction = 1  # 1 to add workers, -1 to remove workers
+        self.last_sample: WorkersSample | None = None
+        self.last_sampled_at = clock()
+        self.last_throughput: float | None = None
+
+    def update(self, sample: WorkersSample) -> int:
+        """Return number of workers to use, based on activity since last update"""
+        now = self.clock()
+        last_sample = self.last_sample or WorkersSample(0, 0, 0, None)
+        elapsed = now - self.last_sampled_at
+        self.last_sample, self.last_sampled_at = sample, now
+        done = sample.items_done - last_sample.items_done
+        failed = sample.items_failed - last_sample.items_failed
+        throughput = done / elapsed if elapsed > 0 else 0
+        stats = f"{throughput:.1f} items/s, {failed} failed out of {done}"
+
+        if sample.rss_bytes is not None and sample.rss_bytes > self.max_rss_bytes:
+            return self._move(-1, f"memory usage is {sample.rss_bytes} bytes, {stats}")
+        if done and failed / done > MAX_ERROR_RATE:
+            return self._move(-1, f"too many failures, {stats}")
+        if sample.items_queued < self.workers:
+            # not enough work to assess throughput of all workers, next comparison
+            # must not be against this interval
+            self.last_throughput = None
+            logger.debug(f"Keeping {self.workers} workers, not enough queued items")
+            return self.workers
+
+        last_throughput, self.last_throughput = self.last_throughput, throughput
+        if last_throughput is None:
+            return self._move(self.direction, stats)
+        if throughput > last_throughput * (1 + THROUGHPUT_TOLERANCE):
+            return self._move(
+                self.direction, f"{stats}, improved from {last_throughput:.1f}/s"
+            )
+        if throughput < last_throughput * (1 - THROUGHPUT_TOLERANCE):
+            return self._move(
+                -self.direction, f"{stats}, degraded from {last_throughput:.1f}/s"
+            )
+        logger.info(
+            f"Keeping {self.workers} workers, {stats}, unchanged from "
+            f"{last_throughput:.1f}/s"
+        )
+        return self.workers
+
+    def _move(self, direction: int, reason: str) -> int:
+        """Add or remove about a quarter of workers, in given direction"""
+        self.direction = direction
+        step = max(self.workers // 4, 1)
+        workers = min(
+            max(self.workers + direction * step, self.min_workers), self.max_workers
+        )
+        logger.info(
+            f"{'Adding' if direction > 0 else 'Removing'} workers: {self.workers} -> "
+            f"{workers}, {reason}"
+        )
+        self.workers = workers
+        return workers
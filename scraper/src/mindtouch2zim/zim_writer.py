@@ -0,0 +1,161 @@
+import threading
+import time
+from collections import deque
+from typing import Any, NamedTuple
+
+from zimscraperlib.zim import Creator
+
+from mindtouch2zim.context import Context
+
+context = Context.get()
+logger = context.logger
+
+
+class QueuedItem(NamedTuple):
+    path: str
+    kwargs: dict[str, Any]  # other arguments of Creator.add_item_for
+    size: int  # size of item content, in bytes
+
+
+class ZimWriterMetrics(NamedTuple):
+    queue_depth: int  # number of items waiting to be added to the ZIM
+    queued_bytes: int  # size of items waiting to be added to the ZIM
+    max_queue_depth: int  # maximum number of items waiting at once so far
+    items_written: int  # number of items added to the ZIM so far
+    busy_seconds: float  # time spent adding items to the ZIM
+    elapsed_seconds: float  # time since writer has been started
+
+
+class ZimWriter:
+    """A dedicated thread adding items to the ZIM, from a bounded queue
+
+    The writer thread is the only one using the ZIM creator while it runs, so that
+    producers (pages processing and assets workers) never wait for each other while
+    an item is added to the ZIM, which might be long (e.g. when a cluster is
+    compressed).
+
+    Producers only wait when size of queued items content exceeds max_queued_bytes,
+    so that memory stays bounded should producers be faster than the ZIM creator.
+    """
+
+    def __init__(self, creator: Creator, max_queued_bytes: int) -> None:
+        self.creator = creator
+        self.max_queued_bytes = max_queued_bytes
+        # items not yet added to the ZIM, first one is the one being added
+        self.items: deque[QueuedItem] = deque()
+        self.queued_bytes = 0
+        self.condition = threading.Condition()
+        self.closed = False
+        # error which occured while adding an item, if any
+        self.error: BaseException | None = None
+        self.max_queue_depth = 0
+        self.items_written = 0
+        self.busy_seconds = 0.0
+        self.started_at = 0.0
+        self.thread = threading.Thread(target=self._run, name="zim-writer")
+
+    def start(self):
+        """Start the writer thread"""
+        self.started_at = time.perf_counter()
+        self.thread.start()
+
+    def add_item_for(self, path: str, **kwargs: Any):
+        """Queue an item to be added to the ZIM, see Creator.add_item_for
+
+        This method is thread-safe. It blocks while the queue is full, and raises the
+        error of the writer thread if it failed.
+
+        str content is queued UTF-8 encoded (like the creator would store it), so that
+        its size is accounted for in bytes.
+        """
+        content = kwargs.get("content")
+        if isinstance(content, str):
+            content = kwargs["content"] = content.encode()
+        size = len(content) if content is not None else 0
+        with self.condition:
+            # an item bigger than the queue is accepted once the queue is empty
+            while (
+                self.error is None
+                and self.items
+                and self.queued_bytes + size > self.max_queued_bytes
+            ):
+                self.condition.wait()
+            if self.error is not None:
+                raise self.error
+            if self.closed:
+                raise OSError("ZIM writer is closed, no item can be added anymore")
+            self.items.append(QueuedItem(path=path, kwargs=kwargs, size=size))
+            self.queued_bytes += size
+            self.max_queue_depth = max(self.max_queue_depth, len(self.items))
+            self.condition.notify_all()
+
+    def close(self, *, cancel: bool = False):
+        """Wait for queued items to be added to the ZIM, and stop the writer thread
+
+        cancel: if True, items which are still queued are not added to the ZIM
+
+        Raises the error of the writer thread if it failed.
+        """
+        with self.condition:
+            self.closed = True
+            if cancel:
+                # keep the item currently being added, it is removed by writer thread
+                while len(self.items) > 1:
+                    self._drop(self.items.pop())
+            self.condition.notify_all()
+        self.thread.join()
+        logger.debug(f"ZIM writer stopped: {self.metrics}")
+        if self.error is not None and not cancel:
+            raise self.error
+
+    @property
+    def metrics(self) -> ZimWriterMetrics:
+        """Current metrics of the writer"""
+        with self.condition:
+            return ZimWriterMetrics(
+                queue_depth=len(self.items),
+                queued_bytes=self.queued_bytes,
+                max_queue_depth=self.max_queue_depth,
+                items_written=self.items_written,
+                busy_seconds=self.busy_seconds,
+                elapsed_seconds=(
+                    time.perf_counter() - self.started_at if self.started_at else 0.0
+                ),
+            )
+
+    def _drop(self, item: QueuedItem):
+        """Forget about an item which will not be added to the ZIM
+
+        Must be called with the condition held
+        """
+        self.queued_bytes -= item.size
+        if item.kwargs.get("delete_fpath") and (fpath := item.kwargs.get("fpath")):
+            fpath.unlink(missing_ok=True)
+
+    def _run(self):
+        """Add queued items to the ZIM, until writer is closed and queue is empty"""
+        while True:
+            with self.condition:
+                while not self.items and not self.closed:
+                    self.condition.wait()
+                if not self.items:
+                    return
+                # item is removed from the queue only once added, so that its
+                # content is still accounted for while it is being added
+                item = self.items[0]
+            start = time.perf_counter()
+            try:
+                self.creator.add_item_for(item.path, **item.kwargs)
+            except BaseException as exc:
+                with self.condition:
+                    self.error = exc
+                    while self.items:
+                        self._drop(self.items.pop())
+                    self.condition.notify_all()
+                return
+            with self.condition:
+                self.busy_seconds += time.perf_counter() - start
+                self.items.popleft()
+                self.queued_bytes -= item.size
+                self.items_written += 1
+                self.condition.notify_all()
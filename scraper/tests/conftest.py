@@ -0,0 +1,49 @@
+import threading
+from collections.abc import Callable, Generator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+import pytest
+
+# function computing status, headers and body of a response for a given request
+Responder = Callable[[BaseHTTPRequestHandler], tuple[int, dict[str, str], bytes]]
+
+
+class LocalServer:
+    """A local HTTP server, standing in for remote servers in tests"""
+
+    def __init__(self) -> None:
+        self.requests: list[BaseHTTPRequestHandler] = []
+        self.respond: Responder = lambda _: (200, {}, b"")
+        local_server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):  # noqa: N802
+                local_server.requests.append(self)
+                status, headers, body = local_server.respond(self)
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args: Any):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def paths(self) -> list[str]:
+        return [request.path for request in self.requests]
+
+
+@pytest.fixture()
+def local_server() -> Generator[LocalServer]:
+    server = LocalServer()
+    server.thread.start()
+    yield server
+    server.server.shutdown()
+    server.server.server_close()
@@ -1,7 +1,32 @@
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from pathlib import Path
+from typing import Any
+from unittest.mock import Mock
+
 import pytest
+from PIL import Image
+from requests.exceptions import ConnectionError as RequestsConnectionError
+from requests.structures import CaseInsensitiveDict
+from zimscraperlib.image.presets import WebpMedium
 from zimscraperlib.rewriting.url_rewriting import HttpUrl, ZimPath
+from zimscraperlib.zim import Creator
 
+from mindtouch2zim import asset
 from mindtouch2zim.asset import AssetManager, AssetProcessor, HeaderData
+from mindtouch2zim.circuit_breaker import CircuitBreaker
+from mindtouch2zim.context import Context
+from mindtouch2zim.errors import KnownBadAssetFailedError
+from mindtouch2zim.previous_zim import (
+    MANIFEST_PATH,
+    BuildManifest,
+    ManifestImage,
+    PreviousZim,
+)
+from mindtouch2zim.spool import SpoolStream
+from mindtouch2zim.transcoding import create_transcode_pool
+
+context = Context.get()
 
 
 @pytest.fixture()
@@ -135,6 +160,124 @@ def test_asset_manager(
         assert asset.always_fetch_online == expected_always_fetch_online
 
 
+def test_asset_manager_concurrent_add(manager: AssetManager):
+    def add_assets(worker: int):
+        for index in range(100):
+            manager.add_asset(
+                asset_path=ZimPath(f"asset/{index}"),
+                asset_url=HttpUrl(f"https://www.acme.com/asset/{index}"),
+                used_by=f"page {worker}",
+                kind="img",
+                always_fetch_online=False,
+            )
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(add_assets, range(8)))
+
+    assert len(manager.assets) == 101
+    for index in range(100):
+        assert manager.assets[ZimPath(f"asset/{index}")].used_by == {
+            f"page {worker}" for worker in range(8)
+        }
+
+
+def test_asset_manager_queue(manager: AssetManager):
+    for index in (1, 2, 1):
+        manager.add_asset(
+            asset_path=ZimPath(f"asset/{index}"),
+            asset_url=HttpUrl(f"https://www.acme.com/asset/{index}"),
+            used_by="page",
+            kind="img",
+            always_fetch_online=False,
+        )
+    manager.close()
+    assert [asset_path.value for asset_path, _ in manager.iter_queued()] == [
+        "some/asset",
+        "asset/1",
+        "asset/2",
+    ]
+
+
+def test_asset_manager_queue_cancel(manager: AssetManager):
+    manager.close(cancel=True)
+    assert list(manager.iter_queued()) == []
+
+
+def test_asset_manager_retry_failed_asset(manager: AssetManager):
+    queued = manager.get_queued()
+    assert queued is not None
+    asset_path = queued[0]
+    assert manager.next_untried_url(asset_path) == HttpUrl(
+        "https://www.acme.com/some/asset"
+    )
+    assert manager.next_untried_url(asset_path) is None
+    manager.asset_done(asset_path, 0.1, failed=True)
+    # a page adds a new URL for the failed asset
+    manager.add_asset(
+        asset_path=asset_path,
+        asset_url=HttpUrl("https://mirror.acme.com/some/asset"),
+        used_by="another page",
+        kind="some",
+        always_fetch_online=True,
+    )
+    manager.close()
+    assert manager.get_queued() == (asset_path, manager.assets[asset_path])
+    assert manager.next_untried_url(asset_path) == HttpUrl(
+        "https://mirror.acme.com/some/asset"
+    )
+    manager.asset_done(asset_path, 0.1)
+    assert manager.get_queued() is None
+
+
+def test_asset_manager_no_retry_succeeded_asset(manager: AssetManager):
+    queued = manager.get_queued()
+    assert queued is not None
+    asset_path = queued[0]
+    assert manager.next_untried_url(asset_path) is not None
+    manager.asset_done(asset_path, 0.1)
+    manager.add_asset(
+        asset_path=asset_path,
+        asset_url=HttpUrl("https://mirror.acme.com/some/asset"),
+        used_by="another page",
+        kind="some",
+        always_fetch_online=True,
+    )
+    manager.close()
+    assert manager.get_queued() is None
+
+
+def test_process_asset_url_added_while_processing(
+    manager: AssetManager, processor: AssetProcessor, monkeypatch: pytest.MonkeyPatch
+):
+    asset_path = ZimPath("some/asset")
+    tried_urls: list[str] = []
+
+    def get_asset_content(asset_url: HttpUrl, **_: Any) -> BytesIO:
+        tried_urls.append(asset_url.value)
+        if len(tried_urls) == 1:
+            # a page discovers another URL while first one is failing
+            manager.add_asset(
+                asset_path=asset_path,
+                asset_url=HttpUrl("https://www.acme.com/other/asset"),
+                used_by="another page",
+                kind="some",
+                always_fetch_online=True,
+            )
+            raise KnownBadAssetFailedError("first URL is failing")
+        return BytesIO(b"content")
+
+    added_items: list[str] = []
+    zim_writer = Mock()
+    zim_writer.add_item_for.side_effect = lambda path, **_: added_items.append(path)
+    monkeypatch.setattr(processor, "get_asset_content", get_asset_content)
+    assert processor.process_asset(asset_path, manager, zim_writer)
+    assert tried_urls == [
+        "https://www.acme.com/some/asset",
+        "https://www.acme.com/other/asset",
+    ]
+    assert added_items == ["content/some/asset"]
+
+
 @pytest.mark.parametrize(
     "header_content_type, kind, expected_mime_type",
     [
@@ -187,3 +330,237 @@ def test_get_mime_type(
         )
         == expected_mime_type
     )
+
+
+@pytest.mark.parametrize(
+    "ident, expected_reused",
+    [
+        pytest.param('"abc"', True, id="unchanged"),
+        pytest.param('"def"', False, id="changed"),
+        pytest.param("-1", False, id="unknown_ident"),
+    ],
+)
+def test_get_image_content_from_previous_zim(
+    processor: AssetProcessor,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    ident: str,
+    expected_reused: bool,  # noqa: FBT001
+):
+    zim_path = tmp_path / "previous.zim"
+    with Creator(zim_path, "index.html").config_dev_metadata() as creator:
+        creator.add_item_for("index.html", content="<html></html>", is_front=True)
+        creator.add_item_for("content/images/foo.webp", content=b"previous")
+        creator.add_item_for(
+            MANIFEST_PATH,
+            content=BuildManifest(
+                images={
+                    "images/foo.webp": ManifestImage(
+                        ident='"abc"', version=str(WebpMedium.VERSION)
+                    )
+                }
+            ).model_dump_json(),
+            mimetype="application/json",
+            is_front=False,
+        )
+    processor.previous_zim = PreviousZim(zim_path)
+
+    # online image is not a real image, this test stops before optimization
+    def download_from_online(asset_url: HttpUrl) -> BytesIO:  # noqa: ARG001
+        raise ValueError("downloaded")
+
+    monkeypatch.setattr(processor, "_download_from_online", download_from_online)
+
+    asset_path = ZimPath("images/foo.webp")
+    header_data = HeaderData(ident=ident, content_type="image/png")
+    if expected_reused:
+        assert (
+            processor._get_image_content(  # pyright: ignore[reportPrivateUsage]
+                asset_path, HttpUrl("https://www.acme.com/foo.png"), header_data
+            ).getvalue()
+            == b"previous"
+        )
+        assert processor.images[asset_path].ident == ident
+    else:
+        with pytest.raises(ValueError, match="downloaded"):
+            processor._get_image_content(  # pyright: ignore[reportPrivateUsage]
+                asset_path, HttpUrl("https://www.acme.com/foo.png"), header_data
+            )
+        assert asset_path not in processor.images
+
+
+@pytest.mark.parametrize(
+    "kind, asset_url, with_previous_zim, expected_requests",
+    [
+        pytest.param(
+            "img", "https://www.acme.com/foo.png", False, [False], id="img_no_cache"
+        ),
+        pytest.param(
+            "img", "https://www.acme.com/foo.png", True, [True, False], id="img_cache"
+        ),
+        pytest.param(
+            None, "https://www.acme.com/foo.png", True, [True, False], id="png_cache"
+        ),
+        pytest.param(
+            None, "https://www.acme.com/foo", True, [False], id="unknown_cache"
+        ),
+    ],
+)
+def test_get_asset_content_requests(
+    processor: AssetProcessor,
+    monkeypatch: pytest.MonkeyPatch,
+    kind: str | None,
+    asset_url: str,
+    with_previous_zim: bool,  # noqa: FBT001
+    expected_requests: list[bool],
+):
+    image = BytesIO()
+    Image.new("RGB", (10, 10)).save(image, format="PNG")
+    # for every request made, whether it was only a probe of headers
+    requests: list[bool] = []
+
+    def stream_file(
+        url: str,  # noqa: ARG001
+        byte_stream: BytesIO,
+        *,
+        only_first_block: bool = False,
+        **_: Any,
+    ) -> tuple[int, CaseInsensitiveDict[str]]:
+        requests.append(only_first_block)
+        content = image.getvalue()[:1] if only_first_block else image.getvalue()
+        byte_stream.write(content)
+        return len(content), CaseInsensitiveDict(
+            {"Content-Type": "image/png", "ETag": '"abc"'}
+        )
+
+    monkeypatch.setattr(asset, "stream_file", stream_file)
+    if with_previous_zim:
+        processor.previous_zim = Mock(get_image=Mock(return_value=None))
+
+    content = processor.get_asset_content(
+        asset_path=ZimPath("images/foo.webp"),
+        asset_url=HttpUrl(asset_url),
+        kind=kind,
+        always_fetch_online=False,
+    )
+    with Image.open(content) as optimized:
+        assert optimized.format == "WEBP"
+    assert requests == expected_requests
+
+
+def test_transcode_image_in_pool(processor: AssetProcessor):
+    image = BytesIO()
+    Image.new("RGB", (2000, 1000)).save(image, format="PNG")
+    processor.transcode_pool = create_transcode_pool(1)
+    try:
+        transcoded = processor._transcode_image(  # pyright: ignore[reportPrivateUsage]
+            image.getvalue()
+        )
+    finally:
+        processor.transcode_pool.shutdown()
+    with Image.open(BytesIO(transcoded)) as optimized:
+        assert optimized.format == "WEBP"
+        assert optimized.width * optimized.height <= 1280 * 720
+
+
+@pytest.mark.parametrize(
+    "content, expected_spooled",
+    [
+        pytest.param(b"small", False, id="small"),
+        pytest.param(b"x" * 100, True, id="big"),
+    ],
+)
+def test_process_asset_spooled(
+    manager: AssetManager,
+    processor: AssetProcessor,
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+    content: bytes,
+    expected_spooled: bool,  # noqa: FBT001
+):
+    monkeypatch.setattr(context, "tmp_folder", tmp_path)
+    monkeypatch.setattr(context, "asset_spool_threshold_bytes", 10)
+
+    def stream_file(
+        url: str, byte_stream: BytesIO, **_: Any  # noqa: ARG001
+    ) -> tuple[int, CaseInsensitiveDict[str]]:
+        for index in range(0, len(content), 4):
+            byte_stream.write(content[index : index + 4])
+        return len(content), CaseInsensitiveDict({"Content-Type": "application/pdf"})
+
+    added_items: list[dict[str, Any]] = []
+    zim_writer = Mock()
+    zim_writer.add_item_for.side_effect = lambda **kwargs: added_items.append(kwargs)
+    monkeypatch.setattr(asset, "stream_file", stream_file)
+    asset_path = ZimPath("some/asset")
+    assert processor.process_asset(asset_path, manager, zim_writer)
+    assert len(added_items) == 1
+    if expected_spooled:
+        assert added_items[0]["fpath"].read_bytes() == content
+        assert added_items[0]["delete_fpath"]
+    else:
+        assert added_items[0]["content"] == content
+
+
+def test_get_image_content_local_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(
+        context, "local_optimization_cache", tmp_path / "optimization.sqlite"
+    )
+    image = BytesIO()
+    Image.frombytes("L", (100, 100), bytes(range(100)) * 100).save(image, "PNG")
+    downloads: list[str] = []
+
+    def download_from_online(asset_url: HttpUrl) -> SpoolStream:
+        downloads.append(asset_url.value)
+        content = SpoolStream(max_memory_size=len(image.getvalue()), folder=tmp_path)
+        content.write(image.getvalue())
+        return content
+
+    asset_path = ZimPath("images/foo.png")
+    asset_url = HttpUrl("https://www.acme.com/foo.png")
+    header_data = HeaderData(ident='"abc"', content_type="image/png")
+    contents: list[bytes] = []
+    # second processor is like a subsequent run on the same host
+    for _ in range(2):
+        processor = AssetProcessor()
+        monkeypatch.setattr(processor, "_download_from_online", download_from_online)
+        contents.append(
+            processor._get_image_content(  # pyright: ignore[reportPrivateUsage]
+                asset_path, asset_url, header_data
+            ).getvalue()
+        )
+        processor.close()
+    assert downloads == [asset_url.value]
+    assert contents[0] == contents[1]
+
+
+def test_process_asset_host_circuit_open(
+    processor: AssetProcessor, monkeypatch: pytest.MonkeyPatch
+):
+    processor.circuit_breaker = CircuitBreaker(max_failures=1, cooldown_seconds=60)
+    requested_urls: list[str] = []
+
+    def stream_file(url: str, **_: Any) -> tuple[int, CaseInsensitiveDict[str]]:
+        requested_urls.append(url)
+        raise RequestsConnectionError(f"Failed to connect to {url}")
+
+    monkeypatch.setattr(asset, "stream_file", stream_file)
+    manager = AssetManager()
+    for index in range(3):
+        manager.add_asset(
+            asset_path=ZimPath(f"some/asset{index}"),
+            asset_url=HttpUrl(f"https://down.acme.com/asset{index}"),
+            used_by="page somewhere",
+            kind=None,
+            always_fetch_online=True,
+        )
+    zim_writer = Mock()
+    for asset_path in manager.assets:
+        assert not processor.process_asset(asset_path, manager, zim_writer)
+
+    # host is requested only until its circuit opens, remaining assets fail fast
+    assert requested_urls == ["https://down.acme.com/asset0"]
+    assert processor.bad_assets_count == 0
+    assert processor.unavailable_host_assets_count == 3
+    assert processor.circuit_breaker.tripped_hosts == {"down.acme.com": 3}
+    zim_writer.add_item_for.assert_not_called()
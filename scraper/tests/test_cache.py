@@ -0,0 +1,179 @@
+import time
+from collections.abc import Generator
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from mindtouch2zim.cache import (
+    CacheBackend,
+    FilesCache,
+    LocalOptimizationCache,
+    SqliteCache,
+)
+
+
+@pytest.fixture(params=["files", "sqlite"])
+def cache(request: pytest.FixtureRequest, tmp_path: Path) -> Generator[CacheBackend]:
+    backend = (
+        FilesCache(tmp_path)
+        if request.param == "files"
+        else SqliteCache(tmp_path / "cache.sqlite")
+    )
+    yield backend
+    backend.close()
+
+
+def test_cache_get_set(cache: CacheBackend):
+    assert cache.get("api_json/pages/12/contents.dat") is None
+    cache.set("api_json/pages/12/contents.dat", b'{"foo": "bar"}')
+    entry = cache.get("api_json/pages/12/contents.dat")
+    assert entry is not None
+    assert entry.content == b'{"foo": "bar"}'
+    assert entry.timestamp > 0
+    cache.set("api_json/pages/12/contents.dat", b"{}")
+    entry = cache.get("api_json/pages/12/contents.dat")
+    assert entry is not None
+    assert entry.content == b"{}"
+
+
+def test_cache_index_key(cache: CacheBackend):
+    cache.set("text/", b"home")
+    entry = cache.get("text/")
+    assert entry is not None
+    assert entry.content == b"home"
+
+
+def test_cache_concurrent(cache: CacheBackend):
+    def set_and_get(index: int) -> bytes | None:
+        cache.set(f"text/{index % 10}", f"content {index % 10}".encode())
+        entry = cache.get(f"text/{index % 10}")
+        return entry.content if entry else None
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(set_and_get, range(200)))
+    assert results == [f"content {index % 10}".encode() for index in range(200)]
+
+
+def test_sqlite_cache_single_file(tmp_path: Path):
+    cache = SqliteCache(tmp_path / "cache.sqlite")
+    for index in range(100):
+        cache.set(f"api_json/pages/{index}", b"foo" * 100)
+    cache.close()
+    assert {file.name for file in tmp_path.iterdir()} <= {
+        "cache.sqlite",
+        "cache.sqlite-wal",
+        "cache.sqlite-shm",
+    }
+
+
+def test_sqlite_cache_compressed(tmp_path: Path):
+    cache = SqliteCache(tmp_path / "cache.sqlite")
+    cache.set("key", b"foo" * 10000)
+    assert cache.total_size < 1000
+    cache.close()
+
+
+def test_sqlite_cache_not_compressed(tmp_path: Path):
+    cache = SqliteCache(tmp_path / "cache.sqlite", compress=False)
+    cache.set("key", b"foo" * 10000)
+    assert cache.total_size == 30000
+    entry = cache.get("key")
+    assert entry is not None
+    assert entry.content == b"foo" * 10000
+    cache.close()
+
+    # entries stored compressed are still read back once compression is disabled
+    cache = SqliteCache(tmp_path / "cache.sqlite")
+    cache.set("compressed", b"bar" * 10000)
+    cache.close()
+    cache = SqliteCache(tmp_path / "cache.sqlite", compress=False)
+    entry = cache.get("compressed")
+    assert entry is not None
+    assert entry.content == b"bar" * 10000
+    cache.close()
+
+
+def test_sqlite_cache_lru_eviction(tmp_path: Path):
+    content = bytes(range(256)) * 4  # not compressible much
+    cache = SqliteCache(tmp_path / "cache.sqlite")
+    cache.set("key0", content)
+    entry_size = cache.total_size
+    cache.close()
+
+    cache = SqliteCache(tmp_path / "cache.sqlite", max_size=entry_size * 3)
+    assert cache.total_size == entry_size  # size is restored when reopening
+    cache.set("key1", content)
+    cache.set("key2", content)
+    assert cache.get("key0") is not None  # key0 is now most recently used
+    cache.set("key3", content)
+    assert cache.total_size <= entry_size * 3
+    assert cache.get("key1") is None  # least recently used has been evicted
+    assert cache.get("key0") is not None
+    assert cache.get("key2") is not None
+    assert cache.get("key3") is not None
+    cache.close()
+
+
+def test_sqlite_cache_accesses_deferred(tmp_path: Path):
+    cache = SqliteCache(tmp_path / "cache.sqlite")
+    cache.set("key", b"foo")
+    cache.connection.execute("UPDATE entries SET accessed_at = 0")
+    cache.connection.commit()
+    assert cache.get("key") is not None
+    # cache hit is not written to the database yet
+    assert cache.connection.execute("SELECT accessed_at FROM entries").fetchone() == (
+        0,
+    )
+    cache.close()
+
+    cache = SqliteCache(tmp_path / "cache.sqlite")
+    # cache hit has been written when closing
+    (accessed_at,) = cache.connection.execute(
+        "SELECT accessed_at FROM entries"
+    ).fetchone()
+    assert accessed_at > 0
+    cache.close()
+
+
+def test_cache_validators(cache: CacheBackend):
+    cache.set("text/", b"home", etag='"abc"', last_modified="yesterday")
+    entry = cache.get("text/")
+    assert entry is not None
+    assert entry.etag == '"abc"'
+    assert entry.last_modified == "yesterday"
+    cache.set("text/", b"home")
+    entry = cache.get("text/")
+    assert entry is not None
+    assert entry.etag is None
+    assert entry.last_modified is None
+
+
+def test_cache_touch(cache: CacheBackend):
+    cache.set("text/", b"home", etag='"abc"')
+    entry = cache.get("text/")
+    assert entry is not None
+    time.sleep(0.01)
+    cache.touch("text/")
+    touched_entry = cache.get("text/")
+    assert touched_entry is not None
+    assert touched_entry.timestamp > entry.timestamp
+    assert touched_entry.content == b"home"
+    assert touched_entry.etag == '"abc"'
+
+
+def test_local_optimization_cache(tmp_path: Path):
+    cache = LocalOptimizationCache(tmp_path / "folder" / "images.sqlite")
+    meta = {"ident": '"abc"', "version": "1"}
+    assert cache.get("medium/foo.png", meta) is None
+    cache.set("medium/foo.png", meta, b"optimized")
+    cache.close()
+
+    # entries are kept between runs, and match only with same metadata
+    cache = LocalOptimizationCache(tmp_path / "folder" / "images.sqlite")
+    assert cache.get("medium/foo.png", meta) == b"optimized"
+    assert cache.get("medium/foo.png", {"ident": '"def"', "version": "1"}) is None
+    assert cache.get("medium/foo.png", {"ident": '"abc"', "version": "2"}) is None
+    cache.set("medium/foo.png", {"ident": '"def"', "version": "1"}, b"changed")
+    assert cache.get("medium/foo.png", meta) is None
+    cache.close()
@@ -0,0 +1,97 @@
+import pytest
+from requests import Response
+from requests.exceptions import ConnectionError as RequestsConnectionError
+from requests.exceptions import HTTPError, ReadTimeout, RequestException
+
+from mindtouch2zim.circuit_breaker import CircuitBreaker, is_host_failure
+from mindtouch2zim.errors import HostCircuitOpenError
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture()
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.fixture()
+def breaker(clock: FakeClock) -> CircuitBreaker:
+    return CircuitBreaker(max_failures=3, cooldown_seconds=60, clock=clock)
+
+
+def http_error(status_code: int) -> HTTPError:
+    response = Response()
+    response.status_code = status_code
+    return HTTPError(response=response)
+
+
+@pytest.mark.parametrize(
+    "exc, expected",
+    [
+        pytest.param(RequestsConnectionError(), True, id="connection"),
+        pytest.param(ReadTimeout(), True, id="timeout"),
+        pytest.param(http_error(503), True, id="503"),
+        pytest.param(http_error(404), False, id="404"),
+        pytest.param(RequestException(), False, id="other"),
+    ],
+)
+def test_is_host_failure(exc: RequestException, expected: bool):  # noqa: FBT001
+    assert is_host_failure(exc) == expected
+
+
+def test_circuit_breaker_opens(breaker: CircuitBreaker):
+    for _ in range(2):
+        breaker.check("www.acme.com")
+        breaker.record_failure("www.acme.com")
+    breaker.check("www.acme.com")
+    breaker.record_failure("www.acme.com")
+    for _ in range(4):
+        with pytest.raises(HostCircuitOpenError):
+            breaker.check("www.acme.com")
+    # other hosts are not impacted
+    breaker.check("www.other.com")
+    assert breaker.tripped_hosts == {"www.acme.com": 4}
+
+
+def test_circuit_breaker_success_resets(breaker: CircuitBreaker):
+    for _ in range(2):
+        breaker.record_failure("www.acme.com")
+    breaker.record_success("www.acme.com")
+    for _ in range(2):
+        breaker.record_failure("www.acme.com")
+    breaker.check("www.acme.com")
+    assert breaker.tripped_hosts == {}
+
+
+def test_circuit_breaker_probe(breaker: CircuitBreaker, clock: FakeClock):
+    for _ in range(3):
+        breaker.record_failure("www.acme.com")
+    clock.now = 59
+    with pytest.raises(HostCircuitOpenError):
+        breaker.check("www.acme.com")
+
+    # a single probe is let through once cooldown is over
+    clock.now = 60
+    breaker.check("www.acme.com")
+    with pytest.raises(HostCircuitOpenError):
+        breaker.check("www.acme.com")
+
+    # circuit stays open for another cooldown period when probe fails
+    breaker.record_failure("www.acme.com")
+    clock.now = 119
+    with pytest.raises(HostCircuitOpenError):
+        breaker.check("www.acme.com")
+
+    # circuit is closed when probe succeeds
+    clock.now = 120
+    breaker.check("www.acme.com")
+    breaker.record_success("www.acme.com")
+    breaker.check("www.acme.com")
+    breaker.check("www.acme.com")
+    assert breaker.tripped_hosts == {"www.acme.com": 3}
@@ -1,9 +1,29 @@
+import json
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler
+from pathlib import Path
+from typing import Any
+
 import pytest
+from requests.exceptions import HTTPError
 
+from mindtouch2zim import client
 from mindtouch2zim.client import (
+    LibraryTree,
+    MindtouchClient,
     _get_welcome_text_from_home,  # pyright: ignore[reportPrivateUsage]
 )
+from mindtouch2zim.context import Context
+from mindtouch2zim.errors import MindtouchParsingError
 from mindtouch2zim.html_utils import get_soup
+from mindtouch2zim.rate_limiter import AdaptiveRateLimiter
+
+from .conftest import LocalServer
+
+context = Context.get()
 
 
 @pytest.mark.parametrize(
@@ -55,3 +75,337 @@ from mindtouch2zim.html_utils import get_soup
 )
 def test_get_welcome_text_from_home(content: str, expected: str):
     assert _get_welcome_text_from_home(get_soup(content)) == expected
+
+
+@pytest.fixture()
+def raw_definitions() -> dict[str, Any]:
+    return {
+        "/pages/1": {"tags": {"tag": {"@value": "article:topic-category"}}},
+        "/pages/2": {
+            "tags": {"tag": [{"@value": "coverpage:yes"}, {"@value": "foo"}]},
+            "page.parent": {"@id": "1"},
+        },
+        "/pages/3": {
+            "tags": {"tag": {"@value": "article:topic-guide"}},
+            "page.parent": {"@id": "2"},
+        },
+        "/pages/4": {
+            "tags": {"tag": {"@value": "article:topic"}},
+            "page.parent": {"@id": "3"},
+            "@revision": "7",
+        },
+        "/pages/5": {
+            "tags": {"tag": {"@value": "article:topic"}},
+            "page.parent": {"@id": "3"},
+            "date.modified": "2024-11-12T10:00:00Z",
+        },
+    }
+
+
+@pytest.fixture()
+def library_tree() -> LibraryTree:
+    encoded_url = "https://www.acme.com/A_Page"
+    tree = LibraryTree()
+    tree.add_page(page_id="1", title="Category", path="", encoded_url=encoded_url)
+    for page_id, parent_id in [("2", "1"), ("3", "2"), ("4", "3"), ("5", "3")]:
+        tree.add_page(
+            page_id=page_id,
+            title=f"Page {page_id}",
+            path=f"Page_{page_id}",
+            encoded_url=encoded_url,
+            parent_index=tree.indexes_by_id[parent_id],
+        )
+    return tree
+
+
+@pytest.fixture()
+def client_calls(
+    raw_definitions: dict[str, Any], monkeypatch: pytest.MonkeyPatch
+) -> tuple[MindtouchClient, list[str]]:
+    client = MindtouchClient()
+    calls: list[str] = []
+
+    def get_api_json(api_sub_path: str, **_: Any) -> Any:
+        calls.append(api_sub_path)
+        return raw_definitions[api_sub_path]
+
+    monkeypatch.setattr(client, "_get_api_json", get_api_json)
+    return client, calls
+
+
+def test_get_cover_page_memoized(
+    client_calls: tuple[MindtouchClient, list[str]], library_tree: LibraryTree
+):
+    client, calls = client_calls
+    cover_page = client.get_cover_page(library_tree.pages["4"])
+    assert cover_page is not None
+    assert cover_page.id == "2"
+    # walk stops at the cover page, pages above are never requested
+    assert calls == ["/pages/4", "/pages/3", "/pages/2"]
+
+    calls.clear()
+    assert client.get_cover_page_id(library_tree.pages["5"]) == "2"
+    assert calls == ["/pages/5"]  # parents are already resolved
+
+    calls.clear()
+    assert client.get_cover_page_id(library_tree.pages["4"]) == "2"
+    assert client.get_cover_page_id("4") == "2"  # definitions are already known
+    assert calls == []
+
+
+def test_get_cover_page_category(
+    client_calls: tuple[MindtouchClient, list[str]], library_tree: LibraryTree
+):
+    client, calls = client_calls
+    assert client.get_cover_page(library_tree.pages["1"]) is None
+    assert client.get_cover_page_id("1") is None
+    assert calls == ["/pages/1"]
+
+
+def test_page_definition_revision(
+    client_calls: tuple[MindtouchClient, list[str]], library_tree: LibraryTree
+):
+    client, _ = client_calls
+    assert client.get_page_definition(library_tree.pages["3"]).revision is None
+    assert client.get_page_definition(library_tree.pages["4"]).revision == "7"
+    assert (
+        client.get_page_definition(library_tree.pages["5"]).revision
+        == "2024-11-12T10:00:00Z"
+    )
+
+
+@pytest.fixture()
+def local_client(
+    local_server: LocalServer, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> MindtouchClient:
+    monkeypatch.setattr(context, "library_url", local_server.url)
+    monkeypatch.setattr(context, "cache_folder", tmp_path)
+    return MindtouchClient()
+
+
+@pytest.mark.parametrize("cache_backend", ["sqlite", "files"])
+def test_api_cache_revalidation(
+    local_client: MindtouchClient,
+    local_server: LocalServer,
+    monkeypatch: pytest.MonkeyPatch,
+    cache_backend: str,
+):
+    monkeypatch.setattr(context, "cache_backend", cache_backend)
+    version = {"value": "1"}
+
+    def respond(request: BaseHTTPRequestHandler) -> tuple[int, dict[str, str], bytes]:
+        etag = f'"v{version["value"]}"'
+        if request.headers.get("If-None-Match") == etag:
+            return (304, {"ETag": etag}, b"")
+        return (200, {"ETag": etag}, f'{{"version": {version["value"]}}}'.encode())
+
+    local_server.respond = respond
+
+    assert local_client._get_api_json(
+        "/pages/12"
+    ) == {  # pyright: ignore[reportPrivateUsage]
+        "version": 1
+    }
+    assert len(local_server.requests) == 1
+
+    # without max age, cache is used forever
+    assert local_client._get_api_json(
+        "/pages/12"
+    ) == {  # pyright: ignore[reportPrivateUsage]
+        "version": 1
+    }
+    assert len(local_server.requests) == 1
+
+    # once max age is expired, content is revalidated
+    monkeypatch.setattr(context, "cache_max_age", 0)
+    time.sleep(0.01)
+    assert local_client._get_api_json(
+        "/pages/12"
+    ) == {  # pyright: ignore[reportPrivateUsage]
+        "version": 1
+    }
+    assert len(local_server.requests) == 2
+    assert local_server.requests[-1].headers.get("If-None-Match") == '"v1"'
+
+    # and downloaded again when changed
+    version["value"] = "2"
+    time.sleep(0.01)
+    assert local_client._get_api_json(
+        "/pages/12"
+    ) == {  # pyright: ignore[reportPrivateUsage]
+        "version": 2
+    }
+    assert len(local_server.requests) == 3
+
+    # cache entry has been updated with new content and validators
+    monkeypatch.setattr(context, "cache_max_age", 3600)
+    assert local_client._get_api_json(
+        "/pages/12"
+    ) == {  # pyright: ignore[reportPrivateUsage]
+        "version": 2
+    }
+    assert len(local_server.requests) == 3
+    local_client.close()
+
+
+def test_api_retry_after(local_client: MindtouchClient, local_server: LocalServer):
+    requested_at: list[float] = []
+
+    def respond(_: BaseHTTPRequestHandler) -> tuple[int, dict[str, str], bytes]:
+        requested_at.append(time.monotonic())
+        if len(requested_at) == 1:
+            return (429, {"Retry-After": "1"}, b"")
+        return (200, {}, b"{}")
+
+    local_server.respond = respond
+    assert (
+        local_client._get_api_resp(  # pyright: ignore[reportPrivateUsage]
+            "/pages/12", timeout=5
+        ).status_code
+        == 200
+    )
+    assert len(requested_at) == 2
+    assert requested_at[1] - requested_at[0] >= 1
+
+
+def test_api_throttled_gives_up(
+    local_client: MindtouchClient,
+    local_server: LocalServer,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    monkeypatch.setattr(client, "MAX_THROTTLED_ATTEMPTS", 3)
+    local_client.rate_limiter = AdaptiveRateLimiter(max_rps=None, sleep=lambda _: None)
+    local_server.respond = lambda _: (503, {}, b"")
+    with pytest.raises(HTTPError):
+        local_client._get_api_resp(  # pyright: ignore[reportPrivateUsage]
+            "/pages/12", timeout=5
+        )
+    assert len(local_server.requests) == 3
+
+
+def test_api_adaptive_rate(local_client: MindtouchClient, local_server: LocalServer):
+    # server accepts at most 10 requests per second
+    lock = threading.Lock()
+    accepted_at: list[float] = []
+    throttled: list[float] = []
+
+    def respond(_: BaseHTTPRequestHandler) -> tuple[int, dict[str, str], bytes]:
+        now = time.monotonic()
+        with lock:
+            if len([at for at in accepted_at if at > now - 1]) >= 10:
+                throttled.append(now)
+                return (429, {}, b"")
+            accepted_at.append(now)
+        return (200, {}, b"{}")
+
+    local_server.respond = respond
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        list(
+            executor.map(
+                lambda page_id: local_client._get_api_resp(  # pyright: ignore[reportPrivateUsage]
+                    f"/pages/{page_id}", timeout=5
+                ),
+                range(40),
+            )
+        )
+    assert len(accepted_at) == 40
+    # client slowed down once throttled, instead of hammering the server
+    assert local_client.rate_limiter.rate < math.inf
+    assert len(throttled) < 40
+
+
+def tree_page_node(page_id: str, subpages: Any) -> dict[str, Any]:
+    return {
+        "@id": page_id,
+        "@href": f"https://www.acme.com/@api/deki/pages/{page_id}",
+        "title": f"Page {page_id}",
+        "path": {"@seo": "true", "#text": f"Path/{page_id}"},
+        "uri.ui": f"https://www.acme.com/Path/{page_id}",
+        "page.parent": {"page": {"@id": "0", "title": "Not a page of the tree"}},
+        "subpages": subpages,
+    }
+
+
+def test_get_page_tree(monkeypatch: pytest.MonkeyPatch):
+    client = MindtouchClient()
+    calls: list[str] = []
+
+    def get_api_json_raw(api_sub_path: str, **_: Any) -> bytes:
+        calls.append(api_sub_path)
+        return json.dumps(
+            {
+                "page": tree_page_node(
+                    "1",
+                    {
+                        "page": [
+                            tree_page_node(
+                                "2", {"page": tree_page_node("3", {"@count": 0})}
+                            ),
+                            tree_page_node("4", ""),
+                        ]
+                    },
+                )
+            }
+        ).encode()
+
+    monkeypatch.setattr(client, "_get_api_json_raw", get_api_json_raw)
+    tree = client.get_page_tree()
+    assert list(tree.pages.keys()) == ["1", "2", "3", "4"]
+    assert tree.root is tree.pages["1"]
+    assert [child.id for child in tree.root.children] == ["2", "4"]
+    assert tree.pages["3"].parent is tree.pages["2"]
+    assert tree.pages["2"].parent is tree.root
+    assert tree.pages["3"].title == "Page 3"
+    assert tree.pages["3"].path == "Path/3"
+    assert tree.pages["3"].encoded_url == "https://www.acme.com/Path/3"
+    assert tree.pages["3"].children == []
+
+    # tree is parsed only once
+    assert client.get_root_page_id() == "1"
+    assert client.get_all_pages_ids() == ["1", "2", "3", "4"]
+    assert client.get_page_tree("1") is tree
+    assert calls == ["/pages/home/tree"]
+
+
+def test_get_page_tree_deep(monkeypatch: pytest.MonkeyPatch):
+    client = MindtouchClient()
+    depth = 2000  # above the recursion limit
+    tree_data = '""'
+    for page_id in range(depth, 0, -1):
+        tree_data = (
+            f'{{"@id": "{page_id}", "title": "Page {page_id}", "path": {{"#text": '
+            f'"Path/{page_id}"}}, "uri.ui": "https://www.acme.com/{page_id}", '
+            f'"subpages": {{"page": {tree_data}}}}}'
+        )
+    monkeypatch.setattr(
+        client,
+        "_get_api_json_raw",
+        lambda *_, **__: f'{{"page": {tree_data}}}'.encode(),
+    )
+    tree = client.get_page_tree()
+    assert len(tree.pages) == depth
+    assert len(tree.pages[str(depth)].self_and_parents) == depth
+
+
+def test_get_page_tree_incomplete(monkeypatch: pytest.MonkeyPatch):
+    client = MindtouchClient()
+    monkeypatch.setattr(
+        client, "_get_api_json_raw", lambda *_, **__: b'{"page": {"@id": "1"}}'
+    )
+    with pytest.raises(MindtouchParsingError, match="Incomplete page node"):
+        client.get_page_tree()
+
+
+@pytest.mark.parametrize(
+    "tree_data",
+    [
+        pytest.param(b'{"page" {"@id" "1"}}', id="missing_colons"),
+        pytest.param(b'{"page": {"@id": "1",,,}}', id="extra_commas"),
+        pytest.param(b'{"page": {"@id": "1"}', id="truncated"),
+    ],
+)
+def test_get_page_tree_malformed(monkeypatch: pytest.MonkeyPatch, tree_data: bytes):
+    client = MindtouchClient()
+    monkeypatch.setattr(client, "_get_api_json_raw", lambda *_, **__: tree_data)
+    with pytest.raises(json.JSONDecodeError):
+        client.get_page_tree()
@@ -23,6 +23,7 @@ def test_context_defaults():
     context = Context.get()
     assert context == processor_context  # check both objects are same
     assert context.assets_workers == 10
+    assert context.pages_workers == 10
     assert re.match(  # check getter logic
         r"mindtouch2zim\/.* \(https:\/\/www\.kiwix\.org\) zimscraperlib\/.*",
         context.wm_user_agent,
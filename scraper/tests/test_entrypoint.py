@@ -1,3 +1,4 @@
+import os
 import re
 import tempfile
 from pathlib import Path
@@ -66,6 +67,24 @@ def test_entrypoint_missing(good_cli_args: list[str], missing_input: str, tmpdir
         prepare_context(bad_cli_args, tmpdir)
 
 
+@pytest.mark.parametrize(
+    "arg_name, arg_value",
+    [
+        pytest.param("--assets-workers", "0", id="assets_workers_zero"),
+        pytest.param("--assets-workers", "foo", id="assets_workers_not_int"),
+        pytest.param("--assets-workers-per-host", "0", id="assets_workers_per_host"),
+        pytest.param("--image-processes", "0", id="image_processes"),
+        pytest.param("--pages-workers", "-1", id="pages_workers"),
+    ],
+)
+def test_entrypoint_invalid_workers(
+    good_cli_args: list[str], tmpdir: str, arg_name: str, arg_value: str
+):
+    """Passing a number of workers below 1 raises an error."""
+    with pytest.raises(SystemExit):
+        prepare_context([*good_cli_args, arg_name, arg_value], tmpdir)
+
+
 @pytest.mark.parametrize(
     "context_name, expected_context_value",
     [
@@ -85,7 +104,25 @@ def test_entrypoint_missing(good_cli_args: list[str], missing_input: str, tmpdir
         pytest.param("stats_filename", None, id="stats_filename"),
         pytest.param("illustration_url", None, id="illustration_url"),
         pytest.param("s3_url_with_credentials", None, id="s3_url_with_credentials"),
+        pytest.param("local_optimization_cache", None, id="local_optimization_cache"),
+        pytest.param(
+            "local_optimization_cache_max_size_mb",
+            None,
+            id="local_optimization_cache_max_size_mb",
+        ),
         pytest.param("assets_workers", 10, id="assets_workers"),
+        pytest.param("assets_workers_per_host", 5, id="assets_workers_per_host"),
+        pytest.param("assets_workers_auto", False, id="assets_workers_auto"),
+        pytest.param("pages_workers", 10, id="pages_workers"),
+        pytest.param("api_max_rps", None, id="api_max_rps"),
+        pytest.param("rewrite_processes", 0, id="rewrite_processes"),
+        pytest.param(
+            "image_processes", os.process_cpu_count() or 1, id="image_processes"
+        ),
+        pytest.param("cache_backend", "sqlite", id="cache_backend"),
+        pytest.param("cache_max_size_mb", None, id="cache_max_size_mb"),
+        pytest.param("cache_max_age", None, id="cache_max_age"),
+        pytest.param("previous_zim", None, id="previous_zim"),
         pytest.param("bad_assets_threshold", 10, id="bad_assets_threshold"),
         pytest.param("contact_info", "https://www.kiwix.org", id="contact_info"),
     ],
@@ -216,6 +253,20 @@ def test_entrypoint_defaults_env_var(
             "https://s3.acme.com/?keyId=xxx&secretAccessKey=xxx&bucketName=foo",
             id="s3_url_with_credentials",
         ),
+        pytest.param(
+            "--local-optimization-cache",
+            "/cache/images.sqlite",
+            "local_optimization_cache",
+            Path("/cache/images.sqlite"),
+            id="local_optimization_cache",
+        ),
+        pytest.param(
+            "--local-optimization-cache-max-size",
+            "500",
+            "local_optimization_cache_max_size_mb",
+            500,
+            id="local_optimization_cache_max_size_mb",
+        ),
         pytest.param(
             "--assets-workers",
             "123",
@@ -223,6 +274,83 @@ def test_entrypoint_defaults_env_var(
             123,
             id="assets_workers",
         ),
+        pytest.param(
+            "--assets-workers",
+            "auto",
+            "assets_workers_auto",
+            True,
+            id="assets_workers_auto",
+        ),
+        pytest.param(
+            "--assets-workers-per-host",
+            "3",
+            "assets_workers_per_host",
+            3,
+            id="assets_workers_per_host",
+        ),
+        pytest.param(
+            "--pages-workers",
+            "12",
+            "pages_workers",
+            12,
+            id="pages_workers",
+        ),
+        pytest.param(
+            "--api-max-rps",
+            "2.5",
+            "api_max_rps",
+            2.5,
+            id="api_max_rps",
+        ),
+        pytest.param(
+            "--rewrite-processes",
+            "4",
+            "rewrite_processes",
+            4,
+            id="rewrite_processes",
+        ),
+        pytest.param(
+            "--image-processes",
+            "3",
+            "image_processes",
+            3,
+            id="image_processes",
+        ),
+        pytest.param(
+            "--cache-backend",
+            "files",
+            "cache_backend",
+            "files",
+            id="cache_backend",
+        ),
+        pytest.param(
+            "--cache-max-size",
+            "500",
+            "cache_max_size_mb",
+            500,
+            id="cache_max_size_mb",
+        ),
+        pytest.param(
+            "--cache-max-age",
+            "86400",
+            "cache_max_age",
+            86400,
+            id="cache_max_age",
+        ),
+        pytest.param(
+            "--cache-max-age",
+            "0",
+            "cache_max_age",
+            0,
+            id="cache_max_age_zero",
+        ),
+        pytest.param(
+            "--previous-zim",
+            "/output/previous.zim",
+            "previous_zim",
+            Path("/output/previous.zim"),
+            id="previous_zim",
+        ),
         pytest.param(
             "--bad-assets-threshold",
             "123",
@@ -6,7 +6,6 @@ from zimscraperlib.rewriting.url_rewriting import (
 )
 
 from mindtouch2zim.asset import AssetDetails, AssetManager
-from mindtouch2zim.client import LibraryPage
 from mindtouch2zim.html_rewriting import HtmlUrlsRewriter
 
 
@@ -14,12 +13,7 @@ from mindtouch2zim.html_rewriting import HtmlUrlsRewriter
 def url_rewriter() -> HtmlUrlsRewriter:
     return HtmlUrlsRewriter(
         library_url="https://www.acme.com",
-        page=LibraryPage(
-            id="123",
-            title="a page",
-            path="A_Page",
-            encoded_url="https://www.acme.com/A_Page",
-        ),
+        page_path="A_Page",
         existing_zim_paths={
             ZimPath("www.acme.com/existing.html"),
             ZimPath("www.acme.com/existing.html?foo=bar"),
@@ -370,3 +364,20 @@ def test_html_href_rewriting(
     assert rewritten.content == expected_html
     assert rewritten.title == ""
     assert url_rewriter.asset_manager.assets == expected_items_to_download
+
+
+def test_html_href_link_paths(
+    url_rewriter: HtmlUrlsRewriter, html_rewriter: HtmlRewriter
+):
+    html_rewriter.rewrite(
+        '<a href="https://www.acme.com/existing.html#67">Page 1</a>'
+        '<a href="https://www.acme.com/missing.html">Page 2</a>'
+        '<a href="https://www.foo.bar/index.html">Page 3</a>'
+        '<a href="#67">Page 4</a>'
+        '<img src="https://www.acme.com/image1.png"></img>'
+    )
+    # only links to library pages are recorded, in-ZIM or not
+    assert url_rewriter.link_paths == {
+        ZimPath("www.acme.com/existing.html"),
+        ZimPath("www.acme.com/missing.html"),
+    }
@@ -0,0 +1,60 @@
+import pytest
+
+from mindtouch2zim.html_utils import get_soup, get_text
+
+
+@pytest.mark.parametrize(
+    "content, expected",
+    [
+        pytest.param("", "", id="empty"),
+        pytest.param("Hello", "Hello", id="text_only"),
+        pytest.param(
+            "<p>Hello <b>world</b> !</p>\n<p> Bye </p>",
+            "Hello\nworld\n!\nBye",
+            id="simple",
+        ),
+        pytest.param(
+            "<!DOCTYPE html><html><head><title>Title</title><style>p{}</style>"
+            "<script>var a = '<p>';</script></head><body><!-- comment --><?pi x?>"
+            "<p>Body</p></body></html>",
+            "Title\nBody",
+            id="document",
+        ),
+        pytest.param(
+            "<ruby>漢<rp>(</rp><rt>kan</rt><rp>)</rp></ruby>"
+            "<template><p>hidden</p></template>",
+            "漢",
+            id="non_text_tags",
+        ),
+        pytest.param(
+            "<p>A&amp;B&nbsp;&#233;&unknown;</p>", "A&B\xa0é&unknown;", id="entities"
+        ),
+        pytest.param(
+            "<table><tr><td>1<td>2</table>unclosed <div><span>end",
+            "1\n2\nunclosed\nend",
+            id="malformed",
+        ),
+    ],
+)
+def test_get_text(content: str, expected: str):
+    assert get_text(content) == expected
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        pytest.param(
+            "<pre>\n  code </pre><textarea> area </textarea><noscript>ns</noscript>"
+            "<svg><style>s</style><text>svg</text></svg><math><mi>x</mi></math>",
+            id="special_tags",
+        ),
+        pytest.param("a<b>b<", id="unfinished_tag"),
+        pytest.param("a\r\nb\rc\x00d &#0; &#x1F600;", id="special_chars"),
+        pytest.param(
+            "<select><option>o</option></select><xmp><b>x</b></xmp><plaintext>p<b>q",
+            id="raw_text",
+        ),
+    ],
+)
+def test_get_text_same_as_soup(content: str):
+    assert get_text(content) == get_soup(content).getText("\n", strip=True)
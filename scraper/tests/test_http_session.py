@@ -0,0 +1,51 @@
+import pytest
+
+from mindtouch2zim import http_session
+from mindtouch2zim.http_session import StatsHTTPAdapter, get_web_session
+
+from .conftest import LocalServer
+
+
+def get_adapter(session: http_session.requests.Session, url: str) -> StatsHTTPAdapter:
+    adapter = session.get_adapter(url)
+    assert isinstance(adapter, StatsHTTPAdapter)
+    return adapter
+
+
+def test_web_session_keep_alive(local_server: LocalServer):
+    session = get_web_session(library_url=local_server.url, pool_maxsize=2)
+    for _ in range(5):
+        session.get(f"{local_server.url}/foo").raise_for_status()
+    library_adapter = get_adapter(session, f"{local_server.url}/foo")
+    assert library_adapter.name == "library"
+    assert library_adapter.stats == (5, 1)
+    assert library_adapter.stats.reused_ratio == 0.8
+    other_adapter = get_adapter(session, "https://www.acme.com/foo")
+    assert other_adapter.name == "other hosts"
+    assert other_adapter.stats == (0, 0)
+    assert other_adapter.stats.reused_ratio == 0
+
+
+@pytest.mark.parametrize(
+    "library_url",
+    [
+        pytest.param("https://library.acme.com", id="no_trailing_slash"),
+        pytest.param("https://library.acme.com/", id="trailing_slash"),
+    ],
+)
+def test_web_session_library_adapter(library_url: str):
+    session = get_web_session(library_url=library_url, pool_maxsize=2)
+    assert get_adapter(session, "https://library.acme.com/foo").name == "library"
+    assert get_adapter(session, "https://www.acme.com/foo").name == "other hosts"
+
+
+def test_web_session_discarded_pools(
+    local_server: LocalServer, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setattr(http_session, "MAX_HOSTS_POOLS", 1)
+    session = get_web_session(library_url="https://library.acme.com", pool_maxsize=2)
+    port = local_server.url.rsplit(":", 1)[1]
+    for host in ("127.0.0.1", "127.0.0.1", "localhost", "127.0.0.1"):
+        session.get(f"http://{host}:{port}/foo").raise_for_status()
+    # only one host pool is kept at once, stats of discarded ones are kept
+    assert get_adapter(session, local_server.url).stats == (4, 3)
@@ -0,0 +1,128 @@
+from pathlib import Path
+
+import pytest
+from zimscraperlib.rewriting.url_rewriting import ZimPath
+from zimscraperlib.zim import Creator
+
+from mindtouch2zim.constants import VERSION
+from mindtouch2zim.previous_zim import (
+    MANIFEST_PATH,
+    BuildManifest,
+    ManifestAsset,
+    ManifestPage,
+    PreviousZim,
+)
+from mindtouch2zim.ui import PageContentModel
+
+
+def build_zim(fpath: Path, manifest: BuildManifest | None):
+    with Creator(fpath, "index.html").config_dev_metadata() as creator:
+        creator.add_item_for("index.html", content="<html></html>", is_front=True)
+        for page_id in ("12", "13"):
+            creator.add_item_for(
+                f"content/page_content_{page_id}.json",
+                content=PageContentModel(
+                    html_body=f"<p>Page {page_id}</p>"
+                ).model_dump_json(by_alias=True),
+                mimetype="application/json",
+                is_front=False,
+            )
+        if manifest:
+            creator.add_item_for(
+                MANIFEST_PATH,
+                content=manifest.model_dump_json(),
+                mimetype="application/json",
+                is_front=False,
+            )
+
+
+@pytest.fixture()
+def previous_zim(tmp_path: Path) -> PreviousZim:
+    fpath = tmp_path / "previous.zim"
+    build_zim(
+        fpath,
+        BuildManifest(
+            scraper_version=VERSION,
+            pages={
+                "12": ManifestPage(
+                    revision="3",
+                    assets=["mathjax/foo.svg"],
+                    links={"www.acme.com/Foo": True, "www.acme.com/Bar": False},
+                ),
+                "14": ManifestPage(revision="1", assets=[]),
+            },
+            assets={
+                "mathjax/foo.svg": ManifestAsset(
+                    urls=["https://www.example.com/foo.svg"],
+                    kind=None,
+                    always_fetch_online=True,
+                )
+            },
+        ),
+    )
+    return PreviousZim(fpath)
+
+
+# paths of pages currently in the ZIM
+EXISTING_ZIM_PATHS = {ZimPath("www.acme.com/Foo"), ZimPath("www.acme.com/Baz")}
+
+
+def test_previous_zim_get_page(previous_zim: PreviousZim):
+    previous_page = previous_zim.get_page("12", "3", EXISTING_ZIM_PATHS)
+    assert previous_page is not None
+    manifest_page, html_body = previous_page
+    assert manifest_page.assets == ["mathjax/foo.svg"]
+    assert html_body == "<p>Page 12</p>"
+    assert previous_zim.manifest.assets["mathjax/foo.svg"].always_fetch_online
+
+
+@pytest.mark.parametrize(
+    "page_id, revision",
+    [
+        pytest.param("12", "4", id="modified"),
+        pytest.param("13", "1", id="not_in_manifest"),
+        pytest.param("14", "1", id="missing_content"),
+    ],
+)
+def test_previous_zim_page_not_reusable(
+    previous_zim: PreviousZim, page_id: str, revision: str
+):
+    assert previous_zim.get_page(page_id, revision, EXISTING_ZIM_PATHS) is None
+
+
+def test_previous_zim_without_manifest(tmp_path: Path):
+    fpath = tmp_path / "previous.zim"
+    build_zim(fpath, None)
+    assert PreviousZim(fpath).get_page("12", "3", EXISTING_ZIM_PATHS) is None
+
+
+def test_previous_zim_has_page(previous_zim: PreviousZim):
+    assert previous_zim.has_page("12")
+    assert not previous_zim.has_page("13")
+
+
+@pytest.mark.parametrize(
+    "existing_zim_paths",
+    [
+        pytest.param({ZimPath("www.acme.com/Baz")}, id="linked_page_removed"),
+        pytest.param(
+            {ZimPath("www.acme.com/Foo"), ZimPath("www.acme.com/Bar")},
+            id="linked_page_added",
+        ),
+    ],
+)
+def test_previous_zim_links_changed(
+    previous_zim: PreviousZim, existing_zim_paths: set[ZimPath]
+):
+    assert previous_zim.get_page("12", "3", existing_zim_paths) is None
+
+
+def test_previous_zim_scraper_upgraded(
+    previous_zim: PreviousZim, monkeypatch: pytest.MonkeyPatch
+):
+    previous_zim.discard_stale_pages()
+    assert previous_zim.has_page("12")
+    monkeypatch.setattr("mindtouch2zim.previous_zim.VERSION", "1000.0.0")
+    previous_zim.discard_stale_pages()
+    assert previous_zim.get_page("12", "3", EXISTING_ZIM_PATHS) is None
+    assert not previous_zim.has_page("12")
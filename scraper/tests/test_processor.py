@@ -1,9 +1,22 @@
 import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from unittest.mock import Mock
 
 import pytest
+from requests import Response
+from requests.exceptions import HTTPError
+from zimscraperlib.rewriting.url_rewriting import HttpUrl, ZimPath
 
+from mindtouch2zim.asset import AssetManager
 from mindtouch2zim.client import LibraryPage, LibraryTree
-from mindtouch2zim.processor import ContentFilter
+from mindtouch2zim.context import Context
+from mindtouch2zim.processor import ContentFilter, ProcessedPage, Processor
+from mindtouch2zim.zim_writer import ZimWriter
+
+context = Context.get()
 
 
 @pytest.fixture(scope="module")
@@ -13,123 +26,30 @@ def dummy_encoded_url() -> str:
 
 @pytest.fixture(scope="module")
 def library_tree(dummy_encoded_url: str) -> LibraryTree:
-    root = LibraryPage(
-        id="24", title="Home page", path="", encoded_url=dummy_encoded_url
-    )
-    topic1 = LibraryPage(
-        id="25",
-        title="1: First topic",
-        path="1_First_Topic",
-        parent=root,
-        encoded_url=dummy_encoded_url,
-    )
-    root.children.append(topic1)
-    topic1_1 = LibraryPage(
-        id="26",
-        title="1.1: Cloud",
-        path="1.1_Cloud",
-        parent=topic1,
-        encoded_url=dummy_encoded_url,
-    )
-    topic1.children.append(topic1_1)
-    topic1_2 = LibraryPage(
-        id="27",
-        title="1.2: Tree",
-        path="1.2_Tree",
-        parent=topic1,
-        encoded_url=dummy_encoded_url,
-    )
-    topic1.children.append(topic1_2)
-    topic1_3 = LibraryPage(
-        id="28",
-        title="1.3: Bees",
-        path="1.3_Bees",
-        parent=topic1,
-        encoded_url=dummy_encoded_url,
-    )
-    topic1.children.append(topic1_3)
-    topic2 = LibraryPage(
-        id="29",
-        title="2: Second topic",
-        path="2_Second_Topic",
-        parent=root,
-        encoded_url=dummy_encoded_url,
-    )
-    root.children.append(topic2)
-    topic2_1 = LibraryPage(
-        id="30",
-        title="2.1: Underground",
-        path="2.1_Underground",
-        parent=topic2,
-        encoded_url=dummy_encoded_url,
-    )
-    topic2.children.append(topic2_1)
-    topic2_2 = LibraryPage(
-        id="31",
-        title="2.2: Lava",
-        path="2.2_Lava",
-        parent=topic2,
-        encoded_url=dummy_encoded_url,
-    )
-    topic2.children.append(topic2_2)
-    topic2_3 = LibraryPage(
-        id="32",
-        title="2.3: Volcano",
-        path="2.3_Volcano",
-        parent=topic2,
-        encoded_url=dummy_encoded_url,
-    )
-    topic2.children.append(topic2_3)
-    topic3 = LibraryPage(
-        id="33",
-        title="3: Third topic",
-        path="3_Third_Topic",
-        parent=root,
-        encoded_url=dummy_encoded_url,
-    )
-    root.children.append(topic3)
-    topic3_1 = LibraryPage(
-        id="34",
-        title="3.1: Ground",
-        path="3.1_Ground",
-        parent=topic3,
-        encoded_url=dummy_encoded_url,
-    )
-    topic3.children.append(topic3_1)
-    topic3_2 = LibraryPage(
-        id="35",
-        title="3.2: Earth",
-        path="3.2_Earth",
-        parent=topic3,
-        encoded_url=dummy_encoded_url,
-    )
-    topic3.children.append(topic3_2)
-    topic3_3 = LibraryPage(
-        id="36",
-        title="3.3: Sky",
-        path="3.3_Sky",
-        parent=topic3,
-        encoded_url=dummy_encoded_url,
-    )
-    topic3.children.append(topic3_3)
-    return LibraryTree(
-        root=root,
-        pages={
-            root.id: root,
-            topic1.id: topic1,
-            topic1_1.id: topic1_1,
-            topic1_2.id: topic1_2,
-            topic1_3.id: topic1_3,
-            topic2.id: topic2,
-            topic2_1.id: topic2_1,
-            topic2_2.id: topic2_2,
-            topic2_3.id: topic2_3,
-            topic3.id: topic3,
-            topic3_1.id: topic3_1,
-            topic3_2.id: topic3_2,
-            topic3_3.id: topic3_3,
-        },
-    )
+    tree = LibraryTree()
+    for page_id, title, path, parent_id in [
+        ("24", "Home page", "", None),
+        ("25", "1: First topic", "1_First_Topic", "24"),
+        ("26", "1.1: Cloud", "1.1_Cloud", "25"),
+        ("27", "1.2: Tree", "1.2_Tree", "25"),
+        ("28", "1.3: Bees", "1.3_Bees", "25"),
+        ("29", "2: Second topic", "2_Second_Topic", "24"),
+        ("30", "2.1: Underground", "2.1_Underground", "29"),
+        ("31", "2.2: Lava", "2.2_Lava", "29"),
+        ("32", "2.3: Volcano", "2.3_Volcano", "29"),
+        ("33", "3: Third topic", "3_Third_Topic", "24"),
+        ("34", "3.1: Ground", "3.1_Ground", "33"),
+        ("35", "3.2: Earth", "3.2_Earth", "33"),
+        ("36", "3.3: Sky", "3.3_Sky", "33"),
+    ]:
+        tree.add_page(
+            page_id=page_id,
+            title=title,
+            path=path,
+            encoded_url=dummy_encoded_url,
+            parent_index=tree.indexes_by_id[parent_id] if parent_id else -1,
+        )
+    return tree
 
 
 @pytest.mark.parametrize(
@@ -261,3 +181,192 @@ def test_content_filter(
     content_filter: ContentFilter, expected_ids: list[str], library_tree: LibraryTree
 ):
     assert [page.id for page in content_filter.filter(library_tree)] == expected_ids
+
+
+def test_library_tree(library_tree: LibraryTree):
+    assert list(library_tree.pages.keys()) == [str(index) for index in range(24, 37)]
+    page = library_tree.pages["26"]
+    assert page is library_tree.pages["26"]
+    assert page.title == "1.1: Cloud"
+    assert page.path == "1.1_Cloud"
+    assert page.encoded_url == "https://www.acme.com/A_Page"
+    assert page.children == []
+    assert [parent.id for parent in page.self_and_parents] == ["26", "25", "24"]
+    assert [child.id for child in library_tree.pages["25"].children] == [
+        "26",
+        "27",
+        "28",
+    ]
+    assert library_tree.root.id == "24"
+    assert library_tree.root.parent is None
+
+    sub_tree = library_tree.sub_tree("25")
+    assert list(sub_tree.pages.keys()) == ["25", "26", "27", "28"]
+    assert sub_tree.root is library_tree.pages["25"]
+    assert "29" not in sub_tree.pages
+    with pytest.raises(KeyError):
+        sub_tree.sub_tree("29")
+
+
+def test_process_pages_private_subtree(
+    library_tree: LibraryTree, monkeypatch: pytest.MonkeyPatch
+):
+    processor = Processor()
+
+    def fake_process_page(
+        page: LibraryPage,
+        existing_zim_paths: set[ZimPath],  # noqa: ARG001
+    ) -> ProcessedPage:
+        if page.id == "25":
+            response = Response()
+            response.status_code = HTTPStatus.FORBIDDEN
+            raise HTTPError(response=response)
+        return ProcessedPage(
+            page=page, html_body="", text="", asset_paths=set(), links={}
+        )
+
+    monkeypatch.setattr(processor, "_process_page", fake_process_page)
+
+    pages = list(library_tree.pages.values())
+    processor.pages_processed = {page.id: threading.Event() for page in pages}
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(
+            executor.map(
+                lambda page: processor._process_page_unless_private(  # pyright: ignore[reportPrivateUsage]
+                    page=page, existing_zim_paths=set(), is_root=page is pages[0]
+                ),
+                pages,
+            )
+        )
+
+    assert processor.private_pages == {"25", "26", "27", "28"}
+    assert [result.page.id for result in results if result] == [
+        "24",
+        "29",
+        "30",
+        "31",
+        "32",
+        "33",
+        "34",
+        "35",
+        "36",
+    ]
+
+
+def test_content_filter_iter(library_tree: LibraryTree):
+    content_filter = ContentFilter(
+        page_title_include=re.compile(r"^1\..*"),
+        page_title_exclude=None,
+        page_id_include=None,
+        root_page_id=None,
+    )
+    selected_pages = content_filter.filter_iter(library_tree)
+    assert not isinstance(selected_pages, list)
+    assert [page.id for page in selected_pages] == ["24", "25", "26", "27", "28"]
+
+
+def test_content_filter_deep_tree():
+    tree = LibraryTree()
+    depth = 5000
+    for index in range(depth):
+        tree.add_page(
+            page_id=str(index),
+            title=f"Page {index}",
+            path=f"Page_{index}",
+            encoded_url=f"https://www.acme.com/Page_{index}",
+            parent_index=tree.indexes_by_id[str(index - 1)] if index else -1,
+        )
+        if index:
+            # a sibling at every level, which is not selected
+            tree.add_page(
+                page_id=f"{index}_sibling",
+                title="Sibling",
+                path=f"Sibling_{index}",
+                encoded_url=f"https://www.acme.com/Sibling_{index}",
+                parent_index=tree.indexes_by_id[str(index - 1)],
+            )
+    content_filter = ContentFilter(
+        page_title_include=re.compile(r"^Page (10|4999)$"),
+        page_title_exclude=None,
+        page_id_include=None,
+        root_page_id="5",
+    )
+    assert [page.id for page in content_filter.filter(tree)] == [
+        str(index) for index in range(5, depth)
+    ]
+
+
+def test_process_assets_fair_across_hosts(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(context, "assets_workers", 6)
+    monkeypatch.setattr(context, "assets_workers_per_host", 2)
+    processor = Processor()
+    processor.asset_manager = AssetManager()
+    lock = threading.Lock()
+    running: dict[str, int] = {}
+    max_running: dict[str, int] = {}
+    hosts_order: list[str] = []
+
+    def fake_process_asset(
+        asset_path: ZimPath,
+        asset_manager: AssetManager,
+        zim_writer: ZimWriter,  # noqa: ARG001
+    ) -> bool:
+        asset_urls = asset_manager.assets[asset_path].asset_urls
+        host = str(next(iter(asset_urls)).value).split("/")[2]
+        with lock:
+            hosts_order.append(host)
+            running[host] = running.get(host, 0) + 1
+            max_running[host] = max(max_running.get(host, 0), running[host])
+        time.sleep(0.05 if host == "slow.acme.com" else 0.01)
+        with lock:
+            running[host] -= 1
+        return True
+
+    monkeypatch.setattr(processor.asset_processor, "process_asset", fake_process_asset)
+    for host, count in (("slow.acme.com", 8), ("fast.acme.com", 4)):
+        for index in range(count):
+            processor.asset_manager.add_asset(
+                asset_path=ZimPath(f"{host}/{index}"),
+                asset_url=HttpUrl(f"https://{host}/{index}"),
+                used_by="page",
+                kind=None,
+                always_fetch_online=True,
+            )
+    processor.asset_manager.close()
+    processor._process_assets(Mock())  # pyright: ignore[reportPrivateUsage]
+
+    assert processor.assets_error is None
+    assert processor.stats_assets_done == 12
+    assert max_running["slow.acme.com"] == 2
+    # fast host assets are not waiting behind slow host assets
+    assert hosts_order[:4].count("fast.acme.com") >= 2
+    stats = processor.asset_manager.scheduler.stats
+    assert stats["slow.acme.com"].items_done == 8
+    assert stats["fast.acme.com"].items_done == 4
+
+
+def test_process_assets_error(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(context, "assets_workers", 3)
+    processor = Processor()
+
+    def fake_process_asset(
+        asset_path: ZimPath,
+        asset_manager: AssetManager,  # noqa: ARG001
+        zim_writer: ZimWriter,  # noqa: ARG001
+    ) -> bool:
+        if asset_path.value == "some/asset2":
+            raise OSError("Asset failure threshold reached")
+        return True
+
+    monkeypatch.setattr(processor.asset_processor, "process_asset", fake_process_asset)
+    for index in range(10):
+        processor.asset_manager.add_asset(
+            asset_path=ZimPath(f"some/asset{index}"),
+            asset_url=HttpUrl(f"https://www.acme.com/asset{index}"),
+            used_by="page",
+            kind=None,
+            always_fetch_online=True,
+        )
+    # assets processing stops on first error, without the manager being closed
+    processor._process_assets(Mock())  # pyright: ignore[reportPrivateUsage]
+    assert isinstance(processor.assets_error, OSError)
@@ -0,0 +1,117 @@
+import datetime
+import math
+
+import pytest
+
+from mindtouch2zim.rate_limiter import (
+    MAX_RETRY_AFTER_SECONDS,
+    MIN_RATE,
+    AdaptiveRateLimiter,
+    get_retry_after_seconds,
+)
+
+NOW = datetime.datetime(2025, 1, 1, 12, 0, 0, tzinfo=datetime.UTC)
+
+
+class FakeClock:
+    """Clock whose time only advances when sleeping"""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.now += seconds
+
+
+@pytest.fixture()
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+def get_limiter(clock: FakeClock, max_rps: float | None) -> AdaptiveRateLimiter:
+    return AdaptiveRateLimiter(max_rps=max_rps, clock=clock, sleep=clock.sleep)
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        pytest.param(None, None, id="none"),
+        pytest.param("", None, id="empty"),
+        pytest.param("12", 12, id="seconds"),
+        pytest.param("-3", 0, id="negative"),
+        pytest.param("100000", MAX_RETRY_AFTER_SECONDS, id="too_big"),
+        pytest.param("Wed, 01 Jan 2025 12:00:30 GMT", 30, id="date"),
+        pytest.param("Wed, 01 Jan 2025 11:00:00 GMT", 0, id="date_past"),
+        pytest.param("nan", None, id="nan"),
+        pytest.param("soon", None, id="invalid"),
+    ],
+)
+def test_get_retry_after_seconds(value: str | None, expected: float | None):
+    assert get_retry_after_seconds(value, now=NOW) == expected
+
+
+def test_rate_limiter_max_rps(clock: FakeClock):
+    limiter = get_limiter(clock, max_rps=4)
+    for _ in range(41):
+        limiter.acquire()
+    # first token is available immediately, then one every 1/4s
+    assert clock.now == pytest.approx(10)
+
+
+def test_rate_limiter_unlimited(clock: FakeClock):
+    limiter = get_limiter(clock, max_rps=None)
+    for _ in range(100):
+        limiter.acquire()
+        limiter.record_response(200, latency=0.1)
+    assert clock.now == 0
+    assert math.isinf(limiter.rate)
+
+
+def test_rate_limiter_throttled(clock: FakeClock):
+    limiter = get_limiter(clock, max_rps=None)
+    for _ in range(10):
+        limiter.acquire()
+    # server asks to slow down: rate starts from current rate, and server delay is
+    # honored before next request
+    limiter.record_response(429, latency=0.1, retry_after=5)
+    assert limiter.rate == 5
+    # a single decrease for concurrent throttled requests
+    limiter.record_response(503, latency=0.1)
+    assert limiter.rate == 5
+    limiter.acquire()
+    assert clock.now == 5
+    limiter.record_response(503, latency=0.1)
+    assert limiter.rate == 2.5
+    for _ in range(10):
+        clock.now += 1
+        limiter.record_response(503, latency=0.1)
+    assert limiter.rate == MIN_RATE
+
+
+def test_rate_limiter_additive_increase(clock: FakeClock):
+    limiter = get_limiter(clock, max_rps=10)
+    clock.now += 1
+    limiter.record_response(429, latency=0.1)
+    assert limiter.rate == 5
+    # about one more request per second every second
+    start = clock.now
+    while limiter.rate < 9:
+        limiter.acquire()
+        limiter.record_response(200, latency=0.1)
+    assert clock.now - start == pytest.approx(4, abs=1)
+    for _ in range(100):
+        limiter.acquire()
+        limiter.record_response(200, latency=0.1)
+    assert limiter.rate == 10
+
+
+def test_rate_limiter_slow_responses(clock: FakeClock):
+    limiter = get_limiter(clock, max_rps=10)
+    for _ in range(10):
+        limiter.record_response(200, latency=0.1)
+    assert limiter.rate == 10
+    limiter.record_response(200, latency=1)
+    assert limiter.rate == 9
@@ -0,0 +1,45 @@
+from collections.abc import Generator
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+from zimscraperlib.rewriting.url_rewriting import HttpUrl, ZimPath
+
+from mindtouch2zim.asset import AssetDetails
+from mindtouch2zim.context import Context
+from mindtouch2zim.rewrite_processes import create_rewrite_pool, rewrite_page
+
+context = Context.get()
+
+
+@pytest.fixture()
+def rewrite_pool(monkeypatch: pytest.MonkeyPatch) -> Generator[ProcessPoolExecutor]:
+    monkeypatch.setattr(context, "library_url", "https://www.acme.com")
+    monkeypatch.setattr(context, "rewrite_processes", 1)
+    pool = create_rewrite_pool({ZimPath("www.acme.com/Existing")})
+    yield pool
+    pool.shutdown()
+
+
+def test_rewrite_page_in_process(rewrite_pool: ProcessPoolExecutor):
+    rewritten_page = rewrite_pool.submit(
+        rewrite_page,
+        "A_Page",
+        '<p>Hello <a href="/Existing">world</a></p>'
+        '<img src="https://www.foo.bar/image1.png"></img>',
+        "page ID 123",
+    ).result()
+    # custom rewriting rules are used in worker process
+    assert rewritten_page.html_body == (
+        '<p>Hello <a href="#/Existing">world</a></p>'
+        '<img src="content/www.foo.bar/image1.png"></img>'
+    )
+    assert rewritten_page.text == "Hello\nworld"
+    assert rewritten_page.assets == {
+        ZimPath("www.foo.bar/image1.png"): AssetDetails(
+            asset_urls={HttpUrl("https://www.foo.bar/image1.png")},
+            used_by={"page ID 123"},
+            always_fetch_online=False,
+            kind="img",
+        )
+    }
+    assert rewritten_page.link_paths == {ZimPath("www.acme.com/Existing")}
@@ -0,0 +1,53 @@
+import threading
+from io import BytesIO
+
+from mindtouch2zim.s3_uploader import S3Uploader
+
+
+class FakeS3Storage:
+    """A local stand-in for S3 storage, whose uploads wait until released"""
+
+    def __init__(self) -> None:
+        self.objects: dict[str, tuple[dict[str, str], bytes]] = {}
+        self.released = threading.Event()
+
+    def upload(self, key: str, meta: dict[str, str], content: BytesIO):
+        self.released.wait()
+        if key.startswith("failing/"):
+            raise OSError("S3 is down")
+        self.objects[key] = (meta, content.getvalue())
+
+
+def test_s3_uploader_background():
+    storage = FakeS3Storage()
+    uploader = S3Uploader(storage.upload, workers=2, max_queued_bytes=1000)
+    # submitting does not wait for uploads to be done
+    assert uploader.submit("medium/a", {"ident": "1"}, b"aaa")
+    assert uploader.submit("medium/b", {"ident": "2"}, b"bbb")
+    assert uploader.submit("failing/c", {"ident": "3"}, b"ccc")
+    assert storage.objects == {}
+    storage.released.set()
+    uploader.flush()
+    assert storage.objects == {
+        "medium/a": ({"ident": "1"}, b"aaa"),
+        "medium/b": ({"ident": "2"}, b"bbb"),
+    }
+    assert uploader.uploaded_count == 2
+    assert uploader.failed_count == 1
+    assert uploader.queued_bytes == 0
+    uploader.close()
+
+
+def test_s3_uploader_bounded_memory():
+    storage = FakeS3Storage()
+    uploader = S3Uploader(storage.upload, workers=1, max_queued_bytes=10)
+    # content bigger than the limit is uploaded when nothing else is pending
+    assert uploader.submit("medium/a", {}, b"x" * 20)
+    assert not uploader.submit("medium/b", {}, b"x")
+    storage.released.set()
+    uploader.flush()
+    assert uploader.submit("medium/c", {}, b"x")
+    uploader.flush()
+    assert set(storage.objects) == {"medium/a", "medium/c"}
+    assert uploader.skipped_count == 1
+    uploader.close()
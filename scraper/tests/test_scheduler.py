@@ -0,0 +1,69 @@
+import threading
+
+import pytest
+
+from mindtouch2zim.scheduler import HostScheduler
+
+
+@pytest.fixture()
+def scheduler() -> HostScheduler[str]:
+    return HostScheduler(max_per_host=2)
+
+
+def test_scheduler_round_robin(scheduler: HostScheduler[str]):
+    for index in range(3):
+        scheduler.put(f"slow{index}", host="slow.acme.com")
+    for index in range(2):
+        scheduler.put(f"fast{index}", host="fast.acme.com")
+    scheduler.put("other0", host="other.acme.com")
+    items = [scheduler.get() for _ in range(5)]
+    assert items == ["slow0", "fast0", "other0", "slow1", "fast1"]
+    for item in items:
+        scheduler.done(item, seconds=0.5)
+    scheduler.close()
+    assert scheduler.get() == "slow2"
+    scheduler.done("slow2", seconds=1)
+    assert scheduler.get() is None
+    assert scheduler.stats["slow.acme.com"].items_done == 3
+    assert scheduler.stats["slow.acme.com"].average_seconds == pytest.approx(2 / 3)
+    assert scheduler.stats["other.acme.com"].items_done == 1
+
+
+def test_scheduler_max_per_host(scheduler: HostScheduler[str]):
+    for index in range(3):
+        scheduler.put(f"slow{index}", host="slow.acme.com")
+    assert scheduler.get() == "slow0"
+    assert scheduler.get() == "slow1"
+
+    # third item is handed out only once one of the first ones is done
+    got: list[str | None] = []
+    getter = threading.Thread(target=lambda: got.append(scheduler.get()))
+    getter.start()
+    getter.join(timeout=0.2)
+    assert getter.is_alive()
+    # items of other hosts are not held
+    scheduler.put("fast0", host="fast.acme.com")
+    getter.join(timeout=5)
+    assert got == ["fast0"]
+
+    getter = threading.Thread(target=lambda: got.append(scheduler.get()))
+    getter.start()
+    getter.join(timeout=0.2)
+    assert getter.is_alive()
+    scheduler.done("slow0", seconds=1)
+    getter.join(timeout=5)
+    assert got == ["fast0", "slow2"]
+
+
+def test_scheduler_close_waits_in_flight(scheduler: HostScheduler[str]):
+    scheduler.put("slow0", host="slow.acme.com")
+    scheduler.close()
+    assert scheduler.get() == "slow0"
+    # no more item once closed, even if some are in flight
+    assert scheduler.get() is None
+
+
+def test_scheduler_cancel(scheduler: HostScheduler[str]):
+    scheduler.put("slow0", host="slow.acme.com")
+    scheduler.close(cancel=True)
+    assert scheduler.get() is None
@@ -0,0 +1,29 @@
+from pathlib import Path
+
+from mindtouch2zim.spool import SpoolStream
+
+
+def test_spool_stream_in_memory(tmp_path: Path):
+    stream = SpoolStream(max_memory_size=10, folder=tmp_path)
+    stream.write(b"abcde")
+    stream.write(b"fghij")
+    stream.close()
+    assert stream.fpath is None
+    assert stream.getvalue() == b"abcdefghij"
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_spool_stream_spooled(tmp_path: Path):
+    stream = SpoolStream(max_memory_size=10, folder=tmp_path)
+    stream.write(b"abcde")
+    assert stream.getvalue() == b"abcde"
+    stream.write(b"fghijk")
+    assert stream.getvalue() == b"abcdefghijk"
+    stream.write(b"lmn")
+    stream.close()
+    assert stream.fpath is not None
+    assert stream.fpath.parent == tmp_path
+    assert stream.fpath.read_bytes() == b"abcdefghijklmn"
+    assert stream.getvalue() == b"abcdefghijklmn"
+    stream.discard()
+    assert list(tmp_path.iterdir()) == []
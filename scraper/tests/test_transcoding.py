@@ -0,0 +1,76 @@
+import os
+from io import BytesIO
+from typing import Any
+
+import pytest
+from PIL import Image
+
+from mindtouch2zim.errors import ImageTooLargeError
+from mindtouch2zim.transcoding import get_target_size, transcode_image
+
+
+def get_image(width: int, height: int, fmt: str, **params: Any) -> bytes:
+    """Return content of a grayscale image full of noise"""
+    image = Image.frombytes("L", (width, height), os.urandom(width * height))
+    content = BytesIO()
+    image.save(content, format=fmt, **params)
+    return content.getvalue()
+
+
+def get_format_and_size(content: bytes) -> tuple[str | None, tuple[int, int]]:
+    with Image.open(BytesIO(content)) as image:
+        return image.format, image.size
+
+
+@pytest.mark.parametrize(
+    "width, height, max_pixels, expected",
+    [
+        pytest.param(100, 50, 5000, (100, 50), id="fits"),
+        pytest.param(200, 100, 5000, (100, 50), id="reduced"),
+        pytest.param(101, 37, 1000, (52, 20), id="rounded"),
+    ],
+)
+def test_get_target_size(
+    width: int, height: int, max_pixels: int, expected: tuple[int, int]
+):
+    assert get_target_size(width, height, max_pixels) == expected
+
+
+@pytest.mark.parametrize("fmt", ["JPEG", "PNG", "BMP"])
+def test_transcode_image_reduced(fmt: str):
+    transcoded = transcode_image(
+        get_image(400, 200, fmt), max_pixels=5000, max_decoded_bytes=10**9
+    )
+    assert get_format_and_size(transcoded) == ("WEBP", (100, 50))
+
+
+def test_transcode_image_jpeg_reduced_while_decoding():
+    # full size image needs 80000 bytes to be decoded, but only 1/16th of it is
+    # decoded since it is anyway reduced
+    transcoded = transcode_image(
+        get_image(400, 200, "JPEG"), max_pixels=5000, max_decoded_bytes=20000
+    )
+    assert get_format_and_size(transcoded) == ("WEBP", (100, 50))
+
+
+def test_transcode_image_too_large():
+    with pytest.raises(ImageTooLargeError):
+        transcode_image(
+            get_image(400, 200, "PNG"), max_pixels=5000, max_decoded_bytes=20000
+        )
+
+
+@pytest.mark.parametrize(
+    "fmt, params, expected_format",
+    [
+        pytest.param("PNG", {}, "WEBP", id="transcoded"),
+        pytest.param("JPEG", {"quality": 5}, "JPEG", id="original_smaller"),
+    ],
+)
+def test_transcode_image_keep_original(
+    fmt: str, params: dict[str, Any], expected_format: str
+):
+    content = get_image(60, 40, fmt, **params)
+    transcoded = transcode_image(content, max_pixels=5000, max_decoded_bytes=10**9)
+    assert get_format_and_size(transcoded) == (expected_format, (60, 40))
+    assert (transcoded == content) == (expected_format == fmt)
@@ -0,0 +1,122 @@
+import threading
+
+import pytest
+
+from mindtouch2zim.workers import (
+    WorkersPool,
+    WorkersSample,
+    WorkersTuner,
+    get_rss_bytes,
+)
+
+
+def test_get_rss_bytes():
+    rss_bytes = get_rss_bytes()
+    assert rss_bytes is None or rss_bytes > 0
+
+
+def test_workers_pool_resize():
+    lock = threading.Lock()
+    release = threading.Event()
+    running: set[str] = set()
+    items = list(range(20))
+
+    def target() -> bool:
+        with lock:
+            if not items:
+                return False
+            items.pop()
+            running.add(threading.current_thread().name)
+        release.wait()
+        return True
+
+    pool = WorkersPool(target=target, name="test", count=2)
+    assert not pool.join(timeout=0.1)
+    pool.resize(4)
+    assert not pool.join(timeout=0.1)
+    assert running == {"test_0", "test_1", "test_2", "test_3"}
+    pool.resize(1)
+    release.set()
+    # pool stops once target returned False, whatever the number of active threads
+    assert pool.join(timeout=5)
+    assert items == []
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture()
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.fixture()
+def tuner(clock: FakeClock) -> WorkersTuner:
+    return WorkersTuner(
+        workers=8, min_workers=2, max_workers=12, max_rss_bytes=1000, clock=clock
+    )
+
+
+def update(
+    tuner: WorkersTuner,
+    clock: FakeClock,
+    done: int,
+    failed: int = 0,
+    queued: int = 100,
+    rss_bytes: int | None = 100,
+) -> int:
+    clock.now += 10
+    last_sample = tuner.last_sample or WorkersSample(0, 0, 0, None)
+    return tuner.update(
+        WorkersSample(
+            items_done=last_sample.items_done + done,
+            items_failed=last_sample.items_failed + failed,
+            items_queued=queued,
+            rss_bytes=rss_bytes,
+        )
+    )
+
+
+def test_workers_tuner_hill_climbing(tuner: WorkersTuner, clock: FakeClock):
+    # workers are added while throughput improves
+    assert update(tuner, clock, done=100) == 10
+    assert update(tuner, clock, done=120) == 12
+    # within bounds
+    assert update(tuner, clock, done=150) == 12
+    # nothing changes when throughput does not change
+    assert update(tuner, clock, done=151) == 12
+    # workers are removed when throughput degrades, and keep being removed while
+    # it improves
+    assert update(tuner, clock, done=100) == 9
+    assert update(tuner, clock, done=130) == 7
+    # and added again once it degrades
+    assert update(tuner, clock, done=110) == 8
+
+
+def test_workers_tuner_not_enough_work(tuner: WorkersTuner, clock: FakeClock):
+    assert update(tuner, clock, done=100) == 10
+    assert update(tuner, clock, done=10, queued=3) == 10
+    # throughput is not compared to the one of an interval without enough work
+    assert update(tuner, clock, done=50) == 12
+
+
+@pytest.mark.parametrize(
+    "failed, rss_bytes",
+    [
+        pytest.param(50, 100, id="failures"),
+        pytest.param(0, 2000, id="memory"),
+    ],
+)
+def test_workers_tuner_limits(
+    tuner: WorkersTuner, clock: FakeClock, failed: int, rss_bytes: int
+):
+    assert update(tuner, clock, done=100, failed=failed, rss_bytes=rss_bytes) == 6
+    assert update(tuner, clock, done=100, failed=failed, rss_bytes=rss_bytes) == 5
+    for _ in range(5):
+        update(tuner, clock, done=100, failed=failed, rss_bytes=rss_bytes)
+    assert tuner.workers == 2
@@ -0,0 +1,105 @@
+import threading
+from typing import Any
+from unittest.mock import Mock
+
+import pytest
+
+from mindtouch2zim.zim_writer import ZimWriter
+
+
+def test_zim_writer_adds_items_in_order():
+    added_items: list[tuple[str, Any]] = []
+    creator = Mock()
+    creator.add_item_for.side_effect = lambda path, **kwargs: added_items.append(
+        (path, kwargs)
+    )
+    zim_writer = ZimWriter(creator, max_queued_bytes=1000)
+    zim_writer.start()
+    zim_writer.add_item_for("content/a", content=b"aaa")
+    zim_writer.add_item_for("content/b", content="bb", mimetype="text/plain")
+    zim_writer.close()
+    assert added_items == [
+        ("content/a", {"content": b"aaa"}),
+        ("content/b", {"content": b"bb", "mimetype": "text/plain"}),
+    ]
+    metrics = zim_writer.metrics
+    assert metrics.queue_depth == 0
+    assert metrics.queued_bytes == 0
+    assert metrics.items_written == 2
+    with pytest.raises(OSError, match="closed"):
+        zim_writer.add_item_for("content/c", content=b"c")
+
+
+def test_zim_writer_backpressure():
+    release = threading.Event()
+    creator = Mock()
+    creator.add_item_for.side_effect = lambda *_, **__: release.wait()
+    zim_writer = ZimWriter(creator, max_queued_bytes=10)
+    zim_writer.start()
+    # an item bigger than the queue is accepted when queue is empty
+    zim_writer.add_item_for("content/big", content=b"x" * 20)
+    producer = threading.Thread(
+        target=zim_writer.add_item_for,
+        args=("content/small",),
+        kwargs={"content": b"x"},
+    )
+    producer.start()
+    producer.join(timeout=0.2)
+    # producer waits while first item is being added
+    assert producer.is_alive()
+    assert zim_writer.metrics.queue_depth == 1
+    release.set()
+    producer.join()
+    zim_writer.close()
+    assert zim_writer.metrics.items_written == 2
+    assert zim_writer.metrics.max_queue_depth == 1
+
+
+def test_zim_writer_str_size_in_bytes():
+    release = threading.Event()
+    creator = Mock()
+    creator.add_item_for.side_effect = lambda *_, **__: release.wait()
+    zim_writer = ZimWriter(creator, max_queued_bytes=100)
+    zim_writer.start()
+    zim_writer.add_item_for("content/a", content="é" * 30)
+    assert zim_writer.metrics.queued_bytes == 60
+    release.set()
+    zim_writer.close()
+    creator.add_item_for.assert_called_once_with(
+        "content/a", content=("é" * 30).encode()
+    )
+
+
+def test_zim_writer_error():
+    creator = Mock()
+    creator.add_item_for.side_effect = RuntimeError("libzim failure")
+    zim_writer = ZimWriter(creator, max_queued_bytes=1000)
+    zim_writer.start()
+    zim_writer.add_item_for("content/a", content=b"a")
+    zim_writer.thread.join()
+    with pytest.raises(RuntimeError, match="libzim failure"):
+        zim_writer.add_item_for("content/b", content=b"b")
+    with pytest.raises(RuntimeError, match="libzim failure"):
+        zim_writer.close()
+
+
+def test_zim_writer_cancel():
+    release = threading.Event()
+    added_items: list[str] = []
+
+    def add_item_for(path: str, **_: Any):
+        release.wait()
+        added_items.append(path)
+
+    creator = Mock()
+    creator.add_item_for.side_effect = add_item_for
+    zim_writer = ZimWriter(creator, max_queued_bytes=1000)
+    zim_writer.start()
+    for path in ("content/a", "content/b", "content/c"):
+        zim_writer.add_item_for(path, content=b"x")
+    # wait for first item to be taken by writer thread
+    while not creator.add_item_for.called:
+        zim_writer.thread.join(timeout=0.01)
+    threading.Timer(0.1, release.set).start()
+    zim_writer.close(cancel=True)
+    assert added_items == ["content/a"]